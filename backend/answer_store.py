@@ -0,0 +1,243 @@
+"""
+Durable store for Gemini answers and summaries.
+
+Answers live in a sidecar SQLite file so they survive deploys and restarts.
+Rows are keyed by kind ("qa" or "summary"), policy id, normalized question
+and prompt-template version, and carry the model that wrote them and the
+policy version they were generated for; a row for an older policy version is
+a miss. The model is not part of the key, so a stored answer can be found
+before retrieval and model routing run.
+
+Reads are point lookups on the primary key. Writes are queued and applied in
+batches by a background thread, so the request path never waits on them.
+The total size is kept in answer_usage by triggers; over the limit, the rows
+closest to expiry are evicted (reads don't write, as in the shared cache).
+"""
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ANSWER_STORE_ENABLED = os.getenv("ANSWER_STORE_ENABLED", "true").lower() == "true"
+ANSWER_STORE_PATH = os.getenv("ANSWER_STORE_PATH", "answers.db")
+ANSWER_STORE_TTL_SECONDS = int(os.getenv("ANSWER_STORE_TTL_SECONDS", str(30 * 86400)))
+ANSWER_STORE_MAX_BYTES = int(os.getenv("ANSWER_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Pending writes beyond this are dropped rather than blocking a request
+ANSWER_STORE_QUEUE_SIZE = int(os.getenv("ANSWER_STORE_QUEUE_SIZE", "1000"))
+ANSWER_STORE_WRITE_BATCH = 64
+ANSWER_STORE_BUSY_TIMEOUT_MS = 5000
+
+_STOP = object()
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", question.lower()).strip().rstrip("?!. ")
+
+
+class AnswerStore:
+    """Thread-safe; each thread reads through its own connection."""
+
+    def __init__(self, db_path: str = ANSWER_STORE_PATH,
+                 ttl: float = ANSWER_STORE_TTL_SECONDS,
+                 max_bytes: int = ANSWER_STORE_MAX_BYTES,
+                 queue_size: int = ANSWER_STORE_QUEUE_SIZE):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.dropped_writes = 0
+        self.write_errors = 0
+        self.evictions = 0
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode = WAL")
+        key_columns = [row[1] for row in conn.execute("PRAGMA table_info(answers)") if row[5]]
+        if "model" in key_columns:
+            # Stores from before the model left the key; they only hold cached answers
+            conn.executescript("DROP TABLE answers; DROP TABLE IF EXISTS answer_usage;")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                kind TEXT NOT NULL,
+                policy_id TEXT NOT NULL,
+                question TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                policy_version INTEGER,
+                answer TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (kind, policy_id, question, prompt_version)
+            );
+            CREATE INDEX IF NOT EXISTS idx_answers_expiry ON answers(expires_at);
+
+            CREATE TABLE IF NOT EXISTS answer_usage (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                entries INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO answer_usage (id, entries, bytes)
+                SELECT 1, COUNT(*), IFNULL(SUM(size), 0) FROM answers;
+            CREATE TRIGGER IF NOT EXISTS trg_answers_insert AFTER INSERT ON answers
+            BEGIN
+                UPDATE answer_usage SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_answers_delete AFTER DELETE ON answers
+            BEGIN
+                UPDATE answer_usage SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_answers_update AFTER UPDATE OF size ON answers
+            BEGIN
+                UPDATE answer_usage SET bytes = bytes - OLD.size + NEW.size WHERE id = 1;
+            END;
+        """)
+
+        self._writer = threading.Thread(target=self._write_loop, name="answer-store-writer", daemon=True)
+        self._writer.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA busy_timeout = {ANSWER_STORE_BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, kind: str, policy_id: str, question: str,
+            prompt_version: str, policy_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Stored answer, or None if missing, expired or for another policy version."""
+        try:
+            row = self._conn().execute("""
+                SELECT answer, policy_version, expires_at FROM answers
+                WHERE kind = ? AND policy_id = ? AND question = ? AND prompt_version = ?
+            """, (kind, policy_id, normalize_question(question), prompt_version)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Answer store read failed: {str(e)}")
+            row = None
+        if row is None or row[2] <= time.time() or row[1] != policy_version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, kind: str, policy_id: str, question: str, model: str,
+            prompt_version: str, answer: Dict[str, Any],
+            policy_version: Optional[int] = None) -> None:
+        """Queue an answer, written by `model`, for writing; never blocks."""
+        row = (kind, policy_id, normalize_question(question), model, prompt_version,
+               policy_version, json.dumps(answer))
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped_writes += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= ANSWER_STORE_WRITE_BATCH:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                    self.writes += len(batch)
+                except sqlite3.Error as e:
+                    self.write_errors += len(batch)
+                    logger.warning(f"Answer store write of {len(batch)} answers failed: {str(e)}")
+            if item is _STOP:
+                return
+
+    def _write(self, batch: List[tuple]) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("""
+                INSERT INTO answers (kind, policy_id, question, model, prompt_version,
+                                     policy_version, answer, size, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(kind, policy_id, question, prompt_version) DO UPDATE SET
+                    model = excluded.model,
+                    policy_version = excluded.policy_version, answer = excluded.answer,
+                    size = excluded.size, created_at = excluded.created_at,
+                    expires_at = excluded.expires_at
+            """, [row + (len(row[-1]), now, now + self.ttl) for row in batch])
+
+            conn.execute("DELETE FROM answers WHERE expires_at <= ?", (now,))
+            excess = conn.execute("SELECT bytes FROM answer_usage WHERE id = 1").fetchone()[0] - self.max_bytes
+            if excess > 0:
+                # Shortest run of rows, closest to expiry first, that frees enough
+                self.evictions += conn.execute("""
+                    DELETE FROM answers WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid, size, SUM(size) OVER (ORDER BY expires_at, rowid) AS freed
+                            FROM answers
+                        ) WHERE freed - size < ?
+                    )
+                """, (excess,)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued writes and stop the writer thread."""
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Answer store queue full at shutdown; pending writes are lost")
+            return
+        self._writer.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, used = self._conn().execute(
+                "SELECT entries, bytes FROM answer_usage WHERE id = 1"
+            ).fetchone()
+        except sqlite3.Error:
+            entries = used = None
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "pending_writes": self._queue.qsize(),
+            "writes": self.writes,
+            "dropped_writes": self.dropped_writes,
+            "write_errors": self.write_errors,
+            "evictions": self.evictions
+        }
+
+
+def create_answer_store() -> Optional[AnswerStore]:
+    """The configured store, or None if disabled or the file can't be opened."""
+    if not ANSWER_STORE_ENABLED:
+        return None
+    try:
+        return AnswerStore()
+    except sqlite3.Error as e:
+        logger.warning(f"Answer store unavailable ({ANSWER_STORE_PATH}): {str(e)}")
+        return None
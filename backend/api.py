@@ -3,18 +3,22 @@ FastAPI backend for the insurance policy application.
 """
 from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, field_validator
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 import uvicorn
-from .database import PolicyDatabase
+from .database import PolicyDatabase, AsyncPolicyDatabase, POLICY_SORTS, DATASET_TAG, CONTENT_TAG, policy_tag
+from .catalog import PolicyCatalog
 from .gemini_service import GeminiPolicyService
 from .cache import cache, cached
+from .responses import encode_body, encoded_response, make_etag, etag_matches, not_modified_response
+from .warmup import HotKeys, CacheWarmer, WARMUP_TOP_QUERIES, WARMUP_TOP_POLICIES
 import markdown
 import logging
 from datetime import datetime, timedelta, timezone
 import traceback
 from collections import defaultdict
+from contextlib import asynccontextmanager
 import asyncio
 
 # Configure structured logging
@@ -32,7 +36,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Insurance Policy API", version="1.0.0")
+# Worker threads for SQLite calls made from async handlers
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+
+# Serve /api/policies from the in-memory catalog snapshot instead of SQLite
+POLICY_CATALOG_ENABLED = os.getenv("POLICY_CATALOG_ENABLED", "true").lower() == "true"
+POLICY_CATALOG_REFRESH_SECONDS = float(os.getenv("POLICY_CATALOG_REFRESH_SECONDS", "2"))
+
+# Cached listings and search results are invalidated by dataset version tags,
+# so the TTL only bounds how long unused entries occupy the cache
+POLICY_CACHE_TTL_SECONDS = int(os.getenv("POLICY_CACHE_TTL_SECONDS", "3600"))
+
+# Cache-Control for catalog endpoints that send ETags. The default lets
+# browsers and CDNs store responses but revalidate each use, which costs a
+# 304 instead of a full payload while the data is unchanged.
+CATALOG_CACHE_CONTROL = os.getenv("CATALOG_CACHE_CONTROL", "public, no-cache")
+
+# Load the embedding and reranker models during warmup rather than on the
+# first question
+WARMUP_LOAD_MODELS = os.getenv("WARMUP_LOAD_MODELS", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cache_sweeper = asyncio.create_task(cache.run_sweeper())
+    hot_keys.load()
+    gemini_service.inference.start()
+    warmup_task = asyncio.create_task(warm_caches())
+    hot_keys_saver = asyncio.create_task(hot_keys.run_saver())
+    yield
+    for task in (cache_sweeper, warmup_task, hot_keys_saver):
+        task.cancel()
+    await gemini_service.inference.stop()
+    hot_keys.save()
+    gemini_service.close()
+    async_db.shutdown()
+    db.close()
+
+
+app = FastAPI(title="Insurance Policy API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware - THIS MUST BE THE FIRST MIDDLEWARE
 # It ensures all responses, including errors from other middleware, have CORS headers.
@@ -49,6 +91,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 
 # Rate limiting storage
@@ -107,6 +150,12 @@ async def global_exception_handler(request: Request, exc: Exception):
 # Initialize database and services with error handling
 try:
     db = PolicyDatabase()
+    async_db = AsyncPolicyDatabase(db, max_workers=DB_EXECUTOR_WORKERS)
+    catalog = PolicyCatalog(db, refresh_interval=POLICY_CATALOG_REFRESH_SECONDS) if POLICY_CATALOG_ENABLED else None
+    # Tagged cache entries are checked against the versions kept in the database
+    cache.set_version_source(db.get_tag_versions)
+    hot_keys = HotKeys()
+    warmer = CacheWarmer()
     gemini_service = GeminiPolicyService()
     logger.info("Successfully initialized database and Gemini service")
 except Exception as e:
@@ -164,382 +213,459 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check with service status."""
+    """
+    Liveness probe: answers from the event loop without touching the database,
+    so probes stay cheap and don't compete with traffic for the DB pool.
+    """
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+def collect_store_stats() -> Dict[str, Any]:
+    """Stats of the answer caches, retrieval indexes and embedding stores (blocking)."""
+    return {
+        "semantic_answers": gemini_service.semantic_cache.stats() if gemini_service.semantic_cache else None,
+        "answer_store": gemini_service.answer_store.stats() if gemini_service.answer_store else None,
+        "retrieval_index": gemini_service.chunk_index.stats(),
+        "query_embeddings": gemini_service.query_embeddings.stats(),
+        "vector_index": gemini_service.vector_index.stats(),
+        "embedding_store": gemini_service.embedding_store.stats()
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe with detailed service status; 503 while the database is
+    unavailable or the startup cache warmup is still running.
+    """
     try:
         # Check database connection
         db_status = "healthy"
         try:
-            db.get_policy_statistics()
+            await async_db.ping()
         except Exception as e:
             db_status = f"unhealthy: {str(e)}"
-            logger.error(f"Database health check failed: {str(e)}")
+            logger.error(f"Database readiness check failed: {str(e)}")
 
         # Check Gemini service
         gemini_status = "healthy" if gemini_service.api_key else "not configured"
 
-        # Get cache stats
-        cache_stats = cache.stats()
+        # Cache and store stats read SQLite; keep them off the event loop
+        cache_stats = await asyncio.to_thread(cache.stats)
+        store_stats = await asyncio.to_thread(collect_store_stats)
 
+        if db_status != "healthy":
+            status_text = "degraded"
+        elif not warmer.finished:
+            status_text = "warming"
+        else:
+            status_text = "ready"
+        ready = status_text == "ready"
         health_data = {
-            "status": "healthy" if db_status == "healthy" else "degraded",
+            "status": status_text,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "services": {
                 "database": db_status,
                 "gemini": gemini_status,
-                "cache": cache_stats
+                "cache": cache_stats,
+                **store_stats,
+                "inference": gemini_service.inference.stats(),
+                "database_executor": async_db.metrics(),
+                "catalog": catalog.stats() if catalog else None,
+                "warmup": warmer.stats()
             }
         }
-        logger.info(f"Health check completed: {health_data['status']}")
-        return health_data
+        logger.info(f"Readiness check completed: {health_data['status']}")
+        return JSONResponse(content=health_data, status_code=200 if ready else 503)
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}", exc_info=True)
+        logger.error(f"Readiness check failed: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/admin/cache/clear")
 async def clear_cache():
     """Clear all cache entries (admin endpoint)"""
     try:
-        cache.clear()
+        await asyncio.to_thread(cache.clear)
         logger.info("Cache cleared by admin request")
         return {"message": "Cache cleared successfully", "timestamp": datetime.utcnow().isoformat()}
     except Exception as e:
         logger.error(f"Failed to clear cache: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def get_catalog_snapshot():
+    """Current catalog snapshot, re-checking the dataset version when due."""
+    if catalog is None:
+        return None
+    if catalog.check_due():
+        try:
+            await async_db.run(catalog.refresh)
+        except Exception as e:
+            if catalog.snapshot is None:
+                raise
+            logger.warning(f"Catalog refresh failed, serving previous snapshot: {str(e)}")
+    return catalog.snapshot
+
+async def current_dataset_version() -> Optional[int]:
+    """Dataset version as last seen by the cache's version source."""
+    return (await cache.tag_versions_async([DATASET_TAG])).get(DATASET_TAG)
+
+async def catalog_response(request: Request, tags: List[str], params: tuple,
+                           build: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    JSON response with a strong ETag derived from the data versions behind
+    it and the request parameters; a matching If-None-Match gets a 304
+    without building the payload.
+    """
+    headers = {"Cache-Control": CATALOG_CACHE_CONTROL}
+    versions = await cache.tag_versions_async(tags)
+    etag = make_etag(versions, *params) if versions else None
+    if etag is not None and etag_matches(request, etag):
+        return not_modified_response(request, etag, headers)
+    body = await load_catalog_body(tags, params, build)
+    return encoded_response(body, request, headers=headers, etag=etag)
+
+async def load_catalog_body(tags: List[str], params: tuple,
+                            build: Callable[[], Awaitable[Any]]):
+    """Encoded payload from the cache, built and cached (tagged with `tags`) on a miss."""
+    cache_key = cache.make_key(params)
+    body = await cache.aget(cache_key, namespace="policies")
+    if body is None:
+        versions = await cache.tag_versions_async(tags)
+        body = encode_body(await build())
+        await cache.aset(cache_key, body, ttl=POLICY_CACHE_TTL_SECONDS, namespace="policies", tags=versions)
+    return body
+
+def policy_list_params(**overrides) -> Dict[str, Any]:
+    """Parameters of an /api/policies request, defaults filled in."""
+    params = dict(
+        provider_name=None,
+        policy_category=None,
+        min_sum_insured=None,
+        max_premium=None,
+        maternity_required=None,
+        daycare_required=None,
+        payment_mode=None,
+        sort="id",
+        limit=100,
+        offset=0,
+        cursor=None,
+        include_total=True
+    )
+    unknown = set(overrides) - set(params)
+    if unknown:
+        raise ValueError(f"Unknown policy list parameters: {', '.join(sorted(unknown))}")
+    params.update(overrides)
+    return params
+
+async def load_policies_page(params: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
+    """
+    One /api/policies page as cached: the encoded body, total, next cursor
+    and ETag. Raises ValueError for an invalid cursor or sort.
+    """
+    query_params = ("policies", params)
+    cache_key = cache.make_key(query_params)
+
+    # Check cache first
+    cached_result = await cache.aget(cache_key, namespace="policies")
+    if cached_result is not None:
+        logger.info("Returning policies from cache")
+        return cached_result
+
+    paging_keys = ("sort", "limit", "offset", "cursor", "include_total")
+    paging = {key: params[key] for key in paging_keys}
+    filters = {key: value for key, value in params.items() if key not in paging_keys}
+    if snapshot is not None:
+        # Vectorized filter/sort over the in-memory catalog
+        tags = {DATASET_TAG: snapshot.version}
+        page = snapshot.query(**paging, **filters)
+    else:
+        # Filtering and pagination happen in SQL; only one page of
+        # precomputed cards is loaded
+        tags = await cache.tag_versions_async([DATASET_TAG])
+        page = await async_db.query_policy_cards(**paging, **filters)
+
+    logger.info(f"Returning {len(page['policies'])} policies (total: {page['total']})")
+
+    # The body is encoded once here; cache hits serve these bytes as-is
+    page = {
+        "body": encode_body(page['policies']),
+        "total": page['total'],
+        "next_cursor": page['next_cursor'],
+        # Tagged with the version the page was built from
+        "etag": make_etag(tags[DATASET_TAG], *query_params) if DATASET_TAG in tags else None
+    }
+
+    # Cached until the dataset version changes
+    await cache.aset(cache_key, page, ttl=POLICY_CACHE_TTL_SECONDS, namespace="policies", tags=tags)
+    return page
+
 @app.get("/api/policies", response_model=List[Dict[str, Any]])
 async def get_policies(
+    request: Request,
     provider_name: Optional[str] = Query(None, description="Filter by provider name"),
     policy_category: Optional[str] = Query(None, description="Filter by policy category"),
     min_sum_insured: Optional[int] = Query(None, description="Minimum sum insured amount"),
     max_premium: Optional[float] = Query(None, description="Maximum premium amount"),
     maternity_required: Optional[bool] = Query(None, description="Filter by maternity coverage"),
     daycare_required: Optional[bool] = Query(None, description="Filter by daycare coverage"),
+    payment_mode: Optional[str] = Query(None, description="Filter by payment mode, e.g. Monthly"),
+    sort: str = Query("id", description=f"Sort order: {', '.join(POLICY_SORTS)}"),
     limit: Optional[int] = Query(100, description="Limit number of results"),
-    offset: Optional[int] = Query(0, description="Offset for pagination")
+    offset: Optional[int] = Query(0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; replaces offset"),
+    include_total: bool = Query(True, description="Count all matches and return X-Total-Count")
 ):
-    """Get all policies with optional filtering and pagination."""
+    """
+    Get all policies with optional filtering and pagination.
+
+    Pages by offset, or by keyset when `cursor` is given: pass the previous
+    response's X-Next-Cursor header to fetch the following page. The header
+    is absent on the last page.
+    """
     try:
-        logger.info(f"Fetching policies with filters: provider={provider_name}, category={policy_category}, limit={limit}, offset={offset}")
+        logger.info(f"Fetching policies with filters: provider={provider_name}, category={policy_category}, sort={sort}, limit={limit}, offset={offset}, cursor={cursor}")
+
+        if sort not in POLICY_SORTS:
+            raise HTTPException(status_code=400, detail=f"Unsupported sort '{sort}'. Use one of: {', '.join(POLICY_SORTS)}")
+        if cursor and offset:
+            raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+
+        def page_response(page: Dict[str, Any]) -> Response:
+            headers = {"Cache-Control": CATALOG_CACHE_CONTROL}
+            if page['total'] is not None:
+                headers["X-Total-Count"] = str(page['total'])
+            if page['next_cursor']:
+                headers["X-Next-Cursor"] = page['next_cursor']
+            return encoded_response(page['body'], request, headers=headers, etag=page['etag'])
+
+        params = policy_list_params(
+            provider_name=provider_name,
+            policy_category=policy_category,
+            min_sum_insured=min_sum_insured,
+            max_premium=max_premium,
+            maternity_required=maternity_required,
+            daycare_required=daycare_required,
+            payment_mode=payment_mode,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total
+        )
+        if cursor is None:
+            # Cursors go stale, so only cursor-less queries are replayed at startup
+            hot_keys.record_query(params)
+
+        # The listing is fully determined by the dataset version and the
+        # query, so a conditional request can be answered before any work
+        snapshot = await get_catalog_snapshot()
+        version = snapshot.version if snapshot is not None else await current_dataset_version()
+        if version is not None:
+            etag = make_etag(version, "policies", params)
+            if etag_matches(request, etag):
+                return not_modified_response(request, etag, {"Cache-Control": CATALOG_CACHE_CONTROL})
 
-        # Generate cache key from query parameters
-        cache_key = cache._make_key(("policies", provider_name, policy_category, min_sum_insured,
-                                      max_premium, maternity_required, daycare_required, limit, offset))
+        try:
+            page = await load_policies_page(params, snapshot)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        # Check cache first
-        cached_result = cache.get(cache_key)
-        if cached_result is not None:
-            logger.info(f"Returning {len(cached_result)} policies from cache")
-            return JSONResponse(
-                content=cached_result,
-                headers={
-                    "Cache-Control": "no-cache, no-store, must-revalidate",
-                    "Pragma": "no-cache",
-                    "Expires": "0"
-                }
-            )
-        if any([provider_name, policy_category, min_sum_insured, max_premium, maternity_required, daycare_required]):
-            policies = db.search_policies(
-                provider_name=provider_name,
-                policy_category=policy_category,
-                min_sum_insured=min_sum_insured,
-                max_premium=max_premium,
-                maternity_required=maternity_required,
-                daycare_required=daycare_required
-            )
-        else:
-            policies = db.get_all_policies()
-        
-        # Apply pagination
-        total_count = len(policies)
-        if offset:
-            policies = policies[offset:]
-        if limit:
-            policies = policies[:limit]
-
-        logger.info(f"Returning {len(policies)} policies (total: {total_count})")
-
-        # Transform to frontend-compatible format
-        frontend_policies = []
-        for policy in policies:
-            # Calculate a rating based on available data (mock calculation)
-            rating = calculate_policy_rating(policy)
-            
-            # Generate price range from sum insured options
-            price_range = generate_price_range(policy)
-            
-            frontend_policy = {
-                "id": policy['id'],
-                "type": "Health",  # All our policies are health policies
-                "company": policy['provider_name'],
-                "name": policy['plan_name'],
-                "shortDescription": generate_description(policy),
-                "priceRange": price_range,
-                "benefits": extract_benefits(policy),
-                "exclusions": extract_exclusions(policy),
-                "eligibility": extract_eligibility(policy),
-                "rating": rating,
-                "reviewsCount": generate_review_count(policy),
-                # Additional fields for detailed view
-                "product_uin": policy['product_uin'],
-                "policy_category": policy['policy_category'],
-                "sum_insured_options": policy['sum_insured_options'],
-                "payment_modes": policy['payment_modes'],
-                "network_hospitals": policy['network_hospitals_count'],
-                "claim_settlement_ratio": policy['claim_settlement_ratio'],
-                "solvency_ratio": policy['solvency_ratio'],
-                # Policy features from policy_features table
-                "hospital_network": policy.get('hospital_network'),
-                "room_rent": policy.get('room_rent'),
-                "copayment": policy.get('copayment'),
-                "restoration_benefit": policy.get('restoration_benefit'),
-                "pre_post_hospitalization_coverage": policy.get('pre_post_hospitalization_coverage'),
-                "waiting_period": policy.get('waiting_period'),
-                "no_claim_bonus": policy.get('no_claim_bonus'),
-                "disease_sub_limits": policy.get('disease_sub_limits'),
-                "alternate_treatment_coverage": policy.get('alternate_treatment_coverage'),
-                "maternity_care": policy.get('maternity_care'),
-                "newborn_care": policy.get('newborn_care'),
-                "health_checkups": policy.get('health_checkups'),
-                "domiciliary": policy.get('domiciliary'),
-                "outpatient_department": policy.get('outpatient_department'),
-                "lifelong_renewal": policy.get('lifelong_renewal'),
-                "critical_illness_rider": policy.get('critical_illness_rider'),
-                "accident_disability_rider": policy.get('accident_disability_rider')
-            }
-            frontend_policies.append(frontend_policy)
-
-        # Cache the result for 5 minutes
-        cache.set(cache_key, frontend_policies, ttl=300)
-
-        # Return with cache-busting headers to prevent browser caching
-        return JSONResponse(
-            content=frontend_policies,
-            headers={
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0"
-            }
-        )
+        return page_response(page)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching policies: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch policies: {str(e)}")
 
+# Declared before /api/policies/{policy_id} so "search" isn't taken as an id
+@app.get("/api/policies/search")
+async def search_policies_text(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=200, description="Search text"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of policies")
+):
+    """Ranked full-text search over policy names, section summaries and policy text."""
+    try:
+        cache_key = cache.make_key(("policy_search", q.strip().lower(), limit))
+        cached_body = await cache.aget(cache_key, namespace="policies")
+        if cached_body is not None:
+            return encoded_response(cached_body, request)
+
+        # Names come from policies, snippets from summaries and chunks
+        tags = await cache.tag_versions_async([DATASET_TAG, CONTENT_TAG])
+        results = await async_db.search_policy_text(q, limit=limit)
+        body = encode_body({"query": q, "count": len(results), "results": results})
+        await cache.aset(cache_key, body, ttl=POLICY_CACHE_TTL_SECONDS, namespace="policies", tags=tags)
+        return encoded_response(body, request)
+    except Exception as e:
+        logger.error(f"Error searching policies for '{q}': {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to search policies: {str(e)}")
+
+async def build_policy_detail(policy_id: str) -> Dict[str, Any]:
+    policy = await async_db.get_policy_by_id(policy_id)
+    if not policy:
+        logger.warning(f"Policy not found: {policy_id}")
+        raise HTTPException(status_code=404, detail=f"Policy with ID '{policy_id}' not found")
+
+    logger.info(f"Successfully retrieved policy: {policy.get('plan_name', 'Unknown')}")
+    # Return the complete policy data including raw JSON
+    return {
+        "policy": policy,
+        "raw_data": policy['raw_json']
+    }
+
+# Declared before /api/policies/{policy_id} so "semantic-search" isn't taken as an id
+@app.get("/api/policies/semantic-search")
+async def semantic_search_policies(
+    request: Request,
+    q: str = Query(..., min_length=3, max_length=500, description="Question or topic"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of policies"),
+    chunks_per_policy: int = Query(2, ge=1, le=5, description="Supporting chunks per policy"),
+    provider_name: Optional[str] = Query(None, description="Filter by provider name"),
+    policy_category: Optional[str] = Query(None, description="Filter by policy category"),
+    min_sum_insured: Optional[int] = Query(None, description="Minimum sum insured amount"),
+    max_premium: Optional[float] = Query(None, description="Maximum premium amount"),
+    maternity_required: Optional[bool] = Query(None, description="Filter by maternity coverage"),
+    daycare_required: Optional[bool] = Query(None, description="Filter by daycare coverage"),
+    payment_mode: Optional[str] = Query(None, description="Filter by payment mode, e.g. Monthly")
+):
+    """
+    Policies ranked by semantic similarity of their document chunks to the
+    question, e.g. "which plans cover bariatric surgery?", each with the
+    chunks that support the match. Filters narrow the catalog first.
+    """
+    try:
+        filters = dict(
+            provider_name=provider_name,
+            policy_category=policy_category,
+            min_sum_insured=min_sum_insured,
+            max_premium=max_premium,
+            maternity_required=maternity_required,
+            daycare_required=daycare_required,
+            payment_mode=payment_mode
+        )
+        cache_key = cache.make_key(("semantic_search", q.strip().lower(), limit, chunks_per_policy, filters))
+        cached_body = await cache.aget(cache_key, namespace="policies")
+        if cached_body is not None:
+            return encoded_response(cached_body, request)
+
+        # Cards of the policies the filters allow; also drops chunks of removed policies
+        tags = await cache.tag_versions_async([DATASET_TAG, CONTENT_TAG])
+        snapshot = await get_catalog_snapshot()
+        if snapshot is not None:
+            cards = snapshot.query(sort="id", include_total=False, **filters)["policies"]
+        else:
+            cards = (await async_db.query_policy_cards(sort="id", include_total=False, **filters))["policies"]
+        cards_by_id = {card["id"]: card for card in cards}
+
+        results = []
+        if cards_by_id:
+            results = await asyncio.to_thread(
+                gemini_service.semantic_search, q, limit, chunks_per_policy, list(cards_by_id)
+            )
+        for result in results:
+            result["policy"] = cards_by_id.get(result["policy_id"])
+
+        body = encode_body({"query": q, "count": len(results), "results": results})
+        # An empty result from an index that hasn't synced yet isn't worth keeping
+        if results or gemini_service.vector_index.ready:
+            await cache.aset(cache_key, body, ttl=POLICY_CACHE_TTL_SECONDS, namespace="policies", tags=tags)
+        return encoded_response(body, request)
+    except Exception as e:
+        logger.error(f"Error in semantic search for '{q}': {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to search policies: {str(e)}")
+
 @app.get("/api/policies/{policy_id}")
-async def get_policy(policy_id: str):
+async def get_policy(request: Request, policy_id: str):
     """Get a specific policy by ID."""
     try:
         logger.info(f"Fetching policy with ID: {policy_id}")
-        policy = db.get_policy_by_id(policy_id)
-        if not policy:
-            logger.warning(f"Policy not found: {policy_id}")
-            raise HTTPException(status_code=404, detail=f"Policy with ID '{policy_id}' not found")
+        hot_keys.record_policy(policy_id)
 
-        logger.info(f"Successfully retrieved policy: {policy.get('plan_name', 'Unknown')}")
-        # Return the complete policy data including raw JSON
-        return {
-            "policy": policy,
-            "raw_data": policy['raw_json']
-        }
+        return await catalog_response(request, [policy_tag(policy_id)], ("policy", policy_id),
+                                      lambda: build_policy_detail(policy_id))
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching policy {policy_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch policy: {str(e)}")
 
+# Dataset-wide payloads: cache parameters and builder
+CATALOG_FACETS = {
+    "statistics": (("statistics",), lambda: async_db.get_policy_statistics()),
+    "providers": (("providers",), lambda: async_db.get_facet_values("provider_name")),
+    "categories": (("categories",), lambda: async_db.get_facet_values("policy_category"))
+}
+
 @app.get("/api/statistics")
-async def get_statistics():
+async def get_statistics(request: Request):
     """Get database statistics."""
     try:
-        return db.get_policy_statistics()
+        return await catalog_response(request, [DATASET_TAG], *CATALOG_FACETS["statistics"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/providers")
-async def get_providers():
+async def get_providers(request: Request):
     """Get list of all providers."""
     try:
-        policies = db.get_all_policies()
-        providers = list(set(policy['provider_name'] for policy in policies))
-        return sorted(providers)
+        return await catalog_response(request, [DATASET_TAG], *CATALOG_FACETS["providers"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get list of all policy categories."""
     try:
-        policies = db.get_all_policies()
-        categories = list(set(policy['policy_category'] for policy in policies))
-        return sorted(categories)
+        return await catalog_response(request, [DATASET_TAG], *CATALOG_FACETS["categories"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Helper functions to transform database data to frontend format
-def calculate_policy_rating(policy: Dict[str, Any]) -> float:
-    """Calculate a policy rating based on available features."""
-    rating = 3.0  # Base rating
-    
-    # Boost rating based on features
-    if policy['claim_settlement_ratio'] > 90:
-        rating += 0.5
-    elif policy['claim_settlement_ratio'] > 85:
-        rating += 0.3
-    
-    if policy['network_hospitals_count'] > 10000:
-        rating += 0.3
-    elif policy['network_hospitals_count'] > 5000:
-        rating += 0.2
-    
-    if policy['maternity_covered']:
-        rating += 0.2
-    
-    if policy['daycare_covered']:
-        rating += 0.2
-    
-    if policy['no_claim_bonus_available']:
-        rating += 0.2
-    
-    if policy['restoration_benefit_available']:
-        rating += 0.3
-    
-    if policy['ambulance_covered']:
-        rating += 0.1
-    
-    # Cap at 5.0
-    return min(5.0, rating)
-
-def generate_price_range(policy: Dict[str, Any]) -> str:
-    """Generate a price range string based on sum insured options."""
-    if policy['sum_insured_options']:
-        try:
-            # Convert all values to int (handles both int and string inputs)
-            coverage_values = [int(x) if isinstance(x, (int, float)) else int(str(x).replace(',', ''))
-                             for x in policy['sum_insured_options'] if x]
-
-            if coverage_values:
-                min_coverage = min(coverage_values)
-                max_coverage = max(coverage_values)
-
-                # Rough estimation: premium is typically 1-3% of sum insured
-                min_premium = int(min_coverage * 0.01)
-                max_premium = int(max_coverage * 0.03)
-
-                return f"₹{min_premium:,} - ₹{max_premium:,} / year"
-        except (ValueError, TypeError):
-            pass
-
-    return "₹5,000 - ₹50,000 / year"
-
-def generate_description(policy: Dict[str, Any]) -> str:
-    """Generate a short description for the policy."""
-    category = policy['policy_category'].lower()
-    features = []
-    
-    if policy['maternity_covered']:
-        features.append("maternity coverage")
-    if policy['daycare_covered']:
-        features.append("daycare procedures")
-    if policy['restoration_benefit_available']:
-        features.append("restoration benefit")
-    
-    if features:
-        return f"Comprehensive {category} health insurance with {', '.join(features[:2])}."
-    else:
-        return f"Reliable {category} health insurance plan with essential coverage."
-
-def extract_benefits(policy: Dict[str, Any]) -> List[str]:
-    """Extract benefits from policy data."""
-    benefits = []
-    
-    if policy['claim_settlement_ratio'] > 0:
-        benefits.append(f"Claim Settlement Ratio: {policy['claim_settlement_ratio']:.1f}%")
-    
-    if policy['network_hospitals_count'] > 0:
-        benefits.append(f"Network Hospitals: {policy['network_hospitals_count']:,}")
-    
-    if policy['room_rent_description']:
-        benefits.append(f"Room Rent: {policy['room_rent_description']}")
-    
-    if policy['pre_hospitalization_days'] > 0:
-        benefits.append(f"Pre-hospitalization: {policy['pre_hospitalization_days']} days")
-    
-    if policy['post_hospitalization_days'] > 0:
-        benefits.append(f"Post-hospitalization: {policy['post_hospitalization_days']} days")
-    
-    if policy['ambulance_covered'] and policy['ambulance_limit'] > 0:
-        benefits.append(f"Ambulance Cover: ₹{policy['ambulance_limit']:,}")
-    
-    # Add more benefits as needed
-    return benefits[:6]  # Limit to 6 benefits
-
-def extract_exclusions(policy: Dict[str, Any]) -> List[str]:
-    """Extract exclusions/waiting periods from policy data."""
-    exclusions = []
-    
-    if policy['waiting_period_initial'] > 0:
-        exclusions.append(f"Initial waiting period: {policy['waiting_period_initial']} days")
-    
-    if policy['waiting_period_pre_existing'] > 0:
-        exclusions.append(f"Pre-existing diseases: {policy['waiting_period_pre_existing']} years")
-    
-    if policy['waiting_period_specific_ailments'] > 0:
-        exclusions.append(f"Specific ailments: {policy['waiting_period_specific_ailments']} years")
-    
-    if policy['co_payment_applicable'] and policy['co_payment_details']:
-        exclusions.append(f"Co-payment: {policy['co_payment_details']}")
-    
-    if policy['maternity_waiting_period'] > 0:
-        exclusions.append(f"Maternity waiting period: {policy['maternity_waiting_period']} months")
-    
-    # Add standard exclusions
-    exclusions.extend([
-        "Pre-existing conditions (as per waiting period)",
-        "Cosmetic treatments",
-        "Dental treatments (unless due to accident)"
-    ])
-    
-    return exclusions[:6]  # Limit to 6 exclusions
-
-def extract_eligibility(policy: Dict[str, Any]) -> List[str]:
-    """Extract eligibility/additional features from policy data."""
-    eligibility = []
-    
-    if policy['daycare_covered']:
-        eligibility.append("Day-care procedures covered")
-    
-    if policy['maternity_covered']:
-        eligibility.append("Maternity benefits available")
-    
-    if policy['no_claim_bonus_available']:
-        eligibility.append("No Claim Bonus")
-    
-    if policy['restoration_benefit_available']:
-        eligibility.append("Sum Insured Restoration")
-    
-    if policy['is_tax_benefit_eligible']:
-        eligibility.append("Tax benefits under 80D")
-    
-    if policy['payment_modes']:
-        modes = ", ".join(policy['payment_modes'][:3])  # Show first 3 modes
-        eligibility.append(f"Payment modes: {modes}")
-    
-    return eligibility[:5]  # Limit to 5 eligibility items
-
-def generate_review_count(policy: Dict[str, Any]) -> int:
-    """Generate a mock review count based on policy features."""
-    base_count = 500
-    
-    # More features = more reviews
-    if policy['maternity_covered']:
-        base_count += 200
-    if policy['daycare_covered']:
-        base_count += 150
-    if policy['restoration_benefit_available']:
-        base_count += 300
-    if policy['network_hospitals_count'] > 10000:
-        base_count += 500
-    
-    return base_count
+async def warm_caches() -> None:
+    """
+    Background warmup after startup: the default policy listing and facets,
+    listings and policies that were hot on the previous instance, and the
+    retrieval models for answering questions.
+    """
+    async def warm_listings():
+        snapshot = await get_catalog_snapshot()
+        queries = [policy_list_params()] + hot_keys.top_queries(WARMUP_TOP_QUERIES)
+        warmed = 0
+        for params in {cache.make_key(q): q for q in queries}.values():
+            try:
+                await load_policies_page(policy_list_params(**params), snapshot)
+                warmed += 1
+            except ValueError as e:
+                logger.debug(f"Skipping recorded policy listing {params}: {str(e)}")
+        return warmed
+
+    async def warm_facets():
+        for params, build in CATALOG_FACETS.values():
+            await load_catalog_body([DATASET_TAG], params, build)
+        return len(CATALOG_FACETS)
+
+    async def warm_policies():
+        warmed = 0
+        for policy_id in hot_keys.top_policies(WARMUP_TOP_POLICIES):
+            try:
+                await load_catalog_body([policy_tag(policy_id)], ("policy", policy_id),
+                                        lambda: build_policy_detail(policy_id))
+                warmed += 1
+            except HTTPException:
+                # Removed since the state file was written
+                continue
+        return warmed
+
+    async def warm_retrieval():
+        policy_ids = hot_keys.top_policies(WARMUP_TOP_POLICIES)
+        return await asyncio.to_thread(gemini_service.warm_up, policy_ids, WARMUP_LOAD_MODELS)
+
+    warmer.add("policy_listings", warm_listings)
+    warmer.add("facets", warm_facets)
+    warmer.add("hot_policies", warm_policies)
+    warmer.add("retrieval", warm_retrieval)
+    await warmer.run()
 
 def format_gemini_response(text: str) -> str:
     """
@@ -565,6 +691,7 @@ async def ask_policy_question(request: GeminiQuestionRequest):
     """
     try:
         logger.info(f"Gemini question for policy {request.policy_id}: '{request.question[:100]}...'")
+        hot_keys.record_policy(request.policy_id)
 
         result = await gemini_service.ask_policy_question(
             policy_id=request.policy_id,
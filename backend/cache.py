@@ -1,97 +1,994 @@
 """
-Simple in-memory caching layer for API responses
+Caching layer for API responses: a bounded in-process tier in front of an
+optional SQLite tier shared by all workers on the host
 """
-from typing import Any, Optional
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from functools import wraps
+import asyncio
 import hashlib
+import heapq
 import json
 import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Per-namespace limits: (max entries, max approximate bytes)
+CACHE_NAMESPACE_LIMITS = {
+    "default": (
+        int(os.getenv("CACHE_DEFAULT_MAX_ENTRIES", "1024")),
+        int(os.getenv("CACHE_DEFAULT_MAX_BYTES", str(16 * 1024 * 1024))),
+    ),
+    # Policy listing pages and search results
+    "policies": (
+        int(os.getenv("CACHE_POLICIES_MAX_ENTRIES", "512")),
+        int(os.getenv("CACHE_POLICIES_MAX_BYTES", str(64 * 1024 * 1024))),
+    ),
+    # Gemini answers
+    "gemini": (
+        int(os.getenv("CACHE_GEMINI_MAX_ENTRIES", "2048")),
+        int(os.getenv("CACHE_GEMINI_MAX_BYTES", str(32 * 1024 * 1024))),
+    ),
+}
 
-class SimpleCache:
-    """Simple in-memory cache with TTL support"""
+# Background sweeper: how often it runs and how many entries one pass may remove
+CACHE_SWEEP_INTERVAL_SECONDS = float(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "5"))
+CACHE_SWEEP_BATCH = int(os.getenv("CACHE_SWEEP_BATCH", "256"))
 
-    def __init__(self, default_ttl: int = 300):
+# "memory", "sqlite" or "tiered" (memory in front of the shared SQLite file)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "tiered")
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cache.db")
+# How stale another worker's delete/clear may be in this worker's memory tier
+CACHE_INVALIDATION_POLL_SECONDS = float(os.getenv("CACHE_INVALIDATION_POLL_SECONDS", "0.5"))
+CACHE_INVALIDATION_RETENTION_SECONDS = 3600
+CACHE_SQLITE_BUSY_TIMEOUT_MS = 2000
+CACHE_SQLITE_EVICTION_BATCH = 16
+# How long a looked-up tag version is trusted before asking the version source again
+CACHE_TAG_CHECK_SECONDS = float(os.getenv("CACHE_TAG_CHECK_SECONDS", "0.5"))
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Approximate memory footprint of a cached value in bytes.
+
+    Walks dicts, lists, tuples and sets with sys.getsizeof; objects shared
+    within the value are counted once.
+    """
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+class _Namespace:
+    """
+    LRU-ordered entries of one namespace with their limits and counters.
+
+    Removal times sit in a min-heap next to the LRU order, so expired entries
+    are found in O(log n). An entry stops being fresh at fresh_until but is
+    kept until expires_at, so stale-while-revalidate reads can still use it.
+    Heap items are not removed when an entry is overwritten, evicted or
+    deleted; they are skipped when popped and the heap is rebuilt if such
+    stale items pile up.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, fresh_until, size, expires_at); least recently used first
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # (expires_at, key) min-heap
+        self.expiry_heap: list = []
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+        # Stale entries served while a refresh runs
+        self.stale_hits = 0
+
+    def add(self, key: str, value: Any, fresh_until: float, size: int, expires_at: float) -> None:
+        self.entries[key] = (value, fresh_until, size, expires_at)
+        self.bytes += size
+        heapq.heappush(self.expiry_heap, (expires_at, key))
+        if len(self.expiry_heap) > 2 * len(self.entries) + 64:
+            self.expiry_heap = [(entry[3], k) for k, entry in self.entries.items()]
+            heapq.heapify(self.expiry_heap)
+
+    def remove(self, key: str) -> None:
+        size = self.entries.pop(key)[2]
+        self.bytes -= size
+
+    def evict_to_fit(self) -> None:
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            key, entry = self.entries.popitem(last=False)
+            self.bytes -= entry[2]
+            self.evictions += 1
+            logger.debug(f"Cache EVICT [{self.name}] key: {key[:16]}...")
+
+    def expire(self, now: float, limit: Optional[int] = None) -> int:
+        """Remove up to `limit` entries whose expiry is at or before `now`."""
+        removed = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            expires_at, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            # Skip items left behind by overwrites, evictions and deletes
+            if entry is not None and entry[3] == expires_at:
+                self.remove(key)
+                self.expirations += 1
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+            "stale_hits": self.stale_hits
+        }
+
+
+class CacheRecord(NamedTuple):
+    """What TieredCache stores in its tiers: the value and the tag versions it was computed at."""
+    value: Any
+    tags: Optional[Dict[str, int]] = None
+
+
+class CacheBackend(ABC):
+    """
+    Storage tier of a TieredCache.
+
+    Times handed across the interface are relative (seconds from now), so
+    tiers with different clocks can pass entries between each other.
+    """
+
+    name = "backend"
+
+    @abstractmethod
+    def lookup(self, key: str, namespace: str = "default", allow_stale: bool = False) -> Optional[tuple]:
+        """
+        Returns:
+            (value, fresh_for, expires_in) in seconds, or None on a miss.
+            Entries past their TTL (fresh_for <= 0) are only returned with
+            allow_stale.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float, namespace: str = "default",
+            stale_ttl: float = 0) -> None:
+        """Store a value that is fresh for `ttl` seconds and kept `stale_ttl` longer."""
+
+    @abstractmethod
+    def delete(self, key: str, namespace: str = "default") -> None:
+        """Remove one entry."""
+
+    @abstractmethod
+    def clear(self) -> int:
+        """Remove every entry and return how many were removed."""
+
+    @abstractmethod
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """Remove up to `limit` expired entries (per namespace where it applies)."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Counters for this tier."""
+
+    def invalidations(self) -> List[tuple]:
+        """
+        (namespace, key) pairs deleted by other processes since the last call;
+        (None, None) means everything was cleared. Process-local tiers have
+        nothing to report.
+        """
+        return []
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-memory tier with TTL, LRU eviction and per-namespace limits.
+
+    Every namespace caps its entry count and approximate byte size; when a
+    set pushes it over either limit, least recently used entries are evicted.
+    Values larger than the namespace byte limit are not cached. Expired
+    entries are dropped when read or swept. Times come from the monotonic
+    clock.
+    """
+
+    name = "memory"
+
+    def __init__(self, namespace_limits: Optional[Dict[str, tuple]] = None):
+        """
+        Args:
+            namespace_limits: {namespace: (max_entries, max_bytes)}; must
+                include "default", which unknown namespaces fall back to
+        """
+        self.namespace_limits = dict(namespace_limits or CACHE_NAMESPACE_LIMITS)
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.RLock()
+
+    def _namespace(self, name: str) -> _Namespace:
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            max_entries, max_bytes = self.namespace_limits.get(name, self.namespace_limits["default"])
+            namespace = self._namespaces[name] = _Namespace(name, max_entries, max_bytes)
+        return namespace
+
+    def lookup(self, key: str, namespace: str = "default", allow_stale: bool = False) -> Optional[tuple]:
+        with self._lock:
+            ns = self._namespace(namespace)
+            entry = ns.entries.get(key)
+            if entry is not None:
+                value, fresh_until, _, expires_at = entry
+                now = time.monotonic()
+                if now < fresh_until:
+                    ns.entries.move_to_end(key)
+                    ns.hits += 1
+                    logger.debug(f"Cache HIT for key: {key[:16]}...")
+                    return value, fresh_until - now, expires_at - now
+                if now < expires_at:
+                    if allow_stale:
+                        ns.entries.move_to_end(key)
+                        ns.stale_hits += 1
+                        logger.debug(f"Cache STALE HIT for key: {key[:16]}...")
+                        return value, fresh_until - now, expires_at - now
+                else:
+                    # Remove expired entry
+                    ns.remove(key)
+                    ns.expirations += 1
+                    logger.debug(f"Cache EXPIRED for key: {key[:16]}...")
+            else:
+                logger.debug(f"Cache MISS for key: {key[:16]}...")
+            ns.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: float, namespace: str = "default",
+            stale_ttl: float = 0) -> None:
+        fresh_until = time.monotonic() + ttl
+        size = approximate_size(value) + sys.getsizeof(key)
+        with self._lock:
+            ns = self._namespace(namespace)
+            if key in ns.entries:
+                ns.remove(key)
+            if size > ns.max_bytes:
+                ns.rejected += 1
+                logger.warning(f"Cache value for key {key[:16]}... ({size} bytes) exceeds the '{namespace}' limit")
+                return
+            ns.add(key, value, fresh_until, size, fresh_until + stale_ttl)
+            ns.evict_to_fit()
+        logger.debug(f"Cache SET for key: {key[:16]}... (TTL: {ttl}s, {size} bytes)")
+
+    def delete(self, key: str, namespace: str = "default") -> None:
+        with self._lock:
+            ns = self._namespace(namespace)
+            if key in ns.entries:
+                ns.remove(key)
+                logger.debug(f"Cache DELETE for key: {key[:16]}...")
+
+    def clear(self) -> int:
+        with self._lock:
+            count = 0
+            for ns in self._namespaces.values():
+                count += len(ns.entries)
+                ns.entries.clear()
+                ns.expiry_heap.clear()
+                ns.bytes = 0
+        return count
+
+    def sweep(self, limit: Optional[int] = None) -> int:
+        now = time.monotonic()
+        removed = 0
+        for ns in list(self._namespaces.values()):
+            with self._lock:
+                removed += ns.expire(now, limit)
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = {name: ns.stats() for name, ns in self._namespaces.items()}
+        totals = {
+            field: sum(ns[field] for ns in namespaces.values())
+            for field in ("bytes", "hits", "misses", "evictions", "expirations", "stale_hits")
+        }
+        return {
+            "total_entries": sum(ns["entries"] for ns in namespaces.values()),
+            **totals,
+            "namespaces": namespaces
+        }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache tier in an SQLite file shared by every worker process on the host.
+
+    Values are pickled. Per-namespace entry counts and byte totals live in
+    cache_usage, kept by triggers, so limit checks and stats never scan the
+    entries. Over a limit, the entries closest to expiry are evicted (reads
+    don't write, so there is no LRU order across processes). Deletes and
+    clears are appended to cache_invalidations, which other workers poll to
+    drop the copies in their memory tier.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str = "cache.db", namespace_limits: Optional[Dict[str, tuple]] = None):
+        self.db_path = db_path
+        self.namespace_limits = dict(namespace_limits or CACHE_NAMESPACE_LIMITS)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Per-process counters, guarded by _lock
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fresh_until REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_entries_expiry ON cache_entries(expires_at);
+            CREATE INDEX IF NOT EXISTS idx_cache_entries_namespace_expiry ON cache_entries(namespace, expires_at);
+
+            CREATE TABLE IF NOT EXISTS cache_usage (
+                namespace TEXT PRIMARY KEY,
+                entries INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS trg_cache_entries_insert AFTER INSERT ON cache_entries
+            BEGIN
+                INSERT INTO cache_usage (namespace, entries, bytes) VALUES (NEW.namespace, 1, NEW.size)
+                ON CONFLICT(namespace) DO UPDATE SET entries = entries + 1, bytes = bytes + NEW.size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_cache_entries_delete AFTER DELETE ON cache_entries
+            BEGIN
+                UPDATE cache_usage SET entries = entries - 1, bytes = bytes - OLD.size
+                WHERE namespace = OLD.namespace;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_cache_entries_update AFTER UPDATE OF size ON cache_entries
+            BEGIN
+                UPDATE cache_usage SET bytes = bytes - OLD.size + NEW.size
+                WHERE namespace = NEW.namespace;
+            END;
+
+            CREATE TABLE IF NOT EXISTS cache_invalidations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                namespace TEXT,
+                key TEXT,
+                pid INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+        """)
+        row = conn.execute("SELECT MAX(seq) FROM cache_invalidations").fetchone()
+        # Only invalidations made after this process started matter
+        self._last_seq = row[0] or 0
+
+    def _conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; each statement is its own short transaction
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA busy_timeout = {CACHE_SQLITE_BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, namespace: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(namespace, dict.fromkeys(
+                ("hits", "misses", "stale_hits", "evictions", "expirations", "rejected"), 0))
+            counters[counter] += amount
+
+    def _log_invalidation(self, conn: sqlite3.Connection, namespace: Optional[str], key: Optional[str]) -> None:
+        conn.execute(
+            "INSERT INTO cache_invalidations (namespace, key, pid, created_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, os.getpid(), time.time())
+        )
+
+    def lookup(self, key: str, namespace: str = "default", allow_stale: bool = False) -> Optional[tuple]:
+        row = self._conn().execute(
+            "SELECT value, fresh_until, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        now = time.time()
+        if row is None or now >= row[2]:
+            # Expired rows are left to sweep(), which batches the deletes
+            self._count(namespace, "misses")
+            return None
+        value_blob, fresh_until, expires_at = row
+        if now >= fresh_until:
+            if not allow_stale:
+                self._count(namespace, "misses")
+                return None
+            self._count(namespace, "stale_hits")
+        else:
+            self._count(namespace, "hits")
+        return pickle.loads(value_blob), fresh_until - now, expires_at - now
+
+    def set(self, key: str, value: Any, ttl: float, namespace: str = "default",
+            stale_ttl: float = 0) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        max_entries, max_bytes = self.namespace_limits.get(namespace, self.namespace_limits["default"])
+        if len(blob) > max_bytes:
+            self._count(namespace, "rejected")
+            logger.warning(f"Cache value for key {key[:16]}... ({len(blob)} bytes) exceeds the '{namespace}' limit")
+            return
+
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                INSERT INTO cache_entries (namespace, key, value, size, fresh_until, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(namespace, key) DO UPDATE SET
+                    value = excluded.value, size = excluded.size,
+                    fresh_until = excluded.fresh_until, expires_at = excluded.expires_at
+            """, (namespace, key, blob, len(blob), now + ttl, now + ttl + stale_ttl))
+
+            evicted = 0
+            while True:
+                entries, used = conn.execute(
+                    "SELECT entries, bytes FROM cache_usage WHERE namespace = ?", (namespace,)
+                ).fetchone()
+                if entries <= max_entries and used <= max_bytes:
+                    break
+                batch = max(entries - max_entries, CACHE_SQLITE_EVICTION_BATCH)
+                deleted = conn.execute("""
+                    DELETE FROM cache_entries WHERE rowid IN (
+                        SELECT rowid FROM cache_entries
+                        WHERE namespace = ? AND key != ?
+                        ORDER BY expires_at LIMIT ?
+                    )
+                """, (namespace, key, batch)).rowcount
+                evicted += deleted
+                if not deleted:
+                    break
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if evicted:
+            self._count(namespace, "evictions", evicted)
+
+    def delete(self, key: str, namespace: str = "default") -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._log_invalidation(conn, namespace, key)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            count = conn.execute("DELETE FROM cache_entries").rowcount
+            self._log_invalidation(conn, None, None)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def sweep(self, limit: Optional[int] = None) -> int:
+        now = time.time()
+        conn = self._conn()
+        namespaces = [row[0] for row in conn.execute("""
+            DELETE FROM cache_entries WHERE rowid IN (
+                SELECT rowid FROM cache_entries WHERE expires_at <= ? LIMIT ?
+            )
+            RETURNING namespace
+        """, (now, limit if limit is not None else -1)).fetchall()]
+        for namespace in set(namespaces):
+            self._count(namespace, "expirations", namespaces.count(namespace))
+        conn.execute(
+            "DELETE FROM cache_invalidations WHERE created_at < ?",
+            (now - CACHE_INVALIDATION_RETENTION_SECONDS,)
+        )
+        return len(namespaces)
+
+    def invalidations(self) -> List[tuple]:
+        rows = self._conn().execute(
+            "SELECT seq, namespace, key, pid FROM cache_invalidations WHERE seq > ? ORDER BY seq",
+            (self._last_seq,)
+        ).fetchall()
+        if not rows:
+            return []
+        self._last_seq = rows[-1][0]
+        pid = os.getpid()
+        return [(namespace, key) for _, namespace, key, origin in rows if origin != pid]
+
+    def stats(self) -> dict:
+        usage = {
+            namespace: {"entries": entries, "bytes": used}
+            for namespace, entries, used in self._conn().execute(
+                "SELECT namespace, entries, bytes FROM cache_usage"
+            )
+        }
+        with self._lock:
+            counters = {namespace: dict(values) for namespace, values in self._counters.items()}
+        namespaces = {
+            namespace: {
+                **usage.get(namespace, {"entries": 0, "bytes": 0}),
+                **counters.get(namespace, {})
+            }
+            for namespace in usage.keys() | counters.keys()
+        }
+        return {
+            "path": self.db_path,
+            "total_entries": sum(ns["entries"] for ns in namespaces.values()),
+            **{
+                field: sum(ns.get(field, 0) for ns in namespaces.values())
+                for field in ("bytes", "hits", "misses", "evictions", "expirations", "stale_hits")
+            },
+            "namespaces": namespaces
+        }
+
+
+class TieredCache:
+    """
+    Cache front end over an optional in-process memory tier (L1) and an
+    optional shared tier (L2, e.g. SQLiteCacheBackend).
+
+    Reads try L1, then L2, and copy L2 hits into L1. Writes go to both.
+    Deletes and clears made by other workers are picked up from L2 at most
+    every CACHE_INVALIDATION_POLL_SECONDS and applied to L1.
+
+    Entries can carry tags, e.g. {"policy:abc": 7}: the versions of the data
+    they were computed from. With a version source installed, a hit whose
+    tag versions have moved on is treated as a miss, so data changes
+    invalidate exactly the entries built from that data.
+
+    get_or_compute() adds single-flight semantics for async callers:
+    concurrent misses on one key share a single computation. Async callers
+    use aget()/aset()/get_or_compute(), which run L2 calls on a worker
+    thread; only L1 is touched on the event loop.
+    """
+
+    def __init__(self, default_ttl: int = 300,
+                 l1: Optional[MemoryCacheBackend] = None,
+                 l2: Optional[CacheBackend] = None,
+                 invalidation_poll_interval: float = CACHE_INVALIDATION_POLL_SECONDS):
         """
         Initialize cache
 
         Args:
             default_ttl: Default time-to-live in seconds (default: 5 minutes)
+            l1: Process-local tier
+            l2: Shared tier
+            invalidation_poll_interval: Seconds between checks of L2's
+                invalidation log
         """
-        self.cache = {}
+        if l1 is None and l2 is None:
+            l1 = MemoryCacheBackend()
         self.default_ttl = default_ttl
+        self.l1 = l1
+        self.l2 = l2
+        self.invalidation_poll_interval = invalidation_poll_interval
+        self._last_poll = time.monotonic()
+        # (namespace, key) -> task computing its value; event loop only
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self.coalesced = 0
+        self.l2_errors = 0
+        self.tag_invalidations = 0
+        self._version_source: Optional[Callable[[List[str]], Dict[str, int]]] = None
+        # tag -> (version, monotonic time it was read)
+        self._tag_versions: Dict[str, tuple] = {}
+        self._tag_lock = threading.Lock()
 
-    def _make_key(self, key_parts: tuple) -> str:
+    def make_key(self, key_parts: tuple) -> str:
         """Generate cache key from tuple of parts"""
         key_str = json.dumps(key_parts, sort_keys=True)
         return hashlib.md5(key_str.encode()).hexdigest()
 
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache if not expired"""
-        if key in self.cache:
-            value, expiry = self.cache[key]
-            if datetime.utcnow() < expiry:
-                logger.debug(f"Cache HIT for key: {key[:16]}...")
-                return value
+    def _l2_call(self, method: str, *args, default: Any = None, **kwargs) -> Any:
+        """Call the shared tier; its failures degrade to a miss instead of an error."""
+        try:
+            return getattr(self.l2, method)(*args, **kwargs)
+        except (sqlite3.Error, pickle.PickleError, OSError) as e:
+            self.l2_errors += 1
+            logger.warning(f"Shared cache {method} failed: {str(e)}")
+            return default
+
+    async def _l2_call_async(self, method: str, *args, default: Any = None, **kwargs) -> Any:
+        """_l2_call on a worker thread, keeping SQLite I/O and pickling off the event loop."""
+        return await asyncio.to_thread(self._l2_call, method, *args, default=default, **kwargs)
+
+    def _invalidations_due(self, force: bool) -> bool:
+        if self.l1 is None or self.l2 is None:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.invalidation_poll_interval:
+            return False
+        self._last_poll = now
+        return True
+
+    def sync_invalidations(self, force: bool = False) -> int:
+        """Apply deletes and clears made by other workers to L1; returns how many were applied."""
+        if not self._invalidations_due(force):
+            return 0
+        return self._apply_invalidations(self._l2_call("invalidations", default=[]))
+
+    async def sync_invalidations_async(self, force: bool = False) -> int:
+        """sync_invalidations, reading the log off the event loop."""
+        if not self._invalidations_due(force):
+            return 0
+        return self._apply_invalidations(await self._l2_call_async("invalidations", default=[]))
+
+    def _apply_invalidations(self, changes: List[tuple]) -> int:
+        for namespace, key in changes:
+            if namespace is None:
+                self.l1.clear()
             else:
-                # Remove expired entry
-                del self.cache[key]
-                logger.debug(f"Cache EXPIRED for key: {key[:16]}...")
-        else:
-            logger.debug(f"Cache MISS for key: {key[:16]}...")
-        return None
+                self.l1.delete(key, namespace)
+        return len(changes)
+
+    def set_version_source(self, source: Optional[Callable[[List[str]], Dict[str, int]]]) -> None:
+        """Install the callable mapping tags to their current versions (None disables tag checks)."""
+        with self._tag_lock:
+            self._version_source = source
+            self._tag_versions.clear()
+
+    def tag_versions(self, tags: List[str]) -> Dict[str, int]:
+        """
+        Current versions of `tags`, trusted for CACHE_TAG_CHECK_SECONDS.
+
+        Read them before computing a value and store them with it, so a
+        change made during the computation invalidates the result.
+        """
+        source = self._version_source
+        if source is None or not tags:
+            return {}
+        now = time.monotonic()
+        known, missing = self._remembered_versions(tags, now)
+        if missing:
+            self._remember_versions(missing, source(missing), now, known)
+        return known
+
+    async def tag_versions_async(self, tags: List[str]) -> Dict[str, int]:
+        """tag_versions() for async callers; the version source runs on a worker thread."""
+        source = self._version_source
+        if source is None or not tags:
+            return {}
+        now = time.monotonic()
+        known, missing = self._remembered_versions(tags, now)
+        if missing:
+            self._remember_versions(missing, await asyncio.to_thread(source, missing), now, known)
+        return known
+
+    def _remembered_versions(self, tags: List[str], now: float) -> tuple:
+        """(versions still trusted, tags to fetch)"""
+        with self._tag_lock:
+            known = {
+                tag: entry[0] for tag in tags
+                if (entry := self._tag_versions.get(tag)) is not None and now - entry[1] < CACHE_TAG_CHECK_SECONDS
+            }
+        return known, [tag for tag in tags if tag not in known]
+
+    def _remember_versions(self, missing: List[str], fetched: Dict[str, int], now: float,
+                           known: Dict[str, int]) -> None:
+        with self._tag_lock:
+            for tag in missing:
+                self._tag_versions[tag] = (fetched.get(tag, 0), now)
+                known[tag] = fetched.get(tag, 0)
+
+    def _tags_current(self, tags: Optional[Dict[str, int]]) -> bool:
+        if not tags or self._version_source is None:
+            return True
+        try:
+            return self.tag_versions(list(tags)) == tags
+        except Exception as e:
+            # Can't confirm the entry is current; recompute rather than risk stale data
+            logger.warning(f"Cache tag check failed: {str(e)}")
+            return False
+
+    async def _tags_current_async(self, tags: Optional[Dict[str, int]]) -> bool:
+        if not tags or self._version_source is None:
+            return True
+        try:
+            return await self.tag_versions_async(list(tags)) == tags
+        except Exception as e:
+            logger.warning(f"Cache tag check failed: {str(e)}")
+            return False
+
+    def _lookup(self, key: str, namespace: str, allow_stale: bool = False) -> tuple:
+        """
+        Returns:
+            (found, value, fresh); stale entries are only returned with allow_stale
+        """
+        self.sync_invalidations()
+        entry = self.l1.lookup(key, namespace, allow_stale) if self.l1 else None
+        if entry is None and self.l2 is not None:
+            entry = self._l2_call("lookup", key, namespace, allow_stale)
+            self._promote(key, namespace, entry)
+        record, fresh = self._unwrap(entry)
+        if record is None:
+            return False, None, False
+        if not self._tags_current(record.tags):
+            return self._outdated(key, namespace)
+        return True, record.value, fresh
+
+    async def _lookup_async(self, key: str, namespace: str, allow_stale: bool = False) -> tuple:
+        """_lookup with the L2 read on a worker thread."""
+        await self.sync_invalidations_async()
+        entry = self.l1.lookup(key, namespace, allow_stale) if self.l1 else None
+        if entry is None and self.l2 is not None:
+            entry = await self._l2_call_async("lookup", key, namespace, allow_stale)
+            self._promote(key, namespace, entry)
+        record, fresh = self._unwrap(entry)
+        if record is None:
+            return False, None, False
+        if not await self._tags_current_async(record.tags):
+            return self._outdated(key, namespace)
+        return True, record.value, fresh
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set value in cache with TTL"""
+    def _promote(self, key: str, namespace: str, entry: Optional[tuple]) -> None:
+        """Copy a fresh L2 hit into L1."""
+        if entry is not None and self.l1 is not None and entry[1] > 0:
+            record, fresh_for, expires_in = entry
+            self.l1.set(key, record, fresh_for, namespace, stale_ttl=expires_in - fresh_for)
+
+    @staticmethod
+    def _unwrap(entry: Optional[tuple]) -> tuple:
+        """(CacheRecord or None, fresh) of a tier lookup result"""
+        if entry is None:
+            return None, False
+        record, fresh_for, _ = entry
+        if not isinstance(record, CacheRecord):
+            # Entry written before values were wrapped
+            record = CacheRecord(record)
+        return record, fresh_for > 0
+
+    def _outdated(self, key: str, namespace: str) -> tuple:
+        # Built from data that has since changed; stale copies aren't served either
+        self.tag_invalidations += 1
+        if self.l1 is not None:
+            self.l1.delete(key, namespace)
+        logger.debug(f"Cache TAG MISMATCH for key: {key[:16]}...")
+        return False, None, False
+
+    def get(self, key: str, namespace: str = "default") -> Optional[Any]:
+        """Get value from cache if not expired"""
+        return self._lookup(key, namespace)[1]
+
+    async def aget(self, key: str, namespace: str = "default") -> Optional[Any]:
+        """get() for async callers"""
+        return (await self._lookup_async(key, namespace))[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, namespace: str = "default",
+            stale_ttl: float = 0, tags: Optional[Dict[str, int]] = None) -> None:
+        """
+        Set value in every tier with TTL.
+
+        With stale_ttl, the entry is kept that much longer after it expires so
+        get_or_compute(..., stale_ttl=...) can serve it while refreshing.
+        `tags` are the tag versions the value was computed from, as returned
+        by tag_versions() before computing it.
+        """
+        ttl = ttl or self.default_ttl
+        record = CacheRecord(value, tags or None)
+        if self.l1 is not None:
+            self.l1.set(key, record, ttl, namespace, stale_ttl=stale_ttl)
+        if self.l2 is not None:
+            self._l2_call("set", key, record, ttl, namespace, stale_ttl=stale_ttl)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None, namespace: str = "default",
+                   stale_ttl: float = 0, tags: Optional[Dict[str, int]] = None) -> None:
+        """set() for async callers; the L2 write can wait on other workers' writes"""
         ttl = ttl or self.default_ttl
-        expiry = datetime.utcnow() + timedelta(seconds=ttl)
-        self.cache[key] = (value, expiry)
-        logger.debug(f"Cache SET for key: {key[:16]}... (TTL: {ttl}s)")
+        record = CacheRecord(value, tags or None)
+        if self.l1 is not None:
+            self.l1.set(key, record, ttl, namespace, stale_ttl=stale_ttl)
+        if self.l2 is not None:
+            await self._l2_call_async("set", key, record, ttl, namespace, stale_ttl=stale_ttl)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             ttl: Optional[int] = None, namespace: str = "default",
+                             stale_ttl: float = 0,
+                             should_cache: Optional[Callable[[Any], bool]] = None,
+                             tags: Optional[List[str]] = None) -> Any:
+        """
+        Return the cached value for `key`, computing it at most once at a time.
+
+        Concurrent callers that miss on the same key await one in-flight
+        `compute()`; if it raises, every waiter gets the exception and nothing
+        is cached. A caller being cancelled does not cancel the computation
+        for the others. Coalescing is per process; other workers may compute
+        the same value concurrently.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument coroutine function producing the value
+            ttl: Time to live in seconds
+            namespace: Cache namespace whose limits apply
+            stale_ttl: If set, an entry up to this many seconds past its TTL
+                is returned immediately while one background refresh runs
+            should_cache: Predicate deciding whether a result is cached
+                (e.g. skip error responses); waiters share it either way
+            tags: Tags of the data the value depends on; their versions are
+                read before computing and stored with the result
+        """
+        found, value, fresh = await self._lookup_async(key, namespace, allow_stale=stale_ttl > 0)
+        if found and fresh:
+            return value
+
+        flight_key = (namespace, key)
+        task = self._inflight.get(flight_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            async def run():
+                try:
+                    try:
+                        versions = await self.tag_versions_async(tags or [])
+                    except Exception as e:
+                        # Unverifiable later, so the result won't be cached
+                        logger.warning(f"Cache tag lookup failed: {str(e)}")
+                        versions = None
+                    result = await compute()
+                    if versions is not None and (should_cache is None or should_cache(result)):
+                        await self.aset(key, result, ttl=ttl, namespace=namespace, stale_ttl=stale_ttl, tags=versions)
+                    return result
+                finally:
+                    self._inflight.pop(flight_key, None)
+
+            task = self._inflight[flight_key] = asyncio.ensure_future(run())
+            if found:
+                # Nobody awaits a background refresh; log its failure here
+                task.add_done_callback(self._log_refresh_failure)
 
-    def delete(self, key: str) -> None:
-        """Delete value from cache"""
-        if key in self.cache:
-            del self.cache[key]
-            logger.debug(f"Cache DELETE for key: {key[:16]}...")
+        if found:
+            # Stale-while-revalidate: the refresh runs in the background
+            return value
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
+
+    def delete(self, key: str, namespace: str = "default") -> None:
+        """Delete value from every tier; other workers drop their copy on their next poll"""
+        if self.l1 is not None:
+            self.l1.delete(key, namespace)
+        if self.l2 is not None:
+            self._l2_call("delete", key, namespace)
 
     def clear(self) -> None:
-        """Clear all cache entries"""
-        count = len(self.cache)
-        self.cache.clear()
+        """Clear all cache entries, in every worker sharing the L2 tier"""
+        count = 0
+        if self.l1 is not None:
+            count += self.l1.clear()
+        if self.l2 is not None:
+            count += self._l2_call("clear", default=0)
         logger.info(f"Cache CLEARED ({count} entries removed)")
 
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """Remove up to `limit` expired entries per tier and return how many were removed"""
+        removed = 0
+        if self.l1 is not None:
+            removed += self.l1.sweep(limit)
+        if self.l2 is not None:
+            removed += self._l2_call("sweep", limit, default=0)
+        return removed
+
     def cleanup(self) -> int:
-        """Remove expired entries and return count of removed items"""
-        now = datetime.utcnow()
-        expired_keys = [k for k, (_, expiry) in self.cache.items() if now >= expiry]
-        for key in expired_keys:
-            del self.cache[key]
-        if expired_keys:
-            logger.info(f"Cache cleanup removed {len(expired_keys)} expired entries")
-        return len(expired_keys)
+        """Remove all expired entries and return count of removed items"""
+        removed = self.sweep()
+        if removed:
+            logger.info(f"Cache cleanup removed {removed} expired entries")
+        return removed
+
+    async def run_sweeper(self, interval: float = CACHE_SWEEP_INTERVAL_SECONDS,
+                          batch: int = CACHE_SWEEP_BATCH) -> None:
+        """
+        Expire entries and apply other workers' invalidations in the
+        background until cancelled.
+
+        Each pass removes at most `batch` entries per namespace; a full batch
+        means more are due, so the next pass follows right away after
+        yielding to the event loop.
+        """
+        while True:
+            await self.sync_invalidations_async(force=True)
+            removed = self.l1.sweep(batch) if self.l1 is not None else 0
+            if self.l2 is not None:
+                removed += await self._l2_call_async("sweep", batch, default=0)
+            if removed:
+                logger.debug(f"Cache sweeper removed {removed} expired entries")
+            await asyncio.sleep(0 if removed >= batch else interval)
 
     def stats(self) -> dict:
-        """Get cache statistics"""
-        now = datetime.utcnow()
-        active = sum(1 for _, expiry in self.cache.values() if now < expiry)
-        expired = len(self.cache) - active
+        """Get cache statistics per tier (constant time)"""
+        l1_stats = self.l1.stats() if self.l1 is not None else {}
+        l2_stats = self._l2_call("stats", default={}) if self.l2 is not None else {}
+        tiers = {}
+        if self.l1 is not None:
+            tiers[self.l1.name] = l1_stats
+        if self.l2 is not None:
+            tiers[self.l2.name] = l2_stats
+        # A request is a hit if any tier had it, a miss if the last tier missed
+        hits = l1_stats.get("hits", 0) + l2_stats.get("hits", 0)
+        misses = (l2_stats if self.l2 else l1_stats).get("misses", 0)
+        lookups = hits + misses
         return {
-            "total_entries": len(self.cache),
-            "active_entries": active,
-            "expired_entries": expired
+            "total_entries": (l2_stats if self.l2 else l1_stats).get("total_entries", 0),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "tag_invalidations": self.tag_invalidations,
+            "l2_errors": self.l2_errors,
+            "tiers": tiers
         }
 
 
-def cached(ttl: int = 300, key_prefix: str = ""):
+def create_cache(default_ttl: int = 300, backend: str = CACHE_BACKEND) -> TieredCache:
+    """
+    Build the cache configured by CACHE_BACKEND: "memory" (per process only),
+    "sqlite" (shared file only) or "tiered" (memory in front of the shared file).
+    """
+    if backend not in ("memory", "sqlite", "tiered"):
+        raise ValueError(f"Unsupported CACHE_BACKEND: {backend}")
+    l1 = MemoryCacheBackend() if backend in ("memory", "tiered") else None
+    l2 = None
+    if backend in ("sqlite", "tiered"):
+        try:
+            l2 = SQLiteCacheBackend(CACHE_DB_PATH)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Shared cache at {CACHE_DB_PATH} unavailable, using memory only: {str(e)}")
+            l1 = l1 or MemoryCacheBackend()
+    return TieredCache(default_ttl=default_ttl, l1=l1, l2=l2)
+
+
+def cached(ttl: int = 300, key_prefix: str = "", namespace: str = "default", stale_ttl: float = 0):
     """
     Decorator for caching function results
 
+    Coroutine functions are single-flight: concurrent calls with the same
+    arguments share one execution (see TieredCache.get_or_compute).
+
     Args:
         ttl: Time to live in seconds
         key_prefix: Prefix for cache key
+        namespace: Cache namespace whose limits apply
+        stale_ttl: Serve results up to this long past their TTL while
+            refreshing in the background (coroutine functions only)
     """
     def decorator(func):
         @wraps(func)
@@ -100,34 +997,31 @@ def cached(ttl: int = 300, key_prefix: str = ""):
             cache_key_parts = (key_prefix or func.__name__, args, tuple(sorted(kwargs.items())))
             cache_key = cache.make_key(cache_key_parts)
 
-            # Try to get from cache
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-
-            # Call function and cache result
-            result = await func(*args, **kwargs)
-            cache.set(cache_key, result, ttl=ttl)
-            return result
+            return await cache.get_or_compute(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                namespace=namespace,
+                stale_ttl=stale_ttl
+            )
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             # Generate cache key from function name and arguments
             cache_key_parts = (key_prefix or func.__name__, args, tuple(sorted(kwargs.items())))
-            cache_key = cache._make_key(cache_key_parts)
+            cache_key = cache.make_key(cache_key_parts)
 
             # Try to get from cache
-            cached_value = cache.get(cache_key)
+            cached_value = cache.get(cache_key, namespace=namespace)
             if cached_value is not None:
                 return cached_value
 
             # Call function and cache result
             result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl=ttl)
+            cache.set(cache_key, result, ttl=ttl, namespace=namespace)
             return result
 
         # Return appropriate wrapper based on function type
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
@@ -137,4 +1031,4 @@ def cached(ttl: int = 300, key_prefix: str = ""):
 
 
 # Global cache instance
-cache = SimpleCache(default_ttl=300)  # 5 minutes default
+cache = create_cache(default_ttl=300)  # 5 minutes default
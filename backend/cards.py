@@ -0,0 +1,239 @@
+"""
+Derived frontend "card" fields for policies.
+
+Cards are computed once at ingest time and stored in the policy_cards table,
+so the list endpoint only has to read them.
+"""
+from typing import Dict, Any, List
+
+
+def calculate_policy_rating(policy: Dict[str, Any]) -> float:
+    """Calculate a policy rating based on available features."""
+    rating = 3.0  # Base rating
+    # Extracted documents leave numbers out as often as not; missing counts as 0
+    claim_settlement_ratio = policy.get('claim_settlement_ratio') or 0
+    network_hospitals_count = policy.get('network_hospitals_count') or 0
+    
+    # Boost rating based on features
+    if claim_settlement_ratio > 90:
+        rating += 0.5
+    elif claim_settlement_ratio > 85:
+        rating += 0.3
+    
+    if network_hospitals_count > 10000:
+        rating += 0.3
+    elif network_hospitals_count > 5000:
+        rating += 0.2
+    
+    if policy['maternity_covered']:
+        rating += 0.2
+    
+    if policy['daycare_covered']:
+        rating += 0.2
+    
+    if policy['no_claim_bonus_available']:
+        rating += 0.2
+    
+    if policy['restoration_benefit_available']:
+        rating += 0.3
+    
+    if policy['ambulance_covered']:
+        rating += 0.1
+    
+    # Cap at 5.0
+    return min(5.0, rating)
+
+def generate_price_range(policy: Dict[str, Any]) -> str:
+    """Generate a price range string based on sum insured options."""
+    if policy['sum_insured_options']:
+        try:
+            # Convert all values to int (handles both int and string inputs)
+            coverage_values = [int(x) if isinstance(x, (int, float)) else int(str(x).replace(',', ''))
+                             for x in policy['sum_insured_options'] if x]
+
+            if coverage_values:
+                min_coverage = min(coverage_values)
+                max_coverage = max(coverage_values)
+
+                # Rough estimation: premium is typically 1-3% of sum insured
+                min_premium = int(min_coverage * 0.01)
+                max_premium = int(max_coverage * 0.03)
+
+                return f"₹{min_premium:,} - ₹{max_premium:,} / year"
+        except (ValueError, TypeError):
+            pass
+
+    return "₹5,000 - ₹50,000 / year"
+
+def generate_description(policy: Dict[str, Any]) -> str:
+    """Generate a short description for the policy."""
+    category = (policy.get('policy_category') or '').lower()
+    features = []
+    
+    if policy['maternity_covered']:
+        features.append("maternity coverage")
+    if policy['daycare_covered']:
+        features.append("daycare procedures")
+    if policy['restoration_benefit_available']:
+        features.append("restoration benefit")
+    
+    if features:
+        return f"Comprehensive {category} health insurance with {', '.join(features[:2])}."
+    else:
+        return f"Reliable {category} health insurance plan with essential coverage."
+
+def extract_benefits(policy: Dict[str, Any]) -> List[str]:
+    """Extract benefits from policy data."""
+    benefits = []
+    claim_settlement_ratio = policy.get('claim_settlement_ratio') or 0
+    network_hospitals_count = policy.get('network_hospitals_count') or 0
+    pre_hospitalization_days = policy.get('pre_hospitalization_days') or 0
+    post_hospitalization_days = policy.get('post_hospitalization_days') or 0
+    ambulance_limit = policy.get('ambulance_limit') or 0
+    
+    if claim_settlement_ratio > 0:
+        benefits.append(f"Claim Settlement Ratio: {claim_settlement_ratio:.1f}%")
+    
+    if network_hospitals_count > 0:
+        benefits.append(f"Network Hospitals: {network_hospitals_count:,}")
+    
+    if policy['room_rent_description']:
+        benefits.append(f"Room Rent: {policy['room_rent_description']}")
+    
+    if pre_hospitalization_days > 0:
+        benefits.append(f"Pre-hospitalization: {pre_hospitalization_days} days")
+    
+    if post_hospitalization_days > 0:
+        benefits.append(f"Post-hospitalization: {post_hospitalization_days} days")
+    
+    if policy['ambulance_covered'] and ambulance_limit > 0:
+        benefits.append(f"Ambulance Cover: ₹{ambulance_limit:,}")
+    
+    # Add more benefits as needed
+    return benefits[:6]  # Limit to 6 benefits
+
+def extract_exclusions(policy: Dict[str, Any]) -> List[str]:
+    """Extract exclusions/waiting periods from policy data."""
+    exclusions = []
+    waiting_period_initial = policy.get('waiting_period_initial') or 0
+    waiting_period_pre_existing = policy.get('waiting_period_pre_existing') or 0
+    waiting_period_specific_ailments = policy.get('waiting_period_specific_ailments') or 0
+    maternity_waiting_period = policy.get('maternity_waiting_period') or 0
+    
+    if waiting_period_initial > 0:
+        exclusions.append(f"Initial waiting period: {waiting_period_initial} days")
+    
+    if waiting_period_pre_existing > 0:
+        exclusions.append(f"Pre-existing diseases: {waiting_period_pre_existing} years")
+    
+    if waiting_period_specific_ailments > 0:
+        exclusions.append(f"Specific ailments: {waiting_period_specific_ailments} years")
+    
+    if policy['co_payment_applicable'] and policy['co_payment_details']:
+        exclusions.append(f"Co-payment: {policy['co_payment_details']}")
+    
+    if maternity_waiting_period > 0:
+        exclusions.append(f"Maternity waiting period: {maternity_waiting_period} months")
+    
+    # Add standard exclusions
+    exclusions.extend([
+        "Pre-existing conditions (as per waiting period)",
+        "Cosmetic treatments",
+        "Dental treatments (unless due to accident)"
+    ])
+    
+    return exclusions[:6]  # Limit to 6 exclusions
+
+def extract_eligibility(policy: Dict[str, Any]) -> List[str]:
+    """Extract eligibility/additional features from policy data."""
+    eligibility = []
+    
+    if policy['daycare_covered']:
+        eligibility.append("Day-care procedures covered")
+    
+    if policy['maternity_covered']:
+        eligibility.append("Maternity benefits available")
+    
+    if policy['no_claim_bonus_available']:
+        eligibility.append("No Claim Bonus")
+    
+    if policy['restoration_benefit_available']:
+        eligibility.append("Sum Insured Restoration")
+    
+    if policy['is_tax_benefit_eligible']:
+        eligibility.append("Tax benefits under 80D")
+    
+    if policy['payment_modes']:
+        modes = ", ".join(policy['payment_modes'][:3])  # Show first 3 modes
+        eligibility.append(f"Payment modes: {modes}")
+    
+    return eligibility[:5]  # Limit to 5 eligibility items
+
+def generate_review_count(policy: Dict[str, Any]) -> int:
+    """Generate a mock review count based on policy features."""
+    base_count = 500
+    
+    # More features = more reviews
+    if policy['maternity_covered']:
+        base_count += 200
+    if policy['daycare_covered']:
+        base_count += 150
+    if policy['restoration_benefit_available']:
+        base_count += 300
+    if (policy.get('network_hospitals_count') or 0) > 10000:
+        base_count += 500
+    
+    return base_count
+
+def build_policy_card(policy: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the frontend card for a policy.
+
+    Args:
+        policy: Row from the "card" column set, JSON fields already decoded
+    """
+    # Calculate a rating based on available data (mock calculation)
+    rating = calculate_policy_rating(policy)
+    
+    # Generate price range from sum insured options
+    price_range = generate_price_range(policy)
+    
+    return {
+        "id": policy['id'],
+        "type": "Health",  # All our policies are health policies
+        "company": policy['provider_name'],
+        "name": policy['plan_name'],
+        "shortDescription": generate_description(policy),
+        "priceRange": price_range,
+        "benefits": extract_benefits(policy),
+        "exclusions": extract_exclusions(policy),
+        "eligibility": extract_eligibility(policy),
+        "rating": rating,
+        "reviewsCount": generate_review_count(policy),
+        # Additional fields for detailed view
+        "product_uin": policy['product_uin'],
+        "policy_category": policy['policy_category'],
+        "sum_insured_options": policy['sum_insured_options'],
+        "payment_modes": policy['payment_modes'],
+        "network_hospitals": policy['network_hospitals_count'],
+        "claim_settlement_ratio": policy['claim_settlement_ratio'],
+        "solvency_ratio": policy['solvency_ratio'],
+        # Policy features from policy_features table
+        "hospital_network": policy.get('hospital_network'),
+        "room_rent": policy.get('room_rent'),
+        "copayment": policy.get('copayment'),
+        "restoration_benefit": policy.get('restoration_benefit'),
+        "pre_post_hospitalization_coverage": policy.get('pre_post_hospitalization_coverage'),
+        "waiting_period": policy.get('waiting_period'),
+        "no_claim_bonus": policy.get('no_claim_bonus'),
+        "disease_sub_limits": policy.get('disease_sub_limits'),
+        "alternate_treatment_coverage": policy.get('alternate_treatment_coverage'),
+        "maternity_care": policy.get('maternity_care'),
+        "newborn_care": policy.get('newborn_care'),
+        "health_checkups": policy.get('health_checkups'),
+        "domiciliary": policy.get('domiciliary'),
+        "outpatient_department": policy.get('outpatient_department'),
+        "lifelong_renewal": policy.get('lifelong_renewal'),
+        "critical_illness_rider": policy.get('critical_illness_rider'),
+        "accident_disability_rider": policy.get('accident_disability_rider')
+    }
@@ -0,0 +1,262 @@
+"""
+Read-optimized, in-memory snapshot of the policy catalog.
+
+Browse traffic (/api/policies) is answered from NumPy column arrays instead of
+SQLite: filters are vectorized predicates and every supported sort order is
+precomputed when the snapshot is built. The snapshot is rebuilt, and swapped
+in atomically, when the database's dataset version changes.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .database import PolicyDatabase, POLICY_SORTS, encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Immutable column arrays for one dataset version."""
+
+    def __init__(self, version: int, rows: List[Dict[str, Any]]):
+        self.version = version
+        self.size = len(rows)
+        # Set when some policies had no card yet and were left out
+        self.incomplete = False
+
+        rows = [row for row in rows if row["card_json"] is not None]
+        if len(rows) != self.size:
+            self.incomplete = True
+            self.size = len(rows)
+
+        def column(name, dtype, default):
+            return np.array(
+                [row[name] if row[name] is not None else default for row in rows],
+                dtype=dtype
+            )
+
+        self.ids = np.array([row["id"] for row in rows], dtype=object)
+        self.provider_lower = np.array([(row["provider_name"] or "").lower() for row in rows], dtype=str)
+        self.policy_category = np.array([row["policy_category"] or "" for row in rows], dtype=object)
+
+        self.claim_settlement_ratio = column("claim_settlement_ratio", np.float64, 0.0)
+        self.network_hospitals_count = column("network_hospitals_count", np.int64, 0)
+        self.base_premium = column("base_premium", np.float64, np.nan)
+        self.rating = column("rating", np.float64, 0.0)
+        self.min_sum_insured = column("min_sum_insured", np.float64, np.nan)
+        self.max_sum_insured = column("max_sum_insured", np.float64, np.nan)
+
+        self.maternity_covered = column("maternity_covered", bool, False)
+        self.daycare_covered = column("daycare_covered", bool, False)
+        self.no_claim_bonus_available = column("no_claim_bonus_available", bool, False)
+        self.restoration_benefit_available = column("restoration_benefit_available", bool, False)
+        self.ambulance_covered = column("ambulance_covered", bool, False)
+
+        self.waiting_period_initial = column("waiting_period_initial", np.float64, 0.0)
+        self.waiting_period_pre_existing = column("waiting_period_pre_existing", np.float64, 0.0)
+        self.waiting_period_specific_ailments = column("waiting_period_specific_ailments", np.float64, 0.0)
+
+        # One boolean column per payment mode
+        self.payment_modes: Dict[str, np.ndarray] = {}
+        for i, row in enumerate(rows):
+            for mode in row["payment_modes"]:
+                if mode not in self.payment_modes:
+                    self.payment_modes[mode] = np.zeros(self.size, dtype=bool)
+                self.payment_modes[mode][i] = True
+
+        # Cards are decoded once; a page is just a list of references
+        self.cards = [json.loads(row["card_json"]) for row in rows]
+
+        # Rows arrive ordered by id, so position doubles as the id rank.
+        # Each sort is stored as its permutation plus the (key, rank) pairs in
+        # that order, negated for descending sorts so that keyset cursors can
+        # be located with searchsorted. Keys use the same NULL substitution as
+        # database.sort_key_expression, so cursors work on either path.
+        id_rank = np.arange(self.size)
+        self.sort_values: Dict[str, np.ndarray] = {}
+        self.orders: Dict[str, np.ndarray] = {}
+        self._sorted_keys: Dict[str, np.ndarray] = {}
+        self._sorted_ranks: Dict[str, np.ndarray] = {}
+        for sort, spec in POLICY_SORTS.items():
+            if spec["null_value"] is None:
+                self.orders[sort] = id_rank
+                continue
+            values = np.array(
+                [row[spec["column"]] if row[spec["column"]] is not None else spec["null_value"] for row in rows],
+                dtype=np.float64
+            )
+            sign = -1 if spec["descending"] else 1
+            order = np.lexsort((sign * id_rank, sign * values))
+            self.sort_values[sort] = values
+            self.orders[sort] = order
+            self._sorted_keys[sort] = (sign * values)[order]
+            self._sorted_ranks[sort] = (sign * id_rank)[order]
+
+    def _cursor_position(self, sort: str, cursor: str) -> int:
+        """Index into orders[sort] of the first row after the cursor."""
+        after_key, after_id = decode_cursor(cursor, sort)
+        id_position = int(np.searchsorted(self.ids, after_id, side="left"))
+        if sort not in self._sorted_keys:
+            return id_position + int(id_position < self.size and self.ids[id_position] == after_id)
+
+        # A policy deleted since the cursor was issued sits between two ranks
+        found = id_position < self.size and self.ids[id_position] == after_id
+        rank = id_position if found else id_position - 0.5
+        sign = -1 if POLICY_SORTS[sort]["descending"] else 1
+        try:
+            key = sign * float(after_key)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
+        keys = self._sorted_keys[sort]
+        low = int(np.searchsorted(keys, key, side="left"))
+        high = int(np.searchsorted(keys, key, side="right"))
+        return low + int(np.searchsorted(self._sorted_ranks[sort][low:high], sign * rank, side="right"))
+
+    def _cursor_for(self, sort: str, index: int) -> str:
+        if sort not in self.sort_values:
+            return encode_cursor(sort, self.ids[index], self.ids[index])
+        # Integer columns come back from SQLite as ints; keep cursors identical
+        cast = int if isinstance(POLICY_SORTS[sort]["null_value"], int) else float
+        return encode_cursor(sort, cast(self.sort_values[sort][index]), self.ids[index])
+
+    def filter_mask(self,
+                    provider_name: Optional[str] = None,
+                    policy_category: Optional[str] = None,
+                    min_sum_insured: Optional[int] = None,
+                    max_premium: Optional[float] = None,
+                    maternity_required: Optional[bool] = None,
+                    daycare_required: Optional[bool] = None,
+                    payment_mode: Optional[str] = None) -> np.ndarray:
+        """
+        Boolean mask of matching policies.
+
+        Semantics match PolicyDatabase._build_policy_filters: provider is a
+        case-insensitive substring match, and policies with no known sum
+        insured options or premium are kept by those filters.
+        """
+        mask = np.ones(self.size, dtype=bool)
+
+        if provider_name:
+            mask &= np.char.find(self.provider_lower, provider_name.lower()) >= 0
+
+        if policy_category:
+            mask &= self.policy_category == policy_category
+
+        if min_sum_insured:
+            mask &= np.isnan(self.max_sum_insured) | (self.max_sum_insured >= min_sum_insured)
+
+        if max_premium is not None:
+            mask &= np.isnan(self.base_premium) | (self.base_premium <= max_premium)
+
+        if maternity_required is not None:
+            mask &= self.maternity_covered == bool(maternity_required)
+
+        if daycare_required is not None:
+            mask &= self.daycare_covered == bool(daycare_required)
+
+        if payment_mode:
+            modes = self.payment_modes.get(payment_mode)
+            if modes is None:
+                mask[:] = False
+            else:
+                mask &= modes
+
+        return mask
+
+    def query(self, sort: str = "id", limit: Optional[int] = None, offset: int = 0,
+              cursor: Optional[str] = None, include_total: bool = True,
+              **filters) -> Dict[str, Any]:
+        """
+        Filter, sort and page the catalog, by offset or by keyset cursor.
+
+        Returns:
+            Same shape as PolicyDatabase.query_policy_cards
+        """
+        if sort not in self.orders:
+            raise ValueError(f"Unsupported sort: {sort}")
+        if cursor and offset:
+            raise ValueError("Use either cursor or offset, not both")
+
+        mask = self.filter_mask(**filters)
+        order = self.orders[sort]
+        if cursor:
+            order = order[self._cursor_position(sort, cursor):]
+        selected = order[mask[order]]
+
+        start = offset or 0
+        end = start + limit if limit else None
+        page = selected[start:end]
+
+        next_cursor = None
+        if limit and selected.size > start + limit:
+            next_cursor = self._cursor_for(sort, int(page[-1]))
+
+        return {
+            "policies": [self.cards[i] for i in page],
+            "total": int(np.count_nonzero(mask)) if include_total else None,
+            "next_cursor": next_cursor
+        }
+
+
+class PolicyCatalog:
+    """
+    Holds the current CatalogSnapshot and rebuilds it when the dataset changes.
+
+    The version check is a single-row read, done at most once per
+    `refresh_interval` seconds; between checks queries never touch SQLite.
+    """
+
+    def __init__(self, db: PolicyDatabase, refresh_interval: float = 2.0):
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._last_check = 0.0
+        self._rebuild_lock = threading.Lock()
+        self.rebuilds = 0
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def check_due(self) -> bool:
+        """True if the snapshot is missing or the version should be re-checked."""
+        return self._snapshot is None or time.monotonic() - self._last_check >= self.refresh_interval
+
+    def refresh(self, force: bool = False) -> CatalogSnapshot:
+        """Rebuild the snapshot if the dataset version moved (blocking; run off the event loop)."""
+        with self._rebuild_lock:
+            current = self._snapshot
+            if not force and current is not None and not current.incomplete:
+                if time.monotonic() - self._last_check < self.refresh_interval:
+                    # Another caller refreshed while we waited for the lock
+                    return current
+                if self.db.get_dataset_version() == current.version:
+                    self._last_check = time.monotonic()
+                    return current
+
+            started = time.perf_counter()
+            source = self.db.get_catalog_rows()
+            snapshot = CatalogSnapshot(source["version"], source["rows"])
+
+            # Single reference swap: readers see the old or the new snapshot
+            self._snapshot = snapshot
+            self._last_check = time.monotonic()
+            self.rebuilds += 1
+            logger.info(
+                f"Policy catalog rebuilt: {snapshot.size} policies, version {snapshot.version} "
+                f"({(time.perf_counter() - started) * 1000:.1f}ms)"
+            )
+            return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "policies": snapshot.size if snapshot else 0,
+            "rebuilds": self.rebuilds
+        }
@@ -1,22 +1,392 @@
 """
 Database setup and models for the insurance policy application.
 """
+import asyncio
+import base64
+import hashlib
+import html
 import sqlite3
 import json
 import os
-from typing import List, Dict, Any, Optional
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Tuple, Iterator
 from pathlib import Path
 
+from .cards import build_policy_card
+
+# Pragmas applied to every connection we open. Connections are long-lived, so
+# this cost is paid once per thread instead of once per query.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA mmap_size = 268435456",  # 256 MB memory-mapped reads
+    "PRAGMA cache_size = -16000",  # ~16 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Number of compiled statements sqlite3 keeps per connection
+STATEMENT_CACHE_SIZE = 256
+
+# Columns written by ingestion, in build_policy_record order
+POLICY_RECORD_COLUMNS = (
+    "id", "provider_name", "plan_name", "policy_category", "product_uin", "provider_id",
+    "claim_settlement_ratio", "solvency_ratio", "network_hospitals_count",
+    "sum_insured_options", "payment_modes", "base_premium", "is_tax_benefit_eligible",
+    "room_rent_limit_type", "room_rent_description", "icu_limit_type", "icu_description",
+    "pre_hospitalization_days", "post_hospitalization_days", "daycare_covered",
+    "ambulance_covered", "ambulance_limit", "no_claim_bonus_available",
+    "restoration_benefit_available", "maternity_covered", "maternity_waiting_period",
+    "waiting_period_initial", "waiting_period_specific_ailments", "waiting_period_pre_existing",
+    "co_payment_applicable", "co_payment_details", "raw_json", "source_file",
+)
+
+# Upsert rather than INSERT OR REPLACE: the row keeps its rowid and fires
+# UPDATE triggers instead of a silent delete + insert
+UPSERT_POLICY_SQL = f"""
+    INSERT INTO policies ({", ".join(POLICY_RECORD_COLUMNS)})
+    VALUES ({", ".join("?" for _ in POLICY_RECORD_COLUMNS)})
+    ON CONFLICT(id) DO UPDATE SET
+        {", ".join(f"{c}=excluded.{c}" for c in POLICY_RECORD_COLUMNS if c != "id")}
+"""
+
+# Sort orders for policy listings. Ties break on the policy id in the same
+# direction, so (sort key, id) is a total order usable for keyset paging and
+# the (key, id) expression index named here serves it. NULLs are replaced by
+# null_value, which puts unknown values last. Table "c" is policy_cards, "p"
+# is policies.
+POLICY_SORTS = {
+    "id": {"table": "p", "column": "id", "descending": False, "null_value": None,
+           "index": None},
+    "claim_settlement_ratio": {"table": "p", "column": "claim_settlement_ratio", "descending": True, "null_value": -1.0,
+                               "index": "idx_policies_sort_claim_ratio"},
+    "network_hospitals": {"table": "p", "column": "network_hospitals_count", "descending": True, "null_value": -1,
+                          "index": "idx_policies_sort_network"},
+    "premium": {"table": "p", "column": "base_premium", "descending": False, "null_value": 1e308,
+                "index": "idx_policies_sort_premium"},
+    "rating": {"table": "c", "column": "rating", "descending": True, "null_value": -1.0,
+               "index": "idx_cards_sort_rating"},
+}
+
+
+def sort_key_expression(sort: str, qualified: bool = True) -> str:
+    """SQL expression for a POLICY_SORTS key, matching its expression index."""
+    spec = POLICY_SORTS[sort]
+    column = f"{spec['table']}.{spec['column']}" if qualified else spec["column"]
+    if spec["null_value"] is None:
+        return column
+    return f"IFNULL({column}, {spec['null_value']!r})"
+
+
+def encode_cursor(sort: str, key: Any, policy_id: str) -> str:
+    """Opaque keyset cursor: the sort name plus the last row's sort key and id."""
+    payload = json.dumps([sort, key, policy_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor for the given sort.
+
+    Returns:
+        (sort key, policy id) of the last row already returned
+
+    Raises:
+        ValueError: if the cursor is malformed or was issued for another sort
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, policy_id = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if cursor_sort != sort or not isinstance(policy_id, str):
+        raise ValueError("Cursor does not match the requested sort")
+    return key, policy_id
+
+# Full-text indexes: (fts table, source table, source rowid column, indexed columns)
+FTS_INDEXES = (
+    ("policies_fts", "policies", "rowid", ("plan_name", "provider_name")),
+    ("section_summaries_fts", "policy_section_summaries", "id", ("section_name", "summary")),
+    ("chunks_fts", "policy_chunks", "id", ("section_name", "chunk_text")),
+)
+
+# Relative weight of a hit in each index when ranking policies
+FTS_SOURCE_WEIGHTS = {"policy": 3.0, "summary": 1.5, "chunk": 1.0}
+
+# highlight()/snippet() wrap matches in these private-use characters, which
+# become <mark> tags only after the text itself has been HTML-escaped
+FTS_MARK_OPEN = "\ue000"
+FTS_MARK_CLOSE = "\ue001"
+
+# Tables whose rows belong to one policy: (table, policy id column). Any
+# change bumps that policy's row in policy_versions.
+POLICY_VERSIONED_TABLES = (
+    ("policies", "id"),
+    ("policy_features", "policy_id"),
+    ("policy_section_summaries", "policy_id"),
+    ("policy_chunks", "policy_id"),
+)
+
+# Cache tags resolved by PolicyDatabase.get_tag_versions
+DATASET_TAG = "dataset"  # policy rows and features (listings, facets, stats)
+CONTENT_TAG = "content"  # section summaries and chunks (full-text search)
+POLICY_TAG_PREFIX = "policy:"
+
+
+def policy_tag(policy_id: str) -> str:
+    """Cache tag for everything stored about one policy."""
+    return f"{POLICY_TAG_PREFIX}{policy_id}"
+
+
+# Ids per IN (...) lookup when rebuilding cards or reading chunks
+CARD_REFRESH_BATCH = 500
+
+# Below this many changed files, parsing inline beats starting a process pool
+BULK_PARSE_MIN_FILES_FOR_POOL = 16
+BULK_PARSE_CHUNKSIZE = 32
+
+# policy_features columns joined onto full policy reads
+POLICY_FEATURE_COLUMNS = """
+    pf.claim_settlement_ratio, pf.hospital_network, pf.room_rent, pf.copayment,
+    pf.restoration_benefit, pf.pre_post_hospitalization_coverage,
+    pf.waiting_period, pf.no_claim_bonus, pf.disease_sub_limits,
+    pf.alternate_treatment_coverage, pf.maternity_care, pf.newborn_care,
+    pf.health_checkups, pf.domiciliary, pf.outpatient_department,
+    pf.lifelong_renewal, pf.critical_illness_rider, pf.accident_disability_rider,
+    pf.extraction_source, pf.confidence_score
+"""
+
+# Columns rendered on a catalog card (list view). Never includes raw_json.
+CARD_POLICY_COLUMNS = (
+    "id", "provider_name", "plan_name", "policy_category", "product_uin",
+    "claim_settlement_ratio", "solvency_ratio", "network_hospitals_count",
+    "sum_insured_options", "payment_modes", "base_premium", "is_tax_benefit_eligible",
+    "room_rent_description", "pre_hospitalization_days", "post_hospitalization_days",
+    "daycare_covered", "ambulance_covered", "ambulance_limit", "no_claim_bonus_available",
+    "restoration_benefit_available", "maternity_covered", "maternity_waiting_period",
+    "waiting_period_initial", "waiting_period_specific_ailments", "waiting_period_pre_existing",
+    "co_payment_applicable", "co_payment_details",
+)
+CARD_FEATURE_COLUMNS = (
+    "hospital_network", "room_rent", "copayment", "restoration_benefit",
+    "pre_post_hospitalization_coverage", "waiting_period", "no_claim_bonus",
+    "disease_sub_limits", "alternate_treatment_coverage", "maternity_care",
+    "newborn_care", "health_checkups", "domiciliary", "outpatient_department",
+    "lifelong_renewal", "critical_illness_rider", "accident_disability_rider",
+)
+
+# Columns used for filter dropdowns (/api/providers, /api/categories)
+FACET_COLUMNS = ("provider_name", "policy_category")
+
+# Named projections. Each one is backed by indexes that cover it (see
+# _create_schema); for "card" the planner prefers the primary-key index when
+# ordering by p.id and would then read every table row, so the covering
+# indexes are pinned explicitly.
+COLUMN_SETS = {
+    "card": {
+        "columns": ", ".join(
+            [f"p.{c}" for c in CARD_POLICY_COLUMNS] + [f"pf.{c}" for c in CARD_FEATURE_COLUMNS]
+        ),
+        "policy_index": "idx_policies_card",
+        "join_features": True,
+        "feature_index": "idx_features_card",
+    },
+    "detail": {
+        "columns": f"p.*, {POLICY_FEATURE_COLUMNS}",
+        "policy_index": None,
+        "join_features": True,
+        "feature_index": None,
+    },
+    "facet": {
+        "columns": ", ".join(f"p.{c}" for c in FACET_COLUMNS),
+        "policy_index": None,
+        "join_features": False,
+        "feature_index": None,
+    },
+}
+
+# Multipliers for sum insured values written as text, e.g. "7.5 Lacs"
+SUM_INSURED_UNITS = {
+    "lac": 100000,
+    "lacs": 100000,
+    "lakh": 100000,
+    "lakhs": 100000,
+    "crore": 10000000,
+    "crores": 10000000,
+}
+
+
+def parse_sum_insured(value: Any) -> Optional[float]:
+    """Convert a sum insured option (number, "5,00,000", "10 Lacs", "1 Crore") to a number."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+
+    parts = value.replace(",", "").replace("₹", "").strip().lower().split()
+    if not parts:
+        return None
+    try:
+        amount = float(parts[0])
+    except ValueError:
+        return None
+    if len(parts) > 1:
+        amount *= SUM_INSURED_UNITS.get(parts[1], 1)
+    return amount
+
+
+def build_policy_record(policy_data: Dict[str, Any], json_file_path: str) -> Dict[str, Any]:
+    """Flatten an extracted policy JSON document into a `policies` row."""
+    # Extract key fields for easy querying
+    provider_info = policy_data.get('provider_information', {})
+    policy_id_info = policy_data.get('policy_identification', {})
+    core_financials = policy_data.get('core_financials_and_terms', {})
+    coverage = policy_data.get('coverage_and_benefits', {})
+    conditions = policy_data.get('conditions_and_cost_sharing', {})
+
+    # Prepare data for insertion
+    return {
+        'id': policy_id_info.get('policy_id', f"policy_{Path(json_file_path).stem}"),
+        'provider_name': provider_info.get('provider_name', ''),
+        'plan_name': policy_id_info.get('plan_name', ''),
+        'policy_category': policy_id_info.get('policy_category', ''),
+        'product_uin': policy_id_info.get('product_uin', ''),
+        'provider_id': provider_info.get('provider_id', ''),
+        'claim_settlement_ratio': provider_info.get('claim_settlement_ratio', 0.0),
+        'solvency_ratio': provider_info.get('solvency_ratio', 0.0),
+        'network_hospitals_count': provider_info.get('network_hospitals_count', 0),
+        'sum_insured_options': json.dumps(core_financials.get('sum_insured_options', [])),
+        'payment_modes': json.dumps(core_financials.get('premium_details', {}).get('payment_modes', [])),
+        'base_premium': core_financials.get('premium_details', {}).get('base_premium_for_standard_profile', 0.0),
+        'is_tax_benefit_eligible': core_financials.get('is_tax_benefit_eligible_80d', False),
+        'room_rent_limit_type': coverage.get('room_rent_limits', {}).get('limit_type', ''),
+        'room_rent_description': coverage.get('room_rent_limits', {}).get('description', ''),
+        'icu_limit_type': coverage.get('icu_charge_limits', {}).get('limit_type', ''),
+        'icu_description': coverage.get('icu_charge_limits', {}).get('description', ''),
+        'pre_hospitalization_days': coverage.get('in_patient_hospitalization', {}).get('pre_hospitalization_days_covered', 0),
+        'post_hospitalization_days': coverage.get('in_patient_hospitalization', {}).get('post_hospitalization_days_covered', 0),
+        'daycare_covered': coverage.get('daycare_procedures', {}).get('is_covered', False),
+        'ambulance_covered': coverage.get('ambulance_cover', {}).get('is_covered', False),
+        'ambulance_limit': coverage.get('ambulance_cover', {}).get('limit_per_hospitalization', 0),
+        'no_claim_bonus_available': coverage.get('no_claim_bonus', {}).get('is_available', False),
+        'restoration_benefit_available': coverage.get('restoration_benefit', {}).get('is_available', False),
+        'maternity_covered': coverage.get('maternity_cover', {}).get('is_available', False),
+        'maternity_waiting_period': coverage.get('maternity_cover', {}).get('waiting_period_months', 0),
+        'waiting_period_initial': conditions.get('waiting_periods', {}).get('initial_period_days', 0),
+        'waiting_period_specific_ailments': conditions.get('waiting_periods', {}).get('specific_ailments_period_years', 0),
+        'waiting_period_pre_existing': conditions.get('waiting_periods', {}).get('pre_existing_diseases_period_years', 0),
+        'co_payment_applicable': conditions.get('co_payment', {}).get('is_applicable', False),
+        'co_payment_details': conditions.get('co_payment', {}).get('details', ''),
+        'raw_json': json.dumps(policy_data),
+        'source_file': json_file_path
+    }
+
+
+def mark_fts_matches(text: Optional[str]) -> Optional[str]:
+    """HTML-escape FTS output and turn its match markers into <mark> tags."""
+    if text is None:
+        return None
+    return html.escape(text).replace(FTS_MARK_OPEN, "<mark>").replace(FTS_MARK_CLOSE, "</mark>")
+
+
+def parse_policy_file(json_file_path: str) -> Dict[str, Any]:
+    """
+    Read, hash and flatten one extracted policy file.
+
+    Module-level so it can run in a process pool during bulk ingestion.
+    """
+    try:
+        with open(json_file_path, 'rb') as f:
+            content = f.read()
+        policy_data = json.loads(content)
+        return {
+            "source_file": json_file_path,
+            "content_hash": hashlib.sha256(content).hexdigest(),
+            "record": build_policy_record(policy_data, json_file_path),
+        }
+    except Exception as e:
+        return {"source_file": json_file_path, "error": str(e)}
+
+
 class PolicyDatabase:
     def __init__(self, db_path: str = "policies.db"):
         self.db_path = db_path
+
+        # One read connection per thread, one shared writer for ingestion
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+
         self.init_database()
-    
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open a connection with tuned pragmas and a prepared-statement cache."""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=check_same_thread,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Return the calling thread's read connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only this thread uses it, but close() runs on another thread
+            conn = self._connect(check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def _writer(self):
+        """Serialize writes through the single writer connection in one transaction."""
+        with self._write_lock:
+            if self._writer_conn is None:
+                self._writer_conn = self._connect(check_same_thread=False)
+            conn = self._writer_conn
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close(self) -> None:
+        """Close the writer and every read connection opened so far."""
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self._local = threading.local()
+        with self._write_lock:
+            if self._writer_conn is not None:
+                self._writer_conn.close()
+                self._writer_conn = None
+
     def init_database(self):
         """Initialize the database with required tables."""
-        conn = sqlite3.connect(self.db_path)
+        with self._writer() as conn:
+            self._create_schema(conn)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        # WAL lets readers keep going while ingestion writes; the setting is
+        # persistent, so it only needs to be applied once per database file.
+        conn.execute("PRAGMA journal_mode = WAL")
         cursor = conn.cursor()
-        
+
         # Create policies table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS policies (
@@ -65,6 +435,122 @@ class PolicyDatabase:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_claim_ratio ON policies(claim_settlement_ratio)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_network_hospitals ON policies(network_hospitals_count)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON policies(created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_base_premium ON policies(base_premium)")
+
+        # Extracted marketing/feature data, joined onto policy reads
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS policy_features (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                policy_id TEXT NOT NULL UNIQUE,
+                claim_settlement_ratio TEXT,
+                hospital_network TEXT,
+                room_rent TEXT,
+                copayment TEXT,
+                restoration_benefit TEXT,
+                pre_post_hospitalization_coverage TEXT,
+                waiting_period TEXT,
+                no_claim_bonus TEXT,
+                disease_sub_limits TEXT,
+                alternate_treatment_coverage TEXT,
+                maternity_care TEXT,
+                newborn_care TEXT,
+                health_checkups TEXT,
+                domiciliary TEXT,
+                outpatient_department TEXT,
+                lifelong_renewal TEXT,
+                critical_illness_rider TEXT,
+                accident_disability_rider TEXT,
+                extraction_source TEXT, -- 'document' or 'web_scraping'
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                confidence_score REAL, -- 0.0 to 1.0
+                FOREIGN KEY (policy_id) REFERENCES policies(id)
+            )
+        """)
+
+        # Covering indexes for the named column sets. The "card" indexes let
+        # list queries run without touching the table rows (and raw_json);
+        # "facet" columns are covered by idx_provider_name/idx_policy_category
+        # and idx_policies_facet; "detail" is a primary-key lookup of the row.
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_policies_card ON policies({', '.join(CARD_POLICY_COLUMNS)})"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_features_card ON policy_features(policy_id, {', '.join(CARD_FEATURE_COLUMNS)})"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_policies_facet ON policies(provider_name, policy_category)")
+
+        # One (sort key, id) index per listing sort, for keyset pagination
+        for sort, spec in POLICY_SORTS.items():
+            if spec["table"] == "p" and spec["index"]:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {spec['index']} "
+                    f"ON policies({sort_key_expression(sort, qualified=False)}, id)"
+                )
+
+        # Frontend cards (rating, price range, benefits, ...) computed at
+        # ingest time. Triggers drop a card whenever its policy or
+        # policy_features row changes; missing cards are rebuilt on write and,
+        # as a fallback for out-of-band edits, on read.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS policy_cards (
+                policy_id TEXT PRIMARY KEY,
+                card_json TEXT NOT NULL,
+                rating REAL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {POLICY_SORTS['rating']['index']} "
+            f"ON policy_cards({sort_key_expression('rating', qualified=False)}, policy_id)"
+        )
+        for table, key in (("policies", "id"), ("policy_features", "policy_id")):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_insert_card AFTER INSERT ON {table}
+                BEGIN
+                    DELETE FROM policy_cards WHERE policy_id = NEW.{key};
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_update_card AFTER UPDATE ON {table}
+                BEGIN
+                    DELETE FROM policy_cards WHERE policy_id IN (OLD.{key}, NEW.{key});
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_delete_card AFTER DELETE ON {table}
+                BEGIN
+                    DELETE FROM policy_cards WHERE policy_id = OLD.{key};
+                END
+            """)
+
+        # Normalized copies of the sum_insured_options / payment_modes JSON
+        # arrays so list filters can be answered with indexed SQL
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS policy_sum_insured_options (
+                policy_id TEXT NOT NULL,
+                amount REAL NOT NULL,
+                PRIMARY KEY (policy_id, amount)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS policy_payment_modes (
+                policy_id TEXT NOT NULL,
+                payment_mode TEXT NOT NULL,
+                PRIMARY KEY (policy_id, payment_mode)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sum_insured_amount ON policy_sum_insured_options(amount, policy_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payment_mode ON policy_payment_modes(payment_mode, policy_id)")
+
+        # Backfill policies without child rows: databases created before the
+        # tables existed, or loaded by a build that didn't sync them on load.
+        # Re-syncing a policy whose arrays are genuinely empty is a no-op.
+        cursor.execute("""
+            SELECT id, sum_insured_options, payment_modes FROM policies p
+            WHERE NOT EXISTS (SELECT 1 FROM policy_sum_insured_options o WHERE o.policy_id = p.id)
+              AND NOT EXISTS (SELECT 1 FROM policy_payment_modes m WHERE m.policy_id = p.id)
+        """)
+        self._sync_policy_options(conn, [tuple(row) for row in cursor.fetchall()])
 
         # Table for structured section summaries per policy
         cursor.execute("""
@@ -99,82 +585,370 @@ class PolicyDatabase:
         # Create index for summaries table
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_summaries_policy_id ON policy_section_summaries(policy_id)")
 
-        conn.commit()
-        conn.close()
-    
+        # Monotonic counter bumped on every catalog change, so in-memory
+        # snapshots and caches can tell when they are out of date
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dataset_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO dataset_meta (key, value) VALUES ('dataset_version', 1)")
+        for table in ("policies", "policy_features"):
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE dataset_meta SET value = value + 1 WHERE key = 'dataset_version';
+                    END
+                """)
+
+        # Same for the document text behind full-text search
+        cursor.execute("INSERT OR IGNORE INTO dataset_meta (key, value) VALUES ('content_version', 1)")
+        for table in ("policy_section_summaries", "policy_chunks"):
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_content_version AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE dataset_meta SET value = value + 1 WHERE key = 'content_version';
+                    END
+                """)
+
+        # Per-policy counter bumped whenever anything stored about the policy
+        # changes, so cached answers about one policy can be invalidated alone
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS policy_versions (
+                policy_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        """)
+        for table, key in POLICY_VERSIONED_TABLES:
+            for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_policy_version AFTER {event} ON {table}
+                    BEGIN
+                        INSERT INTO policy_versions (policy_id, version) VALUES ({row}.{key}, 1)
+                        ON CONFLICT(policy_id) DO UPDATE SET version = version + 1;
+                    END
+                """)
+        # Data stored before the triggers existed starts at version 0, the
+        # version get_tag_versions already gives policies without a row
+        cursor.execute("INSERT OR IGNORE INTO policy_versions (policy_id, version) " + " UNION ".join(
+            f"SELECT {key}, 0 FROM {table}" for table, key in POLICY_VERSIONED_TABLES
+        ))
+
+        self._create_policy_aggregates(conn)
+
+        self._create_search_index(conn)
+
+        # Build cards for policies that don't have one yet
+        self._refresh_policy_cards(conn)
+
+        # What bulk ingestion last loaded from each source file
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingestion_state (
+                source_file TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                mtime REAL,
+                size INTEGER,
+                policy_id TEXT,
+                loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def _create_policy_aggregates(self, conn: sqlite3.Connection) -> None:
+        """
+        Aggregate tables behind get_policy_statistics.
+
+        Triggers on policies apply each row change as a delta, so statistics
+        reads never scan the policies table. The tables are backfilled once
+        when first created.
+        """
+        existed = self._table_exists(conn, "policy_aggregates")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS policy_aggregates (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_policies INTEGER NOT NULL DEFAULT 0,
+                total_providers INTEGER NOT NULL DEFAULT 0,
+                claim_ratio_sum REAL NOT NULL DEFAULT 0,
+                claim_ratio_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS policy_category_counts (
+                category TEXT PRIMARY KEY,
+                policy_count INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS policy_provider_counts (
+                provider_name TEXT PRIMARY KEY,
+                policy_count INTEGER NOT NULL
+            )
+        """)
+
+        if not existed:
+            conn.execute("""
+                INSERT INTO policy_aggregates
+                    (id, total_policies, total_providers, claim_ratio_sum, claim_ratio_count)
+                SELECT 1, COUNT(*), COUNT(DISTINCT provider_name),
+                       IFNULL(SUM(claim_settlement_ratio) FILTER (WHERE claim_settlement_ratio > 0), 0),
+                       COUNT(*) FILTER (WHERE claim_settlement_ratio > 0)
+                FROM policies
+            """)
+            conn.execute("""
+                INSERT INTO policy_category_counts (category, policy_count)
+                SELECT policy_category, COUNT(*) FROM policies GROUP BY policy_category
+            """)
+            conn.execute("""
+                INSERT INTO policy_provider_counts (provider_name, policy_count)
+                SELECT provider_name, COUNT(*) FROM policies
+                WHERE provider_name IS NOT NULL GROUP BY provider_name
+            """)
+
+        def add_row(row: str) -> str:
+            return f"""
+                UPDATE policy_aggregates SET
+                    total_policies = total_policies + 1,
+                    total_providers = total_providers + (
+                        {row}.provider_name IS NOT NULL AND NOT EXISTS (
+                            SELECT 1 FROM policy_provider_counts WHERE provider_name = {row}.provider_name)),
+                    claim_ratio_sum = claim_ratio_sum
+                        + CASE WHEN {row}.claim_settlement_ratio > 0 THEN {row}.claim_settlement_ratio ELSE 0 END,
+                    claim_ratio_count = claim_ratio_count + IFNULL({row}.claim_settlement_ratio > 0, 0)
+                WHERE id = 1;
+                INSERT INTO policy_category_counts (category, policy_count)
+                VALUES ({row}.policy_category, 1)
+                ON CONFLICT(category) DO UPDATE SET policy_count = policy_count + 1;
+                INSERT INTO policy_provider_counts (provider_name, policy_count)
+                SELECT {row}.provider_name, 1 WHERE {row}.provider_name IS NOT NULL
+                ON CONFLICT(provider_name) DO UPDATE SET policy_count = policy_count + 1;
+            """
+
+        def remove_row(row: str) -> str:
+            return f"""
+                UPDATE policy_aggregates SET
+                    total_policies = total_policies - 1,
+                    total_providers = total_providers - IFNULL((
+                        SELECT policy_count = 1 FROM policy_provider_counts
+                        WHERE provider_name = {row}.provider_name), 0),
+                    claim_ratio_sum = claim_ratio_sum
+                        - CASE WHEN {row}.claim_settlement_ratio > 0 THEN {row}.claim_settlement_ratio ELSE 0 END,
+                    claim_ratio_count = claim_ratio_count - IFNULL({row}.claim_settlement_ratio > 0, 0)
+                WHERE id = 1;
+                UPDATE policy_category_counts SET policy_count = policy_count - 1
+                WHERE category = {row}.policy_category;
+                DELETE FROM policy_category_counts
+                WHERE category = {row}.policy_category AND policy_count <= 0;
+                UPDATE policy_provider_counts SET policy_count = policy_count - 1
+                WHERE provider_name = {row}.provider_name;
+                DELETE FROM policy_provider_counts
+                WHERE provider_name = {row}.provider_name AND policy_count <= 0;
+            """
+
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_policies_insert_aggregates AFTER INSERT ON policies
+            BEGIN {add_row("NEW")} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_policies_delete_aggregates AFTER DELETE ON policies
+            BEGIN {remove_row("OLD")} END
+        """)
+        # Upserts rewrite every column; only real changes move the aggregates
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_policies_update_aggregates
+            AFTER UPDATE OF provider_name, policy_category, claim_settlement_ratio ON policies
+            WHEN OLD.provider_name IS NOT NEW.provider_name
+              OR OLD.policy_category IS NOT NEW.policy_category
+              OR OLD.claim_settlement_ratio IS NOT NEW.claim_settlement_ratio
+            BEGIN {remove_row("OLD")} {add_row("NEW")} END
+        """)
+
+    def _create_search_index(self, conn: sqlite3.Connection) -> None:
+        """
+        FTS5 indexes over plan/provider names, section summaries and chunk text.
+
+        Each is an external-content table kept in sync by triggers on its
+        source table, so ingestion keeps it current without extra code.
+        """
+        for fts_table, source_table, rowid_column, columns in FTS_INDEXES:
+            existed = self._table_exists(conn, fts_table)
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                    {", ".join(columns)},
+                    content='{source_table}',
+                    content_rowid='{rowid_column}',
+                    tokenize='porter unicode61 remove_diacritics 2'
+                )
+            """)
+
+            new_values = ", ".join(f"NEW.{c}" for c in columns)
+            old_values = ", ".join(f"OLD.{c}" for c in columns)
+            column_list = ", ".join(columns)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_insert AFTER INSERT ON {source_table}
+                BEGIN
+                    INSERT INTO {fts_table} (rowid, {column_list}) VALUES (NEW.{rowid_column}, {new_values});
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_delete AFTER DELETE ON {source_table}
+                BEGIN
+                    INSERT INTO {fts_table} ({fts_table}, rowid, {column_list})
+                    VALUES ('delete', OLD.{rowid_column}, {old_values});
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_update AFTER UPDATE OF {column_list} ON {source_table}
+                BEGIN
+                    INSERT INTO {fts_table} ({fts_table}, rowid, {column_list})
+                    VALUES ('delete', OLD.{rowid_column}, {old_values});
+                    INSERT INTO {fts_table} (rowid, {column_list}) VALUES (NEW.{rowid_column}, {new_values});
+                END
+            """)
+
+            if not existed:
+                # Index rows that were loaded before the FTS table existed
+                conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+            (table_name,)
+        ).fetchone()
+        return row is not None
+
+    @staticmethod
+    def _sync_policy_options(conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        """
+        Rewrite the normalized sum insured / payment mode rows.
+
+        Args:
+            rows: (policy_id, sum_insured_options JSON, payment_modes JSON) tuples
+        """
+        amount_rows = []
+        mode_rows = []
+        for policy_id, sum_insured_json, payment_modes_json in rows:
+            amounts = {
+                amount
+                for amount in (parse_sum_insured(v) for v in json.loads(sum_insured_json or "[]"))
+                if amount is not None
+            }
+            modes = {str(m).strip() for m in json.loads(payment_modes_json or "[]") if str(m).strip()}
+            amount_rows.extend((policy_id, amount) for amount in amounts)
+            mode_rows.extend((policy_id, mode) for mode in modes)
+
+        policy_ids = [(row[0],) for row in rows]
+        conn.executemany("DELETE FROM policy_sum_insured_options WHERE policy_id = ?", policy_ids)
+        conn.executemany("DELETE FROM policy_payment_modes WHERE policy_id = ?", policy_ids)
+        conn.executemany(
+            "INSERT INTO policy_sum_insured_options (policy_id, amount) VALUES (?, ?)", amount_rows
+        )
+        conn.executemany(
+            "INSERT INTO policy_payment_modes (policy_id, payment_mode) VALUES (?, ?)", mode_rows
+        )
+
+    def _write_policy_records(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        """Upsert flattened policy rows and their normalized child rows."""
+        # Several files can carry the same policy id; the last one wins, as it
+        # would when loading them one by one
+        records = list({record['id']: record for record in records}.values())
+        conn.executemany(UPSERT_POLICY_SQL, [
+            tuple(record[column] for column in POLICY_RECORD_COLUMNS) for record in records
+        ])
+        self._sync_policy_options(conn, [
+            (record['id'], record['sum_insured_options'], record['payment_modes'])
+            for record in records
+        ])
+        self._refresh_policy_cards(conn, [record['id'] for record in records])
+
+    def _write_policy_records_isolated(self, conn: sqlite3.Connection,
+                                       records: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Exception]]:
+        """
+        Write records in one batch; if the batch fails, write them one at a
+        time so a bad record fails alone instead of rolling back the rest.
+
+        Returns:
+            (record, error) for each record that could not be written
+        """
+        conn.execute("SAVEPOINT policy_batch")
+        try:
+            self._write_policy_records(conn, records)
+            return []
+        except Exception:
+            conn.execute("ROLLBACK TO policy_batch")
+        finally:
+            conn.execute("RELEASE policy_batch")
+
+        failures = []
+        for record in records:
+            conn.execute("SAVEPOINT policy_record")
+            try:
+                self._write_policy_records(conn, [record])
+            except Exception as e:
+                conn.execute("ROLLBACK TO policy_record")
+                failures.append((record, e))
+            finally:
+                conn.execute("RELEASE policy_record")
+        return failures
+
+    def _refresh_policy_cards(self, conn: sqlite3.Connection, policy_ids: Optional[List[str]] = None) -> int:
+        """
+        Rebuild materialized cards inside the caller's write transaction.
+
+        Args:
+            policy_ids: Policies to rebuild; None rebuilds every policy without a card
+
+        Returns:
+            Number of cards written
+        """
+        select = self._policy_select("card")
+        if policy_ids is None:
+            rows = conn.execute(f"""
+                {select}
+                WHERE NOT EXISTS (SELECT 1 FROM policy_cards c WHERE c.policy_id = p.id)
+            """).fetchall()
+        else:
+            rows = []
+            for start in range(0, len(policy_ids), CARD_REFRESH_BATCH):
+                batch = policy_ids[start:start + CARD_REFRESH_BATCH]
+                placeholders = ", ".join("?" for _ in batch)
+                rows.extend(conn.execute(f"{select} WHERE p.id IN ({placeholders})", batch).fetchall())
+
+        card_rows = []
+        for row in rows:
+            # One malformed policy must not cost every other policy its card
+            try:
+                card = build_policy_card(self._decode_policy_row(row))
+            except Exception as e:
+                print(f"❌ Error building card for {row['id']}: {str(e)}")
+                continue
+            card_rows.append((card["id"], json.dumps(card), card["rating"]))
+
+        conn.executemany(
+            """
+            INSERT INTO policy_cards (policy_id, card_json, rating) VALUES (?, ?, ?)
+            ON CONFLICT(policy_id) DO UPDATE SET
+                card_json=excluded.card_json,
+                rating=excluded.rating,
+                updated_at=CURRENT_TIMESTAMP
+            """,
+            card_rows
+        )
+        return len(card_rows)
+
     def load_policy_from_json(self, json_file_path: str) -> bool:
         """Load a single policy from JSON file into the database."""
         try:
             with open(json_file_path, 'r', encoding='utf-8') as f:
                 policy_data = json.load(f)
             
-            # Extract key fields for easy querying
-            provider_info = policy_data.get('provider_information', {})
-            policy_id_info = policy_data.get('policy_identification', {})
-            core_financials = policy_data.get('core_financials_and_terms', {})
-            coverage = policy_data.get('coverage_and_benefits', {})
-            conditions = policy_data.get('conditions_and_cost_sharing', {})
-            
-            # Prepare data for insertion
-            policy_record = {
-                'id': policy_id_info.get('policy_id', f"policy_{Path(json_file_path).stem}"),
-                'provider_name': provider_info.get('provider_name', ''),
-                'plan_name': policy_id_info.get('plan_name', ''),
-                'policy_category': policy_id_info.get('policy_category', ''),
-                'product_uin': policy_id_info.get('product_uin', ''),
-                'provider_id': provider_info.get('provider_id', ''),
-                'claim_settlement_ratio': provider_info.get('claim_settlement_ratio', 0.0),
-                'solvency_ratio': provider_info.get('solvency_ratio', 0.0),
-                'network_hospitals_count': provider_info.get('network_hospitals_count', 0),
-                'sum_insured_options': json.dumps(core_financials.get('sum_insured_options', [])),
-                'payment_modes': json.dumps(core_financials.get('premium_details', {}).get('payment_modes', [])),
-                'base_premium': core_financials.get('premium_details', {}).get('base_premium_for_standard_profile', 0.0),
-                'is_tax_benefit_eligible': core_financials.get('is_tax_benefit_eligible_80d', False),
-                'room_rent_limit_type': coverage.get('room_rent_limits', {}).get('limit_type', ''),
-                'room_rent_description': coverage.get('room_rent_limits', {}).get('description', ''),
-                'icu_limit_type': coverage.get('icu_charge_limits', {}).get('limit_type', ''),
-                'icu_description': coverage.get('icu_charge_limits', {}).get('description', ''),
-                'pre_hospitalization_days': coverage.get('in_patient_hospitalization', {}).get('pre_hospitalization_days_covered', 0),
-                'post_hospitalization_days': coverage.get('in_patient_hospitalization', {}).get('post_hospitalization_days_covered', 0),
-                'daycare_covered': coverage.get('daycare_procedures', {}).get('is_covered', False),
-                'ambulance_covered': coverage.get('ambulance_cover', {}).get('is_covered', False),
-                'ambulance_limit': coverage.get('ambulance_cover', {}).get('limit_per_hospitalization', 0),
-                'no_claim_bonus_available': coverage.get('no_claim_bonus', {}).get('is_available', False),
-                'restoration_benefit_available': coverage.get('restoration_benefit', {}).get('is_available', False),
-                'maternity_covered': coverage.get('maternity_cover', {}).get('is_available', False),
-                'maternity_waiting_period': coverage.get('maternity_cover', {}).get('waiting_period_months', 0),
-                'waiting_period_initial': conditions.get('waiting_periods', {}).get('initial_period_days', 0),
-                'waiting_period_specific_ailments': conditions.get('waiting_periods', {}).get('specific_ailments_period_years', 0),
-                'waiting_period_pre_existing': conditions.get('waiting_periods', {}).get('pre_existing_diseases_period_years', 0),
-                'co_payment_applicable': conditions.get('co_payment', {}).get('is_applicable', False),
-                'co_payment_details': conditions.get('co_payment', {}).get('details', ''),
-                'raw_json': json.dumps(policy_data),
-                'source_file': json_file_path
-            }
+            policy_record = build_policy_record(policy_data, json_file_path)
             
             # Insert into database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Use INSERT OR REPLACE to handle duplicates
-            cursor.execute("""
-                INSERT OR REPLACE INTO policies (
-                    id, provider_name, plan_name, policy_category, product_uin, provider_id,
-                    claim_settlement_ratio, solvency_ratio, network_hospitals_count,
-                    sum_insured_options, payment_modes, base_premium, is_tax_benefit_eligible,
-                    room_rent_limit_type, room_rent_description, icu_limit_type, icu_description,
-                    pre_hospitalization_days, post_hospitalization_days, daycare_covered,
-                    ambulance_covered, ambulance_limit, no_claim_bonus_available,
-                    restoration_benefit_available, maternity_covered, maternity_waiting_period,
-                    waiting_period_initial, waiting_period_specific_ailments, waiting_period_pre_existing,
-                    co_payment_applicable, co_payment_details, raw_json, source_file
-                ) VALUES (
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-                )
-            """, tuple(policy_record.values()))
-            
-            conn.commit()
-            conn.close()
+            with self._writer() as conn:
+                self._write_policy_records(conn, [policy_record])
             
             print(f"✅ Successfully loaded policy: {policy_record['plan_name']}")
             return True
@@ -183,29 +957,132 @@ class PolicyDatabase:
             print(f"❌ Error loading {json_file_path}: {str(e)}")
             return False
     
-    def load_all_policies_from_directory(self, directory_path: str) -> int:
+    def load_all_policies_from_directory(self, directory_path: str, force: bool = False) -> int:
         """Load all extracted JSON files from a directory."""
-        loaded_count = 0
-        directory = Path(directory_path)
-        
-        # Look for *_extracted.json files
-        for json_file in directory.glob("*_extracted.json"):
-            if self.load_policy_from_json(str(json_file)):
-                loaded_count += 1
-        
-        return loaded_count
+        return self.bulk_load_policies(directory_path, force=force)["loaded"]
+
+    def bulk_load_policies(self, directory_path: str, workers: Optional[int] = None,
+                           force: bool = False) -> Dict[str, Any]:
+        """
+        Load every *_extracted.json file in a directory in one transaction.
+
+        Files whose size and mtime match the last run are skipped without
+        being read; files that changed on disk but still hash the same are
+        skipped after parsing. Parsing runs in a process pool when there are
+        enough files to make it worthwhile.
+
+        Args:
+            directory_path: Directory containing *_extracted.json files
+            workers: Parser processes (default: CPU count)
+            force: Reload every file regardless of ingestion state
+
+        Returns:
+            Per-run summary with loaded/skipped/failed counts
+        """
+        started = time.perf_counter()
+        files = sorted(str(path) for path in Path(directory_path).glob("*_extracted.json"))
+        summary = {
+            "files_seen": len(files),
+            "loaded": 0,
+            "skipped_unchanged": 0,
+            "failed": 0,
+            "errors": [],
+            "duration_seconds": 0.0
+        }
+
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT source_file, content_hash, mtime, size FROM ingestion_state")
+        previous = {row["source_file"]: row for row in cursor.fetchall()}
+
+        # Cheap first pass: skip files whose size and mtime are unchanged
+        stats = {}
+        to_parse = []
+        for path in files:
+            st = os.stat(path)
+            stats[path] = st
+            state = previous.get(path)
+            if not force and state and state["mtime"] == st.st_mtime and state["size"] == st.st_size:
+                summary["skipped_unchanged"] += 1
+            else:
+                to_parse.append(path)
+
+        if len(to_parse) >= BULK_PARSE_MIN_FILES_FOR_POOL and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(parse_policy_file, to_parse, chunksize=BULK_PARSE_CHUNKSIZE))
+        else:
+            parsed = [parse_policy_file(path) for path in to_parse]
+
+        records = []
+        state_rows = []
+        for result in parsed:
+            path = result["source_file"]
+            if "error" in result:
+                summary["failed"] += 1
+                summary["errors"].append({"source_file": path, "error": result["error"]})
+                continue
+
+            st = stats[path]
+            state = previous.get(path)
+            record = result["record"]
+            state_rows.append((path, result["content_hash"], st.st_mtime, st.st_size, record["id"]))
+            if not force and state and state["content_hash"] == result["content_hash"]:
+                # Touched but not modified; only the stored mtime needs refreshing
+                summary["skipped_unchanged"] += 1
+                continue
+            records.append(record)
+
+        with self._writer() as conn:
+            failures = self._write_policy_records_isolated(conn, records) if records else []
+            if failures:
+                # Left out of ingestion_state so the next run retries them
+                failed_files = {record["source_file"] for record, _ in failures}
+                state_rows = [row for row in state_rows if row[0] not in failed_files]
+                summary["failed"] += len(failures)
+                summary["errors"].extend(
+                    {"source_file": record["source_file"], "error": str(error)} for record, error in failures
+                )
+            conn.executemany(
+                """
+                INSERT INTO ingestion_state (source_file, content_hash, mtime, size, policy_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(source_file) DO UPDATE SET
+                    content_hash=excluded.content_hash,
+                    mtime=excluded.mtime,
+                    size=excluded.size,
+                    policy_id=excluded.policy_id,
+                    loaded_at=CURRENT_TIMESTAMP
+                """,
+                state_rows
+            )
+
+        summary["loaded"] = len(records) - len(failures)
+        summary["duration_seconds"] = round(time.perf_counter() - started, 3)
+
+        print(
+            f"✅ Bulk load from {directory_path}: {summary['loaded']} loaded, "
+            f"{summary['skipped_unchanged']} unchanged, {summary['failed']} failed "
+            f"({summary['duration_seconds']}s)"
+        )
+        for error in summary["errors"]:
+            print(f"❌ Error loading {error['source_file']}: {error['error']}")
+        return summary
 
     # --- New methods for summaries and chunks ---
 
     def upsert_section_summaries(self, policy_id: str, summaries: Dict[str, Dict[str, Any]]) -> None:
         """Store structured summaries for policy sections."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        rows = [
+            (
+                policy_id,
+                section,
+                data.get("summary", ""),
+                json.dumps({k: v for k, v in data.items() if k != "summary"})
+            )
+            for section, data in summaries.items()
+        ]
 
-        for section, data in summaries.items():
-            summary_text = data.get("summary", "")
-            metadata = json.dumps({k: v for k, v in data.items() if k != "summary"})
-            cursor.execute(
+        with self._writer() as conn:
+            conn.executemany(
                 """
                 INSERT INTO policy_section_summaries (policy_id, section_name, summary, metadata)
                 VALUES (?, ?, ?, ?)
@@ -213,25 +1090,25 @@ class PolicyDatabase:
                     summary=excluded.summary,
                     metadata=excluded.metadata
                 """,
-                (policy_id, section, summary_text, metadata)
+                rows
             )
 
-        conn.commit()
-        conn.close()
-
     def upsert_policy_chunks(self, policy_id: str, chunks: List[Dict[str, Any]]) -> None:
         """Store semantic chunks with embeddings for a policy."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        for chunk in chunks:
-            section = chunk.get("section_name")
-            text = chunk.get("chunk_text", "")
-            index = chunk.get("chunk_index")
-            embedding = chunk.get("embedding")
-            metadata = json.dumps(chunk.get("metadata", {}))
+        rows = [
+            (
+                policy_id,
+                chunk.get("section_name"),
+                chunk.get("chunk_text", ""),
+                chunk.get("chunk_index"),
+                chunk.get("embedding"),
+                json.dumps(chunk.get("metadata", {}))
+            )
+            for chunk in chunks
+        ]
 
-            cursor.execute(
+        with self._writer() as conn:
+            conn.executemany(
                 """
                 INSERT INTO policy_chunks (policy_id, section_name, chunk_text, chunk_index, embedding, metadata)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -241,23 +1118,17 @@ class PolicyDatabase:
                     embedding=excluded.embedding,
                     metadata=excluded.metadata
                 """,
-                (policy_id, section, text, index, embedding, metadata)
+                rows
             )
 
-        conn.commit()
-        conn.close()
-
     def get_section_summaries(self, policy_id: str) -> Dict[str, Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._reader().cursor()
 
         cursor.execute(
             "SELECT section_name, summary, metadata FROM policy_section_summaries WHERE policy_id = ?",
             (policy_id,)
         )
         rows = cursor.fetchall()
-        conn.close()
 
         summaries = {}
         for row in rows:
@@ -265,166 +1136,718 @@ class PolicyDatabase:
             summaries[row["section_name"]] = {"summary": row["summary"], **metadata}
         return summaries
 
-    def get_chunks_for_policy(self, policy_id: str) -> List[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def get_chunks_for_policy(self, policy_id: str, include_embeddings: bool = True) -> List[Dict[str, Any]]:
+        cursor = self._reader().cursor()
 
+        embedding_column = "embedding" if include_embeddings else "NULL AS embedding"
         cursor.execute(
-            "SELECT section_name, chunk_text, chunk_index, embedding, metadata FROM policy_chunks WHERE policy_id = ? ORDER BY chunk_index",
+            f"SELECT section_name, chunk_text, chunk_index, {embedding_column}, metadata FROM policy_chunks WHERE policy_id = ? ORDER BY chunk_index",
             (policy_id,)
         )
         rows = cursor.fetchall()
-        conn.close()
 
         result = []
         for row in rows:
-            embedding = row["embedding"]
             metadata = json.loads(row["metadata"]) if row["metadata"] else {}
-            result.append({
+            chunk = {
                 "section_name": row["section_name"],
                 "chunk_text": row["chunk_text"],
                 "chunk_index": row["chunk_index"],
-                "embedding": embedding,
                 "metadata": metadata
-            })
+            }
+            if include_embeddings:
+                chunk["embedding"] = row["embedding"]
+            result.append(chunk)
         return result
     
-    def get_all_policies(self) -> List[Dict[str, Any]]:
-        """Get all policies from the database."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # This allows us to access columns by name
-        cursor = conn.cursor()
+    @staticmethod
+    def _policy_select(column_set: str) -> str:
+        """SELECT ... FROM clause for one of the named COLUMN_SETS."""
+        if column_set not in COLUMN_SETS:
+            raise ValueError(f"Unknown column set: {column_set}")
+        spec = COLUMN_SETS[column_set]
+        query = f"SELECT {spec['columns']} FROM policies p"
+        if spec["policy_index"]:
+            query += f" INDEXED BY {spec['policy_index']}"
+        if spec["join_features"]:
+            query += " LEFT JOIN policy_features pf"
+            if spec["feature_index"]:
+                query += f" INDEXED BY {spec['feature_index']}"
+            query += " ON p.id = pf.policy_id"
+        return query
 
-        cursor.execute("""
-            SELECT p.*,
-                   pf.claim_settlement_ratio, pf.hospital_network, pf.room_rent, pf.copayment,
-                   pf.restoration_benefit, pf.pre_post_hospitalization_coverage,
-                   pf.waiting_period, pf.no_claim_bonus, pf.disease_sub_limits,
-                   pf.alternate_treatment_coverage, pf.maternity_care, pf.newborn_care,
-                   pf.health_checkups, pf.domiciliary, pf.outpatient_department,
-                   pf.lifelong_renewal, pf.critical_illness_rider, pf.accident_disability_rider,
-                   pf.extraction_source, pf.confidence_score
-            FROM policies p
-            LEFT JOIN policy_features pf ON p.id = pf.policy_id
-        """)
-        rows = cursor.fetchall()
-        conn.close()
+    @staticmethod
+    def _decode_policy_row(row: sqlite3.Row) -> Dict[str, Any]:
+        """Turn a row into a dict, parsing whichever JSON columns it carries."""
+        policy = dict(row)
+        for field in ('sum_insured_options', 'payment_modes'):
+            if field in policy:
+                policy[field] = json.loads(policy[field]) if policy[field] else []
+        return policy
 
-        policies = []
-        for row in rows:
-            policy = dict(row)
-            # Parse JSON fields
-            policy['sum_insured_options'] = json.loads(policy['sum_insured_options'])
-            policy['payment_modes'] = json.loads(policy['payment_modes'])
-            policies.append(policy)
+    def get_all_policies(self, column_set: str = "detail") -> List[Dict[str, Any]]:
+        """Get all policies from the database, reading only the given column set."""
+        cursor = self._reader().cursor()
+        cursor.execute(f"{self._policy_select(column_set)} ORDER BY p.id")
+        return [self._decode_policy_row(row) for row in cursor.fetchall()]
 
-        return policies
+    def get_facet_values(self, column: str) -> List[str]:
+        """Sorted distinct values of a facet column, read from its index."""
+        if column not in FACET_COLUMNS:
+            raise ValueError(f"Not a facet column: {column}")
+        cursor = self._reader().cursor()
+        cursor.execute(f"SELECT DISTINCT {column} FROM policies ORDER BY {column}")
+        return [row[0] for row in cursor.fetchall()]
     
     def get_policy_by_id(self, policy_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific policy by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._reader().cursor()
 
-        cursor.execute("""
-            SELECT p.*,
-                   pf.claim_settlement_ratio, pf.hospital_network, pf.room_rent, pf.copayment,
-                   pf.restoration_benefit, pf.pre_post_hospitalization_coverage,
-                   pf.waiting_period, pf.no_claim_bonus, pf.disease_sub_limits,
-                   pf.alternate_treatment_coverage, pf.maternity_care, pf.newborn_care,
-                   pf.health_checkups, pf.domiciliary, pf.outpatient_department,
-                   pf.lifelong_renewal, pf.critical_illness_rider, pf.accident_disability_rider,
-                   pf.extraction_source, pf.confidence_score
-            FROM policies p
-            LEFT JOIN policy_features pf ON p.id = pf.policy_id
-            WHERE p.id = ?
-        """, (policy_id,))
+        cursor.execute(f"{self._policy_select('detail')} WHERE p.id = ?", (policy_id,))
         row = cursor.fetchone()
-        conn.close()
 
         if row:
-            policy = dict(row)
-            policy['sum_insured_options'] = json.loads(policy['sum_insured_options'])
-            policy['payment_modes'] = json.loads(policy['payment_modes'])
+            policy = self._decode_policy_row(row)
             policy['raw_json'] = json.loads(policy['raw_json'])
             return policy
 
         return None
     
-    def search_policies(self, 
-                       provider_name: Optional[str] = None,
-                       policy_category: Optional[str] = None,
-                       min_sum_insured: Optional[int] = None,
-                       max_premium: Optional[float] = None,
-                       maternity_required: Optional[bool] = None,
-                       daycare_required: Optional[bool] = None) -> List[Dict[str, Any]]:
-        """Search policies with various filters."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM policies WHERE 1=1"
-        params = []
-        
+    def _build_policy_filters(self,
+                              provider_name: Optional[str] = None,
+                              policy_category: Optional[str] = None,
+                              min_sum_insured: Optional[int] = None,
+                              max_premium: Optional[float] = None,
+                              maternity_required: Optional[bool] = None,
+                              daycare_required: Optional[bool] = None,
+                              payment_mode: Optional[str] = None) -> tuple:
+        """Translate list filters into a WHERE clause over `policies p` and its parameters."""
+        clauses = []
+        params: List[Any] = []
+
         if provider_name:
-            query += " AND provider_name LIKE ?"
-            params.append(f"%{provider_name}%")
-        
+            # Literal substring, as in the catalog: '%' and '_' match only themselves
+            escaped = provider_name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("p.provider_name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+
         if policy_category:
-            query += " AND policy_category = ?"
+            clauses.append("p.policy_category = ?")
             params.append(policy_category)
-        
+
+        if min_sum_insured:
+            # Policies without any parsed option are kept, as before
+            clauses.append("""(
+                NOT EXISTS (SELECT 1 FROM policy_sum_insured_options s WHERE s.policy_id = p.id)
+                OR EXISTS (SELECT 1 FROM policy_sum_insured_options s WHERE s.policy_id = p.id AND s.amount >= ?)
+            )""")
+            params.append(min_sum_insured)
+
+        if max_premium is not None:
+            clauses.append("(p.base_premium IS NULL OR p.base_premium <= ?)")
+            params.append(max_premium)
+
         if maternity_required is not None:
-            query += " AND maternity_covered = ?"
+            clauses.append("p.maternity_covered = ?")
             params.append(maternity_required)
-        
+
         if daycare_required is not None:
-            query += " AND daycare_covered = ?"
+            clauses.append("p.daycare_covered = ?")
             params.append(daycare_required)
-        
-        cursor.execute(query, params)
+
+        if payment_mode:
+            clauses.append("p.id IN (SELECT m.policy_id FROM policy_payment_modes m WHERE m.payment_mode = ?)")
+            params.append(payment_mode)
+
+        where = " AND ".join(clauses) if clauses else "1=1"
+        return where, params
+
+    def query_policies(self,
+                       provider_name: Optional[str] = None,
+                       policy_category: Optional[str] = None,
+                       min_sum_insured: Optional[int] = None,
+                       max_premium: Optional[float] = None,
+                       maternity_required: Optional[bool] = None,
+                       daycare_required: Optional[bool] = None,
+                       payment_mode: Optional[str] = None,
+                       limit: Optional[int] = None,
+                       offset: int = 0,
+                       column_set: str = "card") -> Dict[str, Any]:
+        """
+        Filter and paginate policies entirely in SQL, reading only `column_set`.
+
+        Returns:
+            {"policies": [...one page...], "total": total matching rows}
+        """
+        where, params = self._build_policy_filters(
+            provider_name=provider_name,
+            policy_category=policy_category,
+            min_sum_insured=min_sum_insured,
+            max_premium=max_premium,
+            maternity_required=maternity_required,
+            daycare_required=daycare_required,
+            payment_mode=payment_mode
+        )
+        cursor = self._reader().cursor()
+
+        # The window count rides along with the page so one query gives both
+        select = self._policy_select(column_set).replace(
+            "SELECT ", "SELECT COUNT(*) OVER () AS total_count, ", 1
+        )
+        cursor.execute(f"""
+            {select}
+            WHERE {where}
+            ORDER BY p.id
+            LIMIT ? OFFSET ?
+        """, (*params, limit if limit else -1, offset or 0))
         rows = cursor.fetchall()
-        conn.close()
-        
+
+        if rows:
+            total = rows[0]["total_count"]
+        elif offset:
+            # Paged past the end: the window count has no row to ride on
+            cursor.execute(f"SELECT COUNT(*) FROM policies p WHERE {where}", params)
+            total = cursor.fetchone()[0]
+        else:
+            total = 0
+
         policies = []
         for row in rows:
-            policy = dict(row)
-            policy['sum_insured_options'] = json.loads(policy['sum_insured_options'])
-            policy['payment_modes'] = json.loads(policy['payment_modes'])
-            
-            # Apply additional filters that require JSON parsing
-            if min_sum_insured and policy['sum_insured_options']:
-                if max(policy['sum_insured_options']) < min_sum_insured:
-                    continue
-            
+            policy = self._decode_policy_row(row)
+            policy.pop('total_count', None)
             policies.append(policy)
-        
-        return policies
+
+        return {"policies": policies, "total": total}
+
+    def _ensure_policy_cards(self) -> None:
+        """Rebuild cards that triggers dropped after out-of-band edits."""
+        missing = self._reader().execute("""
+            SELECT 1 FROM policies p
+            WHERE NOT EXISTS (SELECT 1 FROM policy_cards c WHERE c.policy_id = p.id)
+            LIMIT 1
+        """).fetchone()
+        if missing:
+            with self._writer() as conn:
+                self._refresh_policy_cards(conn)
+
+    def query_policy_cards(self,
+                           provider_name: Optional[str] = None,
+                           policy_category: Optional[str] = None,
+                           min_sum_insured: Optional[int] = None,
+                           max_premium: Optional[float] = None,
+                           maternity_required: Optional[bool] = None,
+                           daycare_required: Optional[bool] = None,
+                           payment_mode: Optional[str] = None,
+                           sort: str = "id",
+                           limit: Optional[int] = None,
+                           offset: int = 0,
+                           cursor: Optional[str] = None,
+                           include_total: bool = True) -> Dict[str, Any]:
+        """
+        Same filters as query_policies, but returns the materialized frontend
+        cards in one of the POLICY_SORTS orders.
+
+        Pages either by offset or, when `cursor` is given, by keyset: the page
+        starts right after the (sort key, id) encoded in the cursor, so deep
+        pages cost the same as the first and don't shift during ingestion.
+
+        Returns:
+            {"policies": [...card dicts...], "total": matching rows or None
+             when include_total is False, "next_cursor": cursor for the next
+             page or None on the last page}
+        """
+        if sort not in POLICY_SORTS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        if cursor and offset:
+            raise ValueError("Use either cursor or offset, not both")
+
+        where, params = self._build_policy_filters(
+            provider_name=provider_name,
+            policy_category=policy_category,
+            min_sum_insured=min_sum_insured,
+            max_premium=max_premium,
+            maternity_required=maternity_required,
+            daycare_required=daycare_required,
+            payment_mode=payment_mode
+        )
+        spec = POLICY_SORTS[sort]
+        sort_key = sort_key_expression(sort)
+        direction = "DESC" if spec["descending"] else "ASC"
+
+        if sort == "id":
+            # Filter columns all live in the card covering index
+            from_clause = f"""
+                policies p INDEXED BY {COLUMN_SETS['card']['policy_index']}
+                LEFT JOIN policy_cards c ON c.policy_id = p.id
+            """
+            tie_break = "p.id"
+            order_by = "p.id"
+        elif spec["table"] == "c":
+            # Walk the card sort index; every policy needs a card for this
+            self._ensure_policy_cards()
+            from_clause = f"""
+                policy_cards c INDEXED BY {spec['index']}
+                JOIN policies p ON p.id = c.policy_id
+            """
+            tie_break = "c.policy_id"
+            order_by = f"{sort_key} {direction}, c.policy_id {direction}"
+        else:
+            # Walk the sort index so LIMIT stops the scan without a sort step
+            from_clause = f"""
+                policies p INDEXED BY {spec['index']}
+                LEFT JOIN policy_cards c ON c.policy_id = p.id
+            """
+            tie_break = "p.id"
+            order_by = f"{sort_key} {direction}, p.id {direction}"
+
+        page_where, page_params = where, list(params)
+        if cursor:
+            after_key, after_id = decode_cursor(cursor, sort)
+            comparison = "<" if spec["descending"] else ">"
+            if sort == "id":
+                page_where += " AND p.id > ?"
+                page_params.append(after_id)
+            else:
+                # The plain bound on the key lets SQLite seek into the index;
+                # the row-value comparison then skips ties already returned
+                page_where += f" AND {sort_key} {comparison}= ? AND ({sort_key}, {tie_break}) {comparison} (?, ?)"
+                page_params.extend([after_key, after_key, after_id])
+
+        db_cursor = self._reader().cursor()
+        # One extra row tells us whether there is a next page
+        db_cursor.execute(f"""
+            SELECT {sort_key} AS sort_key, p.id, c.card_json
+            FROM {from_clause}
+            WHERE {page_where}
+            ORDER BY {order_by}
+            LIMIT ? OFFSET ?
+        """, (*page_params, limit + 1 if limit else -1, offset or 0))
+        rows = db_cursor.fetchall()
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort, rows[-1]["sort_key"], rows[-1]["id"])
+
+        total = None
+        if include_total:
+            db_cursor.execute(f"SELECT COUNT(*) FROM policies p WHERE {where}", params)
+            total = db_cursor.fetchone()[0]
+
+        # Cards dropped by a trigger since the last ingest are rebuilt here
+        stale_ids = [row["id"] for row in rows if row["card_json"] is None]
+        rebuilt = {}
+        if stale_ids:
+            with self._writer() as conn:
+                self._refresh_policy_cards(conn, stale_ids)
+                placeholders = ", ".join("?" for _ in stale_ids)
+                rebuilt = {
+                    row["policy_id"]: row["card_json"]
+                    for row in conn.execute(
+                        f"SELECT policy_id, card_json FROM policy_cards WHERE policy_id IN ({placeholders})",
+                        stale_ids
+                    )
+                }
+
+        # A policy whose card could not be built is left out rather than failing the page
+        cards = [
+            json.loads(row["card_json"] if row["card_json"] is not None else rebuilt[row["id"]])
+            for row in rows
+            if row["card_json"] is not None or row["id"] in rebuilt
+        ]
+        return {"policies": cards, "total": total, "next_cursor": next_cursor}
+
+    def search_policies(self, 
+                       provider_name: Optional[str] = None,
+                       policy_category: Optional[str] = None,
+                       min_sum_insured: Optional[int] = None,
+                       max_premium: Optional[float] = None,
+                       maternity_required: Optional[bool] = None,
+                       daycare_required: Optional[bool] = None,
+                       column_set: str = "detail") -> List[Dict[str, Any]]:
+        """Search policies with various filters."""
+        return self.query_policies(
+            provider_name=provider_name,
+            policy_category=policy_category,
+            min_sum_insured=min_sum_insured,
+            max_premium=max_premium,
+            maternity_required=maternity_required,
+            daycare_required=daycare_required,
+            column_set=column_set
+        )["policies"]
     
+    @staticmethod
+    def _fts_match_expression(query: str) -> Optional[str]:
+        """Turn free text into an FTS5 query: every word must match, as a prefix."""
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return None
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search_policy_text(self, query: str, limit: int = 20, snippets_per_policy: int = 3) -> List[Dict[str, Any]]:
+        """
+        Ranked full-text search over plan/provider names, section summaries and chunks.
+
+        Returns:
+            Policies ordered by relevance, each with highlighted names and
+            the best matching snippets (HTML-escaped, matches wrapped in <mark>)
+        """
+        match = self._fts_match_expression(query)
+        if match is None:
+            return []
+
+        cursor = self._reader().cursor()
+        # Each index is searched on its own; bm25() is lower-is-better
+        candidate_limit = limit * 10
+        cursor.execute("""
+            SELECT p.id AS policy_id, 'policy' AS source, NULL AS section_name,
+                   highlight(policies_fts, 0, ?, ?) AS snippet,
+                   bm25(policies_fts, 2.0, 1.0) AS score
+            FROM policies_fts
+            JOIN policies p ON p.rowid = policies_fts.rowid
+            WHERE policies_fts MATCH ?
+            ORDER BY score
+            LIMIT ?
+        """, (FTS_MARK_OPEN, FTS_MARK_CLOSE, match, candidate_limit))
+        hits = cursor.fetchall()
+        cursor.execute("""
+            SELECT s.policy_id, 'summary' AS source, s.section_name,
+                   snippet(section_summaries_fts, 1, ?, ?, '…', 16) AS snippet,
+                   bm25(section_summaries_fts) AS score
+            FROM section_summaries_fts
+            JOIN policy_section_summaries s ON s.id = section_summaries_fts.rowid
+            WHERE section_summaries_fts MATCH ?
+            ORDER BY score
+            LIMIT ?
+        """, (FTS_MARK_OPEN, FTS_MARK_CLOSE, match, candidate_limit))
+        hits += cursor.fetchall()
+        cursor.execute("""
+            SELECT c.policy_id, 'chunk' AS source, c.section_name,
+                   snippet(chunks_fts, 1, ?, ?, '…', 16) AS snippet,
+                   bm25(chunks_fts) AS score
+            FROM chunks_fts
+            JOIN policy_chunks c ON c.id = chunks_fts.rowid
+            WHERE chunks_fts MATCH ?
+            ORDER BY score
+            LIMIT ?
+        """, (FTS_MARK_OPEN, FTS_MARK_CLOSE, match, candidate_limit))
+        hits += cursor.fetchall()
+
+        # Combine per policy: weighted sum of (negated) bm25 scores
+        results: Dict[str, Dict[str, Any]] = {}
+        for hit in hits:
+            result = results.setdefault(hit["policy_id"], {"policy_id": hit["policy_id"], "score": 0.0, "matches": []})
+            result["score"] += -hit["score"] * FTS_SOURCE_WEIGHTS[hit["source"]]
+            result["matches"].append({
+                "source": hit["source"],
+                "section_name": hit["section_name"],
+                "snippet": mark_fts_matches(hit["snippet"]),
+                "score": -hit["score"]
+            })
+
+        ranked = sorted(results.values(), key=lambda r: r["score"], reverse=True)[:limit]
+        if not ranked:
+            return []
+
+        placeholders = ", ".join("?" for _ in ranked)
+        ranked_ids = [r["policy_id"] for r in ranked]
+        cursor.execute(
+            f"SELECT id, plan_name, provider_name FROM policies WHERE id IN ({placeholders})",
+            ranked_ids
+        )
+        names = {row["id"]: row for row in cursor.fetchall()}
+        # highlight() only works on rows the MATCH produced
+        cursor.execute(f"""
+            SELECT p.id,
+                   highlight(policies_fts, 0, ?, ?) AS plan_name,
+                   highlight(policies_fts, 1, ?, ?) AS provider_name
+            FROM policies_fts
+            JOIN policies p ON p.rowid = policies_fts.rowid
+            WHERE policies_fts MATCH ? AND p.id IN ({placeholders})
+        """, (FTS_MARK_OPEN, FTS_MARK_CLOSE, FTS_MARK_OPEN, FTS_MARK_CLOSE, match, *ranked_ids))
+        highlights = {row["id"]: row for row in cursor.fetchall()}
+
+        for result in ranked:
+            row = names.get(result["policy_id"])
+            highlighted = highlights.get(result["policy_id"]) or row
+            result["plan_name"] = row["plan_name"] if row else None
+            result["provider_name"] = row["provider_name"] if row else None
+            result["highlights"] = {
+                "plan_name": mark_fts_matches(highlighted["plan_name"]) if highlighted else None,
+                "provider_name": mark_fts_matches(highlighted["provider_name"]) if highlighted else None
+            }
+            result["score"] = round(result["score"], 4)
+            result["matches"] = sorted(result["matches"], key=lambda m: m["score"], reverse=True)[:snippets_per_policy]
+            for match_info in result["matches"]:
+                match_info["score"] = round(match_info["score"], 4)
+        return ranked
+
+    def get_dataset_version(self) -> int:
+        """Current catalog version; changes whenever a policy or its features change."""
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT value FROM dataset_meta WHERE key = 'dataset_version'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def get_policy_versions(self) -> Dict[str, int]:
+        """Version of every policy that has (or had) stored data."""
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT policy_id, version FROM policy_versions")
+        return dict(cursor.fetchall())
+
+    def get_chunk_vectors(self, policy_ids: List[str]) -> List[Tuple[int, str, bytes]]:
+        """(chunk id, policy id, embedding blob) for the policies' embedded chunks."""
+        cursor = self._reader().cursor()
+        rows = []
+        for start in range(0, len(policy_ids), CARD_REFRESH_BATCH):
+            batch = policy_ids[start:start + CARD_REFRESH_BATCH]
+            placeholders = ", ".join("?" for _ in batch)
+            cursor.execute(f"""
+                SELECT id, policy_id, embedding FROM policy_chunks
+                WHERE policy_id IN ({placeholders}) AND embedding IS NOT NULL
+                ORDER BY id
+            """, batch)
+            rows.extend(tuple(row) for row in cursor.fetchall())
+        return rows
+
+    def get_chunk_embedding_shape(self) -> Tuple[int, int]:
+        """(count, dimension) of stored chunk embeddings; the first one sets the dimension."""
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT length(embedding) FROM policy_chunks WHERE embedding IS NOT NULL LIMIT 1")
+        row = cursor.fetchone()
+        if row is None:
+            return 0, 0
+        dim = row[0] // 4
+        cursor.execute("SELECT COUNT(*) FROM policy_chunks WHERE length(embedding) = ?", (dim * 4,))
+        return cursor.fetchone()[0], dim
+
+    def iter_chunk_embeddings(self, dim: int) -> Iterator[Tuple[str, int, bytes]]:
+        """(policy id, chunk_index, float32 blob) of every `dim`-sized embedding, by policy then chunk."""
+        cursor = self._reader().cursor()
+        cursor.execute("""
+            SELECT policy_id, chunk_index, embedding FROM policy_chunks
+            WHERE length(embedding) = ?
+            ORDER BY policy_id, chunk_index
+        """, (dim * 4,))
+        for row in cursor:
+            yield row[0], row[1], row[2]
+
+    def get_chunks_by_ids(self, chunk_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Text and location of the given chunks, keyed by chunk id."""
+        cursor = self._reader().cursor()
+        chunks = {}
+        for start in range(0, len(chunk_ids), CARD_REFRESH_BATCH):
+            batch = chunk_ids[start:start + CARD_REFRESH_BATCH]
+            placeholders = ", ".join("?" for _ in batch)
+            cursor.execute(f"""
+                SELECT id, policy_id, section_name, chunk_index, chunk_text FROM policy_chunks
+                WHERE id IN ({placeholders})
+            """, batch)
+            for row in cursor.fetchall():
+                chunks[row["id"]] = dict(row)
+        return chunks
+
+    def get_tag_versions(self, tags: List[str]) -> Dict[str, int]:
+        """
+        Current version of each cache tag (DATASET_TAG, CONTENT_TAG or a
+        policy_tag). A cached value is still valid while every tag it was
+        stored with has the same version; unknown policies are version 0.
+        """
+        cursor = self._reader().cursor()
+        versions = {}
+        policy_ids = [tag[len(POLICY_TAG_PREFIX):] for tag in tags if tag.startswith(POLICY_TAG_PREFIX)]
+        if policy_ids:
+            placeholders = ", ".join("?" for _ in policy_ids)
+            cursor.execute(
+                f"SELECT policy_id, version FROM policy_versions WHERE policy_id IN ({placeholders})",
+                policy_ids
+            )
+            found = dict(cursor.fetchall())
+            for policy_id in policy_ids:
+                versions[policy_tag(policy_id)] = found.get(policy_id, 0)
+
+        meta_keys = {DATASET_TAG: "dataset_version", CONTENT_TAG: "content_version"}
+        wanted = [tag for tag in tags if tag in meta_keys]
+        if wanted:
+            placeholders = ", ".join("?" for _ in wanted)
+            cursor.execute(
+                f"SELECT key, value FROM dataset_meta WHERE key IN ({placeholders})",
+                [meta_keys[tag] for tag in wanted]
+            )
+            found = dict(cursor.fetchall())
+            for tag in wanted:
+                versions[tag] = found.get(meta_keys[tag], 0)
+        return versions
+
+    def get_catalog_rows(self) -> Dict[str, Any]:
+        """
+        Read everything the in-memory catalog needs in one consistent snapshot.
+
+        Returns:
+            {"version": dataset version, "rows": [...]} where each row holds
+            the scalar filter/sort columns, the card JSON, the largest parsed
+            sum insured option and the payment modes
+        """
+        # Cards dropped by triggers since the last ingest are rebuilt first
+        self._ensure_policy_cards()
+
+        cursor = self._reader().cursor()
+        # One read transaction so the version matches the rows
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute("SELECT value FROM dataset_meta WHERE key = 'dataset_version'")
+            version = cursor.fetchone()[0]
+            cursor.execute("""
+                SELECT p.id, p.provider_name, p.policy_category,
+                       p.claim_settlement_ratio, p.network_hospitals_count, p.base_premium,
+                       p.maternity_covered, p.daycare_covered, p.no_claim_bonus_available,
+                       p.restoration_benefit_available, p.ambulance_covered,
+                       p.waiting_period_initial, p.waiting_period_pre_existing,
+                       p.waiting_period_specific_ailments,
+                       c.card_json, c.rating,
+                       (SELECT MIN(s.amount) FROM policy_sum_insured_options s WHERE s.policy_id = p.id)
+                           AS min_sum_insured,
+                       (SELECT MAX(s.amount) FROM policy_sum_insured_options s WHERE s.policy_id = p.id)
+                           AS max_sum_insured,
+                       (SELECT GROUP_CONCAT(m.payment_mode, char(31)) FROM policy_payment_modes m
+                        WHERE m.policy_id = p.id) AS payment_modes
+                FROM policies p
+                LEFT JOIN policy_cards c ON c.policy_id = p.id
+                ORDER BY p.id
+            """)
+            rows = [dict(row) for row in cursor.fetchall()]
+        finally:
+            cursor.execute("COMMIT")
+
+        for row in rows:
+            modes = row["payment_modes"]
+            row["payment_modes"] = modes.split("\x1f") if modes else []
+        return {"version": version, "rows": rows}
+
     def get_policy_statistics(self) -> Dict[str, Any]:
-        """Get statistics about the policies in the database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """
+        Get statistics about the policies in the database.
+
+        Reads the trigger-maintained aggregate tables, so the cost does not
+        grow with the number of policies.
+        """
+        cursor = self._reader().cursor()
+        # One read transaction so the totals agree with the per-category counts
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute("""
+                SELECT total_policies, total_providers, claim_ratio_sum, claim_ratio_count
+                FROM policy_aggregates WHERE id = 1
+            """)
+            totals = cursor.fetchone()
+            cursor.execute("SELECT category, policy_count FROM policy_category_counts")
+            by_category = dict(cursor.fetchall())
+        finally:
+            cursor.execute("COMMIT")
+
         stats = {}
-        
-        # Total policies
-        cursor.execute("SELECT COUNT(*) FROM policies")
-        stats['total_policies'] = cursor.fetchone()[0]
-        
-        # Policies by category
-        cursor.execute("SELECT policy_category, COUNT(*) FROM policies GROUP BY policy_category")
-        stats['by_category'] = dict(cursor.fetchall())
-        
-        # Providers
-        cursor.execute("SELECT COUNT(DISTINCT provider_name) FROM policies")
-        stats['total_providers'] = cursor.fetchone()[0]
-        
+        stats['total_policies'] = totals['total_policies'] if totals else 0
+        stats['by_category'] = by_category
+        stats['total_providers'] = totals['total_providers'] if totals else 0
         # Average claim settlement ratio
-        cursor.execute("SELECT AVG(claim_settlement_ratio) FROM policies WHERE claim_settlement_ratio > 0")
-        result = cursor.fetchone()[0]
-        stats['avg_claim_settlement_ratio'] = result if result else 0
-        
-        conn.close()
+        if totals and totals['claim_ratio_count']:
+            stats['avg_claim_settlement_ratio'] = totals['claim_ratio_sum'] / totals['claim_ratio_count']
+        else:
+            stats['avg_claim_settlement_ratio'] = 0
+
         return stats
+
+    def ping(self) -> bool:
+        """Cheap readiness probe: the database file opens and answers a query."""
+        self._reader().execute("SELECT 1 FROM policy_aggregates LIMIT 1").fetchone()
+        return True
+
+
+class AsyncPolicyDatabase:
+    """
+    Async facade over PolicyDatabase for FastAPI handlers.
+
+    Every call runs on a dedicated, bounded thread pool so SQLite work never
+    blocks the event loop. Each pool thread gets its own pooled read
+    connection. Any PolicyDatabase method can be awaited directly:
+
+        policy = await async_db.get_policy_by_id(policy_id)
+    """
+
+    def __init__(self, db: PolicyDatabase, max_workers: int = 4):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="policy-db")
+
+        # Sizing metrics, guarded by _metrics_lock
+        self._metrics_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `func(*args, **kwargs)` on the database pool and await its result."""
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        with self._metrics_lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        def task():
+            started = time.perf_counter()
+            wait = started - submitted
+            with self._metrics_lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                with self._metrics_lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._failed += failed
+                    self._total_run += time.perf_counter() - started
+
+        return await loop.run_in_executor(self._executor, task)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and wait/run times for sizing the pool."""
+        with self._metrics_lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queued,
+                "in_flight": self._running,
+                "completed": completed,
+                "failed": self._failed,
+                "avg_wait_ms": round(self._total_wait / completed * 1000, 3) if completed else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+                "avg_run_ms": round(self._total_run / completed * 1000, 3) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the pool, waiting for queued calls to finish."""
+        self._executor.shutdown(wait=True)
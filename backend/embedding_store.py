@@ -0,0 +1,159 @@
+"""
+On-disk chunk embedding store, memory-mapped read-only by the API.
+
+PolicySummariesGenerator exports every chunk embedding, L2-normalized, into
+one contiguous float32 .npy file, with a row -> chunk_index sidecar and a
+JSON manifest giving each policy's row range and the policy version it was
+exported at. API workers np.load() the array with mmap_mode="r", so all of
+them share the same page-cache pages instead of each holding a copy.
+
+Each export writes a new generation of files and then replaces the manifest
+with os.replace, so readers see either the old or the new store, never a
+mix. Older generations are unlinked; a worker still mapping one keeps its
+pages until it reopens.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .database import PolicyDatabase
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "embeddings")
+# Readers look for a newer manifest at most this often
+EMBEDDING_STORE_CHECK_SECONDS = float(os.getenv("EMBEDDING_STORE_CHECK_SECONDS", "5"))
+MANIFEST_NAME = "manifest.json"
+
+
+def export_embedding_store(db: PolicyDatabase, store_dir: str = EMBEDDING_STORE_DIR) -> Dict[str, Any]:
+    """Write all chunk embeddings as a new store generation; returns the manifest."""
+    directory = Path(store_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / MANIFEST_NAME
+    try:
+        generation = json.loads(manifest_path.read_text(encoding="utf-8"))["generation"] + 1
+    except (OSError, ValueError, KeyError):
+        generation = 1
+
+    count, dim = db.get_chunk_embedding_shape()
+    vectors_name = f"chunk_embeddings-{generation}.npy"
+    indexes_name = f"chunk_indexes-{generation}.npy"
+    # Read before the vectors: a policy changed meanwhile is labelled with
+    # its older version, so readers fall back to the database for it
+    versions = db.get_policy_versions()
+    policies: Dict[str, Dict[str, int]] = {}
+
+    if count == 0:
+        np.save(directory / vectors_name, np.zeros((0, dim), dtype=np.float32))
+    else:
+        # Streamed into the memory-mapped output so the export never holds every blob
+        vectors = np.lib.format.open_memmap(directory / vectors_name, mode="w+", dtype=np.float32, shape=(count, dim))
+    chunk_indexes = np.zeros(count, dtype=np.int64)
+    row = 0
+    for policy_id, chunk_index, blob in db.iter_chunk_embeddings(dim):
+        # Chunks written since counting wait for the next export; rows
+        # left over at the end (chunks deleted meanwhile) stay unreferenced
+        if row >= count:
+            break
+        vector = np.frombuffer(blob, dtype=np.float32)
+        vectors[row] = vector / max(float(np.linalg.norm(vector)), 1e-10)
+        chunk_indexes[row] = chunk_index
+        entry = policies.setdefault(policy_id, {"start": row, "version": versions.get(policy_id, 0)})
+        entry["end"] = row + 1
+        row += 1
+    if count:
+        vectors.flush()
+        del vectors
+    np.save(directory / indexes_name, chunk_indexes[:row])
+
+    manifest = {
+        "generation": generation,
+        "created_at": time.time(),
+        "count": row,
+        "dim": dim,
+        "vectors": vectors_name,
+        "chunk_indexes": indexes_name,
+        "policies": policies
+    }
+    tmp_path = directory / f"{MANIFEST_NAME}.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+    # Superseded generations are no longer referenced by the manifest
+    for path in directory.glob("chunk_*.npy"):
+        if path.name not in (vectors_name, indexes_name):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    logger.info(f"Exported embedding store generation {generation}: {row} vectors, {len(policies)} policies")
+    return manifest
+
+
+class EmbeddingStore:
+    """Read-only view of the current store generation, reopened when it changes."""
+
+    def __init__(self, store_dir: str = EMBEDDING_STORE_DIR,
+                 check_interval: float = EMBEDDING_STORE_CHECK_SECONDS):
+        self.manifest_path = Path(store_dir) / MANIFEST_NAME
+        self.store_dir = Path(store_dir)
+        self.check_interval = check_interval
+        self.generation: Optional[int] = None
+        self._policies: Dict[str, Dict[str, int]] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._chunk_indexes: Optional[np.ndarray] = None
+        self._manifest_mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = self.manifest_path.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            vectors = np.load(self.store_dir / manifest["vectors"], mmap_mode="r")
+            chunk_indexes = np.load(self.store_dir / manifest["chunk_indexes"], mmap_mode="r")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Embedding store at {self.store_dir} unreadable: {str(e)}")
+            return
+        # Swapping the references leaves the previous mapping to whoever still holds it
+        self._vectors, self._chunk_indexes = vectors, chunk_indexes
+        self._policies = manifest["policies"]
+        self.generation = manifest["generation"]
+        self._manifest_mtime = mtime
+        logger.info(f"Mapped embedding store generation {self.generation}: {len(vectors)} vectors")
+
+    def policy_rows(self, policy_id: str, version: Optional[int]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (normalized vectors, chunk indexes) for the policy as zero-copy views,
+        or None if the store lacks the policy or was exported at another version.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._policies.get(policy_id)
+            if entry is None or entry["version"] != version:
+                return None
+            return (self._vectors[entry["start"]:entry["end"]],
+                    self._chunk_indexes[entry["start"]:entry["end"]])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "generation": self.generation,
+            "vectors": len(self._vectors) if self._vectors is not None else 0,
+            "policies": len(self._policies)
+        }
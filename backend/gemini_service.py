@@ -2,8 +2,11 @@
 Gemini service for policy document analysis
 """
 import os
+import asyncio
 import json
+import logging
 import re
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
@@ -13,9 +16,16 @@ import google.genai as genai
 from google.genai import types
 from dotenv import load_dotenv
 
-from .database import PolicyDatabase
+from .database import PolicyDatabase, policy_tag
 from .cache import cache
+from .semantic_cache import SemanticAnswerCache, SEMANTIC_CACHE_ENABLED
+from .answer_store import create_answer_store, normalize_question
+from .retrieval import PolicyChunkIndex, QueryEmbeddingCache
+from .embedding_store import EmbeddingStore
+from .vector_index import ChunkVectorIndex
+from .inference import InferenceScheduler
 from .prompts import (
+    PROMPT_TEMPLATE_VERSION,
     POLICY_QA_PROMPT,
     POLICY_SUMMARY_PROMPT,
     ERROR_POLICY_NOT_FOUND,
@@ -26,6 +36,17 @@ from .prompts import (
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Answers are tagged with their policy's version and dropped when it is
+# re-ingested, so they can be kept much longer than a fixed hour
+GEMINI_ANSWER_TTL_SECONDS = int(os.getenv("GEMINI_ANSWER_TTL_SECONDS", "86400"))
+
+# Serve a cached answer up to this long past its TTL while it is refreshed
+GEMINI_ANSWER_STALE_SECONDS = float(os.getenv("GEMINI_ANSWER_STALE_SECONDS", "0"))
+
+GEMINI_SUMMARY_MODEL = "gemini-2.5-pro"
+
 
 class ModelRouter:
     """Routes queries to appropriate Gemini model based on complexity"""
@@ -97,10 +118,35 @@ class GeminiPolicyService:
         # Lazy load models (only when first needed to save memory at startup)
         self._embedding_model = None
         self._reranker = None
+        # Questions are answered on worker threads; load each model once
+        self._model_lock = threading.Lock()
+
+        # Encode and rerank calls from concurrent questions, run in shared batches
+        self.inference = InferenceScheduler(
+            lambda texts: self.embedding_model.encode(texts, batch_size=len(texts)),
+            lambda pairs: self.reranker.predict(pairs, batch_size=len(pairs))
+        )
 
         # Initialize model router for cost optimization
         self.model_router = ModelRouter()
 
+        # Reuses answers across paraphrased questions about the same policy
+        self.semantic_cache = SemanticAnswerCache() if SEMANTIC_CACHE_ENABLED else None
+
+        # Answers and summaries persisted across restarts
+        self.answer_store = create_answer_store()
+
+        # Question vectors, reused when the same question is asked about another policy
+        self.query_embeddings = QueryEmbeddingCache()
+
+        # Per-policy chunk embedding matrices for first-stage retrieval,
+        # mapped from the shared on-disk store where it is current
+        self.embedding_store = EmbeddingStore()
+        self.chunk_index = PolicyChunkIndex(self.db, self.policy_version, store=self.embedding_store)
+
+        # Approximate nearest-neighbour index over every policy's chunks
+        self.vector_index = ChunkVectorIndex(self.db)
+
         # Path to extracted policy data (fallback)
         self.policy_data_dir = Path("results/health_file_api")
 
@@ -108,16 +154,48 @@ class GeminiPolicyService:
     def embedding_model(self):
         """Lazy load embedding model only when needed"""
         if self._embedding_model is None:
-            self._embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+            with self._model_lock:
+                if self._embedding_model is None:
+                    self._embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
         return self._embedding_model
 
     @property
     def reranker(self):
         """Lazy load reranker model only when needed"""
         if self._reranker is None:
-            self._reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
+            with self._model_lock:
+                if self._reranker is None:
+                    self._reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
         return self._reranker
     
+    def warm_up(self, policy_ids: List[str], load_models: bool = True) -> int:
+        """
+        Prepare retrieval ahead of the first questions: load the models,
+        read the hot policies' summaries and build their chunk matrices.
+        Returns how many of the policies have chunks.
+        """
+        if load_models:
+            self.embedding_model
+            self.reranker
+        self.vector_index.refresh(force=True)
+        warmed = 0
+        for policy_id in policy_ids:
+            self.db.get_section_summaries(policy_id)
+            if len(self.chunk_index.get(policy_id)):
+                warmed += 1
+        return warmed
+
+    def close(self) -> None:
+        """Flush pending answer store writes."""
+        if self.answer_store is not None:
+            self.answer_store.close()
+
+    @staticmethod
+    def policy_version(policy_id: str) -> Optional[int]:
+        """Version of the policy's data, which stored answers are checked against."""
+        tag = policy_tag(policy_id)
+        return cache.tag_versions([tag]).get(tag)
+
     def get_policy_document(self, policy_id: str) -> Optional[Dict[str, Any]]:
         """
         Load policy document data, preferring the database copy.
@@ -152,46 +230,45 @@ class GeminiPolicyService:
         
         return formatted_history
     
-    def retrieve_policy_context(self, policy_id: str, question: str, top_k: int = 4) -> Dict[str, Any]:
+    def embed_question(self, question: str) -> np.ndarray:
+        """L2-normalized float32 embedding of a question (read-only, possibly shared)."""
+        def encode():
+            question_embedding = np.asarray(self.inference.encode(question), dtype=np.float32)
+            return question_embedding / (np.linalg.norm(question_embedding) + 1e-10)
+
+        return self.query_embeddings.get_or_compute(normalize_question(question), encode)
+
+    def candidate_chunk_ids(self, policy_id: str, question_embedding: np.ndarray, limit: int = 10) -> List[int]:
+        """chunk_index of the first-stage (embedding) retrieval candidates."""
+        return [chunk["chunk_index"] for _, chunk in self.chunk_index.search(policy_id, question_embedding, limit)]
+
+    def retrieve_policy_context(self, policy_id: str, question: str, top_k: int = 4,
+                                question_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Fetch section summaries and the most relevant semantic chunks for the question.
         Uses two-stage retrieval: (1) initial embedding search, (2) cross-encoder reranking
         """
         summaries = self.db.get_section_summaries(policy_id)
-        chunks = self.db.get_chunks_for_policy(policy_id)
+        policy_chunks = self.chunk_index.get(policy_id)
         relevant_chunks: List[Dict[str, Any]] = []
+        candidate_ids: List[int] = []
 
-        if chunks:
-            # STAGE 1: Initial retrieval with embeddings (get top 10)
-            question_embedding = self.embedding_model.encode([question])[0]
-            question_embedding = question_embedding / (np.linalg.norm(question_embedding) + 1e-10)
-
-            scored_chunks = []
-            for chunk in chunks:
-                embedding_blob = chunk.get("embedding")
-                if not embedding_blob:
-                    continue
-                chunk_embedding = np.frombuffer(embedding_blob, dtype=np.float32)
-                norm = np.linalg.norm(chunk_embedding)
-                if norm == 0:
-                    continue
-                chunk_embedding = chunk_embedding / norm
-                score = float(np.dot(question_embedding, chunk_embedding))
-                scored_chunks.append((score, chunk))
-
-            scored_chunks.sort(key=lambda x: x[0], reverse=True)
-
-            # Get top 10 candidates for reranking (or fewer if not enough chunks)
-            initial_top_k = min(10, len(scored_chunks))
-            candidate_chunks = [chunk for _, chunk in scored_chunks[:initial_top_k]]
+        if len(policy_chunks):
+            # STAGE 1: Initial retrieval with embeddings (get top 10):
+            # one product with the policy's normalized chunk matrix
+            if question_embedding is None:
+                question_embedding = self.embed_question(question)
+            scored_chunks = policy_chunks.top_k(question_embedding, 10)
+            candidate_chunks = [chunk for _, chunk in scored_chunks]
+            candidate_ids = [chunk["chunk_index"] for chunk in candidate_chunks]
 
             # STAGE 2: Rerank with cross-encoder for better relevance
             if len(candidate_chunks) > top_k:
                 # Create pairs of (question, chunk_text) for reranking
                 pairs = [(question, chunk["chunk_text"]) for chunk in candidate_chunks]
 
-                # Get reranking scores from cross-encoder
-                rerank_scores = self.reranker.predict(pairs)
+                # Get reranking scores from cross-encoder, batched with other questions'
+                rerank_scores = self.inference.rerank(pairs)
 
                 # Sort by reranking scores and take top_k
                 reranked = sorted(zip(rerank_scores, candidate_chunks), key=lambda x: x[0], reverse=True)
@@ -213,9 +290,39 @@ class GeminiPolicyService:
 
         return {
             "summaries": summaries,
-            "relevant_chunks": relevant_chunks
+            "relevant_chunks": relevant_chunks,
+            "candidate_ids": candidate_ids
         }
 
+    def semantic_search(self, question: str, limit: int = 10, chunks_per_policy: int = 2,
+                        allowed_policies: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Policies whose chunks best match the question, across the catalog,
+        each with its supporting chunks. Blocking; run off the event loop.
+        """
+        results = self.vector_index.search(
+            self.embed_question(question), limit=limit,
+            chunks_per_policy=chunks_per_policy, allowed_policies=allowed_policies
+        )
+        chunks = self.db.get_chunks_by_ids([chunk["chunk_id"] for result in results for chunk in result["chunks"]])
+        for result in results:
+            result["score"] = round(result["score"], 4)
+            supporting = []
+            for hit in result["chunks"]:
+                chunk = chunks.get(hit["chunk_id"])
+                if chunk is None:
+                    continue
+                snippet = chunk["chunk_text"]
+                if len(snippet) > 900:
+                    snippet = snippet[:900] + "..."
+                supporting.append({
+                    "section_name": chunk["section_name"],
+                    "chunk_text": snippet,
+                    "score": round(hit["score"], 4)
+                })
+            result["chunks"] = supporting
+        return results
+
     def build_context_block(self, policy_data: Dict[str, Any], context: Dict[str, Any]) -> str:
         sections = []
         summaries = context.get("summaries") or {}
@@ -274,6 +381,10 @@ class GeminiPolicyService:
     ) -> Dict[str, Any]:
         """
         Ask a question about a specific policy using Gemini (with caching and smart model routing)
+
+        Identical questions arriving together share one retrieval and Gemini
+        call; only successful answers are cached. Questions without chat
+        history can also be answered from the semantic cache.
         """
         try:
             # Generate cache key for question + policy + recent context
@@ -282,17 +393,76 @@ class GeminiPolicyService:
             if chat_history and len(chat_history) > 0:
                 recent_history = str(chat_history[-2:])
 
-            cache_key = cache._make_key((
+            cache_key = cache.make_key((
                 "gemini_qa",
                 policy_id,
                 question.lower().strip(),
                 recent_history
             ))
 
-            # Check cache first
-            cached_response = cache.get(cache_key)
-            if cached_response:
-                return cached_response
+            # Retrieval, embedding and the Gemini call block, so they run off
+            # the event loop and concurrent duplicates can join the same call
+            return await cache.get_or_compute(
+                cache_key,
+                lambda: asyncio.to_thread(self._answer_policy_question, policy_id, question, chat_history),
+                ttl=GEMINI_ANSWER_TTL_SECONDS,
+                namespace="gemini",
+                stale_ttl=GEMINI_ANSWER_STALE_SECONDS,
+                should_cache=lambda result: result.get("success", False),
+                tags=[policy_tag(policy_id)]
+            )
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "response": ERROR_GEMINI_FAILURE
+            }
+
+    def _answer_policy_question(
+        self,
+        policy_id: str,
+        question: str,
+        chat_history: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Question answering behind the exact-match cache: the semantic cache
+        and the answer store, then retrieval, model routing and the Gemini
+        call.
+        """
+        try:
+            # Follow-ups depend on the conversation, so only standalone
+            # questions are matched semantically or stored
+            question_embedding = None
+            standalone = not chat_history
+            use_semantic_cache = self.semantic_cache is not None and standalone
+            use_answer_store = self.answer_store is not None and standalone
+            # Read before answering: a re-ingest meanwhile leaves the entry stale, not wrong
+            policy_version = self.policy_version(policy_id) if standalone else None
+            if use_semantic_cache:
+                question_embedding = self.embed_question(question)
+                hit = self.semantic_cache.lookup(policy_id, question_embedding, policy_version)
+                if hit is not None and (
+                    not self.semantic_cache.should_verify()
+                    or self.semantic_cache.verify(
+                        policy_id, hit, self.candidate_chunk_ids(policy_id, question_embedding))
+                ):
+                    logger.info(f"Semantic cache hit for policy {policy_id} "
+                                f"(similarity {hit.similarity:.3f}): '{question[:60]}' ~ '{hit.question[:60]}'")
+                    return dict(hit.answer)
+
+            if use_answer_store:
+                # Checked before retrieval: a stored answer needs neither it nor the router
+                stored = self.answer_store.get("qa", policy_id, question, PROMPT_TEMPLATE_VERSION, policy_version)
+                if stored is not None:
+                    if use_semantic_cache:
+                        self.semantic_cache.add(
+                            policy_id, question, question_embedding, stored,
+                            ttl=GEMINI_ANSWER_TTL_SECONDS,
+                            version=policy_version,
+                            chunk_ids=self.candidate_chunk_ids(policy_id, question_embedding)
+                        )
+                    return stored
 
             # Load policy document
             policy_data = self.get_policy_document(policy_id)
@@ -303,7 +473,8 @@ class GeminiPolicyService:
                     "response": ERROR_POLICY_NOT_FOUND
                 }
 
-            retrieval_context = self.retrieve_policy_context(policy_id, question)
+            retrieval_context = self.retrieve_policy_context(policy_id, question,
+                                                             question_embedding=question_embedding)
             context_block = self.build_context_block(policy_data, retrieval_context)
 
             # Extract relevance scores for model routing
@@ -347,10 +518,17 @@ class GeminiPolicyService:
                 "provider_name": policy_data.get("provider_information", {}).get("provider_name"),
                 "model_used": selected_model  # Add for transparency
             }
-
-            # Cache successful responses for 1 hour
-            cache.set(cache_key, result, ttl=3600)
-
+            if use_semantic_cache:
+                self.semantic_cache.add(
+                    policy_id, question, question_embedding, result,
+                    ttl=GEMINI_ANSWER_TTL_SECONDS,
+                    version=policy_version,
+                    chunk_ids=retrieval_context["candidate_ids"]
+                )
+            if use_answer_store:
+                # Written behind; the response doesn't wait for it
+                self.answer_store.put("qa", policy_id, question, selected_model,
+                                      PROMPT_TEMPLATE_VERSION, result, policy_version)
             return result
 
         except Exception as e:
@@ -359,12 +537,25 @@ class GeminiPolicyService:
                 "error": str(e),
                 "response": ERROR_GEMINI_FAILURE
             }
-    
+
+    def _stored_summary(self, policy_id: str) -> tuple:
+        """(current policy version, stored summary for it or None)"""
+        policy_version = self.policy_version(policy_id)
+        if self.answer_store is None:
+            return policy_version, None
+        return policy_version, self.answer_store.get("summary", policy_id, "", PROMPT_TEMPLATE_VERSION,
+                                                     policy_version)
+
     async def get_policy_summary(self, policy_id: str) -> Dict[str, Any]:
         """
         Get a comprehensive summary of a policy
         """
         try:
+            # Version lookup and store read are SQLite queries; keep them off the event loop
+            policy_version, stored = await asyncio.to_thread(self._stored_summary, policy_id)
+            if stored is not None:
+                return stored
+
             policy_data = self.get_policy_document(policy_id)
             if not policy_data:
                 return {
@@ -378,16 +569,20 @@ class GeminiPolicyService:
             )
             
             response = self.client.models.generate_content(
-                model='gemini-2.5-pro',
+                model=GEMINI_SUMMARY_MODEL,
                 contents=summary_prompt
             )
             
-            return {
+            result = {
                 "success": True,
                 "summary": response.text,
                 "policy_name": policy_data.get("policy_identification", {}).get("plan_name"),
                 "provider_name": policy_data.get("provider_information", {}).get("provider_name")
             }
+            if self.answer_store is not None:
+                self.answer_store.put("summary", policy_id, "", GEMINI_SUMMARY_MODEL,
+                                      PROMPT_TEMPLATE_VERSION, result, policy_version)
+            return result
             
         except Exception as e:
             return {
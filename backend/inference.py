@@ -0,0 +1,258 @@
+"""
+Micro-batched embedding and reranking.
+
+Concurrent questions each need one SentenceTransformer.encode and one
+CrossEncoder.predict call; run one by one, every call pays the full
+per-batch overhead. MicroBatcher collects requests on an asyncio queue and
+runs them as one batch when either `max_batch` requests are waiting or the
+oldest has waited `max_wait` seconds. Batches run on the batcher's own
+thread, one at a time per model, so requests arriving meanwhile form the
+next batch. That thread is not from the default executor: the callers
+waiting on results hold those, and could otherwise starve the batches.
+
+Question answering runs on worker threads, which submit to the event loop's
+batchers and wait for their slice of the result. Without a running loop
+(scripts, tests) the models are called directly.
+"""
+import asyncio
+import bisect
+import concurrent.futures
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BATCHING_ENABLED = os.getenv("INFERENCE_BATCHING_ENABLED", "true").lower() == "true"
+INFERENCE_ENCODE_MAX_BATCH = int(os.getenv("INFERENCE_ENCODE_MAX_BATCH", "32"))
+# Each rerank request carries all of one question's candidate pairs
+INFERENCE_RERANK_MAX_BATCH = int(os.getenv("INFERENCE_RERANK_MAX_BATCH", "8"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+# A worker thread gives up waiting for its batch after this long
+INFERENCE_RESULT_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_RESULT_TIMEOUT_SECONDS", "30"))
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+LATENCY_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 2500)
+
+
+class Histogram:
+    """Cumulative bucket counts, as in Prometheus; observed from the event loop only."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            running += count
+            cumulative[f"le_{bound}"] = running
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "buckets": cumulative
+        }
+
+
+class MicroBatcher:
+    """Batches calls to `run_batch(items) -> results` (one result per item)."""
+
+    def __init__(self, name: str, run_batch: Callable[[List[Any]], Sequence[Any]],
+                 max_batch: int, max_wait: float = INFERENCE_MAX_WAIT_MS / 1000):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.batch_latency_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.queue_wait_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.failed_batches = 0
+
+    def start(self) -> None:
+        """Start the batching task on the running loop."""
+        self._queue = asyncio.Queue()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"inference-{self.name}"
+        )
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop batching; requests still queued or in flight fail instead of waiting forever."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._fail(pending, RuntimeError(f"{self.name} batcher stopped"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def submit(self, item: Any) -> Any:
+        if self._task is None:
+            raise RuntimeError(f"{self.name} batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    @staticmethod
+    def _fail(batch: List[tuple], error: BaseException) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self) -> None:
+        batch: List[tuple] = []
+        try:
+            await self._run_batches(batch)
+        except asyncio.CancelledError:
+            # Stopped mid-batch; the thread may finish, but nobody collects it
+            self._fail(batch, RuntimeError(f"{self.name} batcher stopped"))
+            raise
+
+    async def _run_batches(self, batch: List[tuple]) -> None:
+        """Fill and run `batch` (shared with _run, which fails it on cancellation) forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch.clear()
+            batch.append(await self._queue.get())
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            started = time.perf_counter()
+            for _, _, queued_at in batch:
+                self.queue_wait_ms.observe((started - queued_at) * 1000)
+            try:
+                results = await loop.run_in_executor(self._executor, self.run_batch, [item for item, _, _ in batch])
+            except Exception as e:
+                self.failed_batches += 1
+                logger.warning(f"{self.name} batch of {len(batch)} failed: {str(e)}")
+                self._fail(batch, e)
+                continue
+            self.batch_sizes.observe(len(batch))
+            self.batch_latency_ms.observe((time.perf_counter() - started) * 1000)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "failed_batches": self.failed_batches,
+            "batch_size": self.batch_sizes.snapshot(),
+            "batch_latency_ms": self.batch_latency_ms.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot()
+        }
+
+
+class InferenceScheduler:
+    """
+    Encode and rerank entry points backed by one MicroBatcher per model.
+
+    encode() takes one text and returns its (unnormalized) embedding;
+    rerank() takes one question's (question, passage) pairs and returns
+    their scores. Both are called from worker threads.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], np.ndarray],
+                 predict_batch: Callable[[List[Tuple[str, str]]], np.ndarray],
+                 enabled: bool = INFERENCE_BATCHING_ENABLED):
+        self.encode_batch = encode_batch
+        self.predict_batch = predict_batch
+        self.enabled = enabled
+        self.encoder = MicroBatcher("encode", encode_batch, INFERENCE_ENCODE_MAX_BATCH)
+        self.reranker = MicroBatcher("rerank", self._rerank_many, INFERENCE_RERANK_MAX_BATCH)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _rerank_many(self, requests: List[List[Tuple[str, str]]]) -> List[np.ndarray]:
+        # One predict over every request's pairs, split back per request
+        pairs = [pair for request in requests for pair in request]
+        scores = np.asarray(self.predict_batch(pairs)) if pairs else np.zeros(0)
+        bounds = np.cumsum([len(request) for request in requests])[:-1]
+        return np.split(scores, bounds)
+
+    def start(self) -> None:
+        """Bind to the running loop; until then (or when disabled) calls run unbatched."""
+        if not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self.encoder.start()
+        self.reranker.start()
+
+    async def stop(self) -> None:
+        self._loop = None
+        await self.encoder.stop()
+        await self.reranker.stop()
+
+    def _batching_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """
+        The loop to submit to, or None to call the model directly: when
+        unbound, or on the loop's own thread, which must not wait on itself.
+        Read once per call, since stop() can unbind it meanwhile.
+        """
+        loop = self._loop
+        if loop is None:
+            return None
+        try:
+            return None if asyncio.get_running_loop() is loop else loop
+        except RuntimeError:
+            return loop
+
+    @staticmethod
+    def _wait(batcher: MicroBatcher, item: Any, loop: asyncio.AbstractEventLoop) -> Any:
+        future = asyncio.run_coroutine_threadsafe(batcher.submit(item), loop)
+        try:
+            return future.result(timeout=INFERENCE_RESULT_TIMEOUT_SECONDS)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"No {batcher.name} result within {INFERENCE_RESULT_TIMEOUT_SECONDS}s")
+
+    def encode(self, text: str) -> np.ndarray:
+        """Embedding of one text; blocks the calling worker thread until its batch ran."""
+        loop = self._batching_loop()
+        if loop is None:
+            return self.encode_batch([text])[0]
+        return self._wait(self.encoder, text, loop)
+
+    def rerank(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """Cross-encoder scores of one question's pairs, in order."""
+        if not pairs:
+            return np.zeros(0)
+        loop = self._batching_loop()
+        if loop is None:
+            return np.asarray(self.predict_batch(pairs))
+        return self._wait(self.reranker, pairs, loop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batching": self._loop is not None,
+            "encode": self.encoder.stats(),
+            "rerank": self.reranker.stats()
+        }
@@ -2,6 +2,9 @@
 Prompt templates for Gemini AI interactions
 """
 
+# Bump whenever a template below changes; stored answers are keyed by it
+PROMPT_TEMPLATE_VERSION = "1"
+
 # Policy Q&A Prompt Template
 POLICY_QA_PROMPT = """
 You are an expert insurance advisor analyzing the "{policy_name}" policy by {provider_name}.
@@ -0,0 +1,130 @@
+"""
+Pre-encoded JSON response bodies and conditional (ETag) responses.
+
+Cached endpoints encode a payload once, when the cache entry is filled, and
+write the stored bytes straight into the response on every hit. orjson is
+used when installed; the stdlib encoder is the fallback.
+"""
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compress cached bodies at fill time for clients that accept gzip
+RESPONSE_GZIP_ENABLED = os.getenv("RESPONSE_GZIP_ENABLED", "true").lower() == "true"
+RESPONSE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = 6
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class EncodedBody(NamedTuple):
+    """A JSON payload encoded once: the raw bytes and, if worth it, a gzip copy."""
+    body: bytes
+    gzipped: Optional[bytes] = None
+    media_type: str = JSON_MEDIA_TYPE
+
+
+def dumps(content: Any) -> bytes:
+    """Encode `content` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_body(content: Any) -> EncodedBody:
+    """Encode a payload for caching, compressing it when large enough."""
+    body = dumps(content)
+    gzipped = None
+    if RESPONSE_GZIP_ENABLED and len(body) >= RESPONSE_GZIP_MIN_BYTES:
+        # mtime=0 keeps the bytes identical across fills of the same payload
+        gzipped = gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+    return EncodedBody(body, gzipped)
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag for a representation identified by `parts`, e.g. the
+    endpoint, the data version it was built from and the query parameters.
+    """
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _gzip_etag(etag: str) -> str:
+    # The gzip bytes are a different representation and need their own tag
+    return f'{etag[:-1]}-gzip"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    True if If-None-Match names `etag` (or "*"). Uses the weak comparison
+    RFC 9110 prescribes for If-None-Match, and treats the gzip variant of a
+    tag as the same resource version.
+    """
+    candidates = _if_none_match(request)
+    return "*" in candidates or etag in candidates or _gzip_etag(etag) in candidates
+
+
+def _if_none_match(request: Request) -> List[str]:
+    """If-None-Match entity tags with any weak prefix removed."""
+    candidates = []
+    for candidate in request.headers.get("if-none-match", "").split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate:
+            candidates.append(candidate)
+    return candidates
+
+
+def not_modified_response(request: Request, etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    304 for a conditional request whose cached copy is still current. It
+    carries the tag the 200 would have: the gzip variant's when that is
+    what the client holds and it still accepts gzip.
+    """
+    headers = dict(headers or {})
+    gzip_etag = _gzip_etag(etag)
+    holds_gzip = gzip_etag in _if_none_match(request) and accepts_gzip(request)
+    headers["ETag"] = gzip_etag if holds_gzip else etag
+    headers["Vary"] = "Accept-Encoding"
+    return Response(status_code=304, headers=headers)
+
+
+def accepts_gzip(request: Request) -> bool:
+    """True if the Accept-Encoding header allows gzip (and doesn't set q=0)."""
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def encoded_response(encoded: EncodedBody, request: Request,
+                     headers: Optional[Dict[str, str]] = None,
+                     status_code: int = 200,
+                     etag: Optional[str] = None) -> Response:
+    """
+    Serve stored bytes without re-encoding, gzipped when the client accepts it.
+
+    With `etag`, the response carries it (suffixed for the gzip variant).
+    """
+    headers = dict(headers or {})
+    content = encoded.body
+    if encoded.gzipped is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(request):
+            content = encoded.gzipped
+            headers["Content-Encoding"] = "gzip"
+    if etag is not None:
+        headers["ETag"] = _gzip_etag(etag) if content is encoded.gzipped else etag
+    return Response(content=content, status_code=status_code, media_type=encoded.media_type, headers=headers)
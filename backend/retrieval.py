@@ -0,0 +1,199 @@
+"""
+In-memory index of each policy's chunk embeddings for first-stage retrieval.
+
+A policy's chunk embeddings are loaded from SQLite once and kept as one
+contiguous, L2-normalized float32 matrix, so scoring a question is a single
+matrix-vector product followed by an argpartition top-k. A matrix is rebuilt
+when its policy's version changes, which the policy_versions triggers bump
+whenever upsert_policy_chunks (or any other policy write) runs, in this
+process or another.
+
+When the memory-mapped EmbeddingStore holds the policy at its current
+version, the matrix is a zero-copy view into it, shared by every worker;
+otherwise it is decoded from the database blobs.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .database import PolicyDatabase
+from .embedding_store import EmbeddingStore
+
+logger = logging.getLogger(__name__)
+
+# Policies whose matrices are kept in memory (least recently used dropped)
+RETRIEVAL_INDEX_MAX_POLICIES = int(os.getenv("RETRIEVAL_INDEX_MAX_POLICIES", "256"))
+# Question embeddings kept, keyed by normalized question text
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU of normalized float32 question vectors, so the same question
+    asked about several policies runs the embedding model once.
+    """
+
+    def __init__(self, max_entries: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Cached vector for `key` (already normalized text), computing it on a miss."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        # The model runs outside the lock; concurrent misses for one key both compute
+        vector = compute()
+        # Shared between callers, so it must not be modified in place
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class PolicyChunks:
+    """Normalized embedding matrix of one policy version, rows aligned with `chunks`."""
+
+    def __init__(self, version: Optional[int], chunks: List[Dict[str, Any]], matrix: np.ndarray,
+                 mapped: bool = False):
+        self.version = version
+        self.chunks = chunks
+        self.matrix = matrix
+        # True if the matrix is a view into the memory-mapped store
+        self.mapped = mapped
+
+    @classmethod
+    def from_rows(cls, version: Optional[int], rows: List[Dict[str, Any]]) -> "PolicyChunks":
+        """Decode and normalize the embedding blobs of get_chunks_for_policy rows."""
+        vectors = []
+        chunks: List[Dict[str, Any]] = []
+        for row in rows:
+            embedding_blob = row.get("embedding")
+            if not embedding_blob:
+                continue
+            vector = np.frombuffer(embedding_blob, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm == 0 or (vectors and vector.shape != vectors[0].shape):
+                continue
+            vectors.append(vector / norm)
+            # The blob is no longer needed once it is in the matrix
+            chunks.append({key: value for key, value in row.items() if key != "embedding"})
+        matrix = np.vstack(vectors).astype(np.float32) if vectors else np.zeros((0, 0), dtype=np.float32)
+        return cls(version, chunks, matrix)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def top_k(self, query: np.ndarray, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """(cosine score, chunk) for the k best chunks, best first; `query` must be normalized."""
+        if not self.chunks or k <= 0:
+            return []
+        scores = self.matrix @ query.astype(np.float32, copy=False)
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(float(scores[i]), self.chunks[i]) for i in ranked]
+
+
+class PolicyChunkIndex:
+    """LRU of PolicyChunks, validated against the policy version on each use."""
+
+    def __init__(self, db: PolicyDatabase,
+                 version_source: Callable[[str], Optional[int]],
+                 max_policies: int = RETRIEVAL_INDEX_MAX_POLICIES,
+                 store: Optional[EmbeddingStore] = None):
+        self.db = db
+        self.version_source = version_source
+        self.store = store
+        self.max_policies = max_policies
+        self._policies: "OrderedDict[str, PolicyChunks]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, policy_id: str) -> PolicyChunks:
+        """The policy's current matrix, loaded from the store or the database if missing or outdated."""
+        version = self.version_source(policy_id)
+        with self._lock:
+            entry = self._policies.get(policy_id)
+            if entry is not None and entry.version == version:
+                self._policies.move_to_end(policy_id)
+                self.hits += 1
+                return entry
+
+        # Built outside the lock; a concurrent duplicate build is harmless
+        entry = self._from_store(policy_id, version)
+        if entry is None:
+            entry = PolicyChunks.from_rows(version, self.db.get_chunks_for_policy(policy_id))
+        with self._lock:
+            self._policies[policy_id] = entry
+            self._policies.move_to_end(policy_id)
+            while len(self._policies) > self.max_policies:
+                self._policies.popitem(last=False)
+            self.loads += 1
+        return entry
+
+    def _from_store(self, policy_id: str, version: Optional[int]) -> Optional[PolicyChunks]:
+        """Matrix viewed from the embedding store; only chunk text comes from the database."""
+        if self.store is None:
+            return None
+        stored = self.store.policy_rows(policy_id, version)
+        if stored is None:
+            return None
+        vectors, chunk_indexes = stored
+        by_index = {chunk["chunk_index"]: chunk
+                    for chunk in self.db.get_chunks_for_policy(policy_id, include_embeddings=False)}
+        try:
+            chunks = [by_index[int(chunk_index)] for chunk_index in chunk_indexes]
+        except KeyError:
+            return None
+        return PolicyChunks(version, chunks, vectors, mapped=True)
+
+    def search(self, policy_id: str, query: np.ndarray, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        return self.get(policy_id).top_k(query, k)
+
+    def invalidate(self, policy_id: Optional[str] = None) -> None:
+        """Drop one policy's matrix, or all of them."""
+        with self._lock:
+            if policy_id is None:
+                self._policies.clear()
+            else:
+                self._policies.pop(policy_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "policies": len(self._policies),
+                "chunks": sum(len(entry) for entry in self._policies.values()),
+                "bytes": sum(entry.matrix.nbytes for entry in self._policies.values() if not entry.mapped),
+                "mapped_policies": sum(1 for entry in self._policies.values() if entry.mapped),
+                "hits": self.hits,
+                "loads": self.loads
+            }
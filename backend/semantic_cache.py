@@ -0,0 +1,190 @@
+"""
+Per-policy semantic cache for Gemini answers.
+
+Answers are stored next to the normalized embedding of the question that
+produced them. A new question about the same policy reuses the answer of the
+most similar stored question when their cosine similarity clears a
+threshold, so paraphrases ("what is the waiting period" / "waiting period?")
+share one Gemini call.
+
+Each policy keeps its question embeddings in one preallocated float32
+matrix; a lookup is a single matrix-vector product. Entries are dropped when
+the policy's version changes.
+
+A sample of hits is verified by comparing the chunks first-stage retrieval
+picks for the new question with those recorded for the cached one; a low
+overlap counts as a false hit and the question is answered normally.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+# Cosine similarity above which a stored answer is reused
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MAX_PER_POLICY = int(os.getenv("SEMANTIC_CACHE_MAX_PER_POLICY", "128"))
+SEMANTIC_CACHE_MAX_POLICIES = int(os.getenv("SEMANTIC_CACHE_MAX_POLICIES", "512"))
+# Fraction of hits checked against first-stage retrieval
+SEMANTIC_CACHE_VERIFY_RATE = float(os.getenv("SEMANTIC_CACHE_VERIFY_RATE", "0.1"))
+# Minimum overlap (Jaccard) of retrieved chunks for a verified hit to count as true
+SEMANTIC_CACHE_MIN_OVERLAP = float(os.getenv("SEMANTIC_CACHE_MIN_OVERLAP", "0.5"))
+
+
+class SemanticHit(NamedTuple):
+    answer: Any
+    question: str
+    similarity: float
+    chunk_ids: frozenset
+    slot: int
+
+
+class _PolicyAnswers:
+    """Question embeddings, answers and expiry times for one policy version."""
+
+    def __init__(self, version: Optional[int], dim: int, capacity: int):
+        self.version = version
+        self.embeddings = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires_at = np.zeros(capacity, dtype=np.float64)
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.questions: List[Optional[str]] = [None] * capacity
+        self.answers: List[Any] = [None] * capacity
+        self.chunk_ids: List[frozenset] = [frozenset()] * capacity
+        self.count = 0
+
+    def free_slot(self, now: float) -> int:
+        """Next unused slot, else an expired one, else the least recently used."""
+        if self.count < len(self.answers):
+            self.count += 1
+            return self.count - 1
+        expired = np.flatnonzero(self.expires_at <= now)
+        if expired.size:
+            return int(expired[0])
+        return int(np.argmin(self.last_used))
+
+
+class SemanticAnswerCache:
+    """Thread-safe: answers are computed and looked up on worker threads."""
+
+    def __init__(self,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_per_policy: int = SEMANTIC_CACHE_MAX_PER_POLICY,
+                 max_policies: int = SEMANTIC_CACHE_MAX_POLICIES,
+                 verify_rate: float = SEMANTIC_CACHE_VERIFY_RATE,
+                 min_overlap: float = SEMANTIC_CACHE_MIN_OVERLAP):
+        self.threshold = threshold
+        self.max_per_policy = max_per_policy
+        self.max_policies = max_policies
+        self.verify_rate = verify_rate
+        self.min_overlap = min_overlap
+        # Least recently used policy first
+        self._policies: "OrderedDict[str, _PolicyAnswers]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.verified_hits = 0
+        self.false_hits = 0
+
+    def _bucket(self, policy_id: str, version: Optional[int]) -> Optional[_PolicyAnswers]:
+        bucket = self._policies.get(policy_id)
+        if bucket is not None and bucket.version != version:
+            # Policy re-ingested: its answers may no longer hold
+            del self._policies[policy_id]
+            return None
+        if bucket is not None:
+            self._policies.move_to_end(policy_id)
+        return bucket
+
+    def lookup(self, policy_id: str, embedding: np.ndarray,
+               version: Optional[int] = None) -> Optional[SemanticHit]:
+        """
+        Most similar stored question for the policy, if above the threshold.
+
+        `embedding` must be L2-normalized, like the stored ones, so the dot
+        product is the cosine similarity.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.lookups += 1
+            bucket = self._bucket(policy_id, version)
+            if bucket is None or bucket.count == 0:
+                return None
+
+            scores = bucket.embeddings[:bucket.count] @ embedding.astype(np.float32, copy=False)
+            scores[bucket.expires_at[:bucket.count] <= now] = -np.inf
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                return None
+
+            self.hits += 1
+            bucket.last_used[best] = now
+            return SemanticHit(bucket.answers[best], bucket.questions[best], similarity,
+                               bucket.chunk_ids[best], best)
+
+    def add(self, policy_id: str, question: str, embedding: np.ndarray, answer: Any,
+            ttl: float, version: Optional[int] = None,
+            chunk_ids: Sequence[Any] = ()) -> None:
+        """Store an answer with its question embedding and first-stage chunk ids."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(policy_id, version)
+            if bucket is None:
+                bucket = _PolicyAnswers(version, embedding.shape[-1], self.max_per_policy)
+                self._policies[policy_id] = bucket
+                while len(self._policies) > self.max_policies:
+                    self._policies.popitem(last=False)
+
+            slot = bucket.free_slot(now)
+            bucket.embeddings[slot] = embedding
+            bucket.expires_at[slot] = now + ttl
+            bucket.last_used[slot] = now
+            bucket.questions[slot] = question
+            bucket.answers[slot] = answer
+            bucket.chunk_ids[slot] = frozenset(chunk_ids)
+
+    def should_verify(self) -> bool:
+        return random.random() < self.verify_rate
+
+    def verify(self, policy_id: str, hit: SemanticHit, chunk_ids: Sequence[Any]) -> bool:
+        """
+        Check a hit against the chunks retrieved for the new question. A
+        false hit is counted and its entry dropped; returns whether the hit holds.
+        """
+        retrieved = frozenset(chunk_ids)
+        union = retrieved | hit.chunk_ids
+        overlap = len(retrieved & hit.chunk_ids) / len(union) if union else 1.0
+        with self._lock:
+            self.verified_hits += 1
+            if overlap >= self.min_overlap:
+                return True
+            self.false_hits += 1
+            bucket = self._policies.get(policy_id)
+            if bucket is not None and bucket.questions[hit.slot] == hit.question:
+                bucket.expires_at[hit.slot] = 0.0
+        logger.info(f"Semantic cache false hit for policy {policy_id}: "
+                    f"similarity {hit.similarity:.3f}, chunk overlap {overlap:.2f}")
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = sum(bucket.count for bucket in self._policies.values())
+            return {
+                "policies": len(self._policies),
+                "entries": entries,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "verified_hits": self.verified_hits,
+                "false_hits": self.false_hits,
+                "false_hit_rate": round(self.false_hits / self.verified_hits, 4) if self.verified_hits else 0.0
+            }
@@ -6,6 +6,7 @@ from sentence_transformers import SentenceTransformer
 import numpy as np
 
 from .database import PolicyDatabase
+from .embedding_store import export_embedding_store
 
 
 SECTION_KEYS = {
@@ -99,3 +100,6 @@ class PolicySummariesGenerator:
             if not policy_id:
                 policy_id = f"policy_{json_file.stem}"
             self.generate_for_policy(policy_id, policy_json)
+
+        # Publish the new embeddings for the API workers to memory-map
+        export_embedding_store(self.db)
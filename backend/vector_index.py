@@ -0,0 +1,312 @@
+"""
+Catalog-wide approximate nearest-neighbour index over chunk embeddings.
+
+IVFIndex is an inverted-file index in NumPy: vectors are clustered with
+spherical k-means and a query is scored only against the vectors in the
+`nprobe` clusters whose centroids are closest to it. Inserts are assigned to
+the existing clusters; the clustering is retrained once the index has grown
+well past the size it was trained on. Removals are tombstones, compacted on
+retrain.
+
+ChunkVectorIndex keeps an IVFIndex in step with policy_chunks, re-reading
+only the policies whose policy_versions entry changed, and persists it to an
+.npz file so a restart doesn't have to retrain.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .database import PolicyDatabase
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "chunk_index.npz")
+# Clusters scanned per query; more is slower and closer to exact
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+# Re-check policy versions at most this often
+VECTOR_INDEX_REFRESH_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "5"))
+# Retrain once the live vectors exceed this multiple of the trained size
+VECTOR_INDEX_RETRAIN_GROWTH = 2.0
+VECTOR_INDEX_KMEANS_ITERATIONS = 10
+VECTOR_INDEX_TRAIN_SAMPLE = 20000
+VECTOR_INDEX_MAX_LISTS = 1024
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-10)
+
+
+class IVFIndex:
+    """Inverted-file index over L2-normalized vectors (inner product = cosine)."""
+
+    def __init__(self, dim: int = 0):
+        self.dim = dim
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.chunk_ids = np.zeros(0, dtype=np.int64)
+        self.policy_ids = np.zeros(0, dtype=object)
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.trained_size = 0
+        # Row positions grouped by cluster, rebuilt lazily after changes
+        self._list_order: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.alive))
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def train(self, seed: int = 0) -> None:
+        """Cluster the live vectors with spherical k-means and reassign every row."""
+        self._compact()
+        size = len(self.vectors)
+        if size == 0:
+            self.centroids = np.zeros((0, self.dim), dtype=np.float32)
+            self.trained_size = 0
+            return
+
+        rng = np.random.default_rng(seed)
+        nlist = max(1, min(VECTOR_INDEX_MAX_LISTS, int(math.sqrt(size))))
+        sample = self.vectors
+        if size > VECTOR_INDEX_TRAIN_SAMPLE:
+            sample = self.vectors[rng.choice(size, VECTOR_INDEX_TRAIN_SAMPLE, replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(VECTOR_INDEX_KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            # Reseed empty clusters from random samples
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        self.centroids = centroids
+        self.assignments = self._assign(self.vectors)
+        self.trained_size = size
+        self._list_order = None
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if len(vectors) == 0:
+            return np.zeros(0, dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _compact(self) -> None:
+        if self.alive.all():
+            return
+        keep = self.alive
+        self.vectors = self.vectors[keep]
+        self.chunk_ids = self.chunk_ids[keep]
+        self.policy_ids = self.policy_ids[keep]
+        self.assignments = self.assignments[keep]
+        self.alive = np.ones(len(self.vectors), dtype=bool)
+        self._list_order = None
+
+    def add(self, chunk_ids: Iterable[int], policy_ids: Iterable[str], vectors: np.ndarray) -> None:
+        vectors = _normalize(vectors)
+        if len(vectors) == 0:
+            return
+        if self.dim == 0:
+            self.dim = vectors.shape[1]
+            self.centroids = np.zeros((0, self.dim), dtype=np.float32)
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+
+        self.vectors = np.concatenate([self.vectors, vectors])
+        self.chunk_ids = np.concatenate([self.chunk_ids, np.asarray(list(chunk_ids), dtype=np.int64)])
+        self.policy_ids = np.concatenate([self.policy_ids, np.asarray(list(policy_ids), dtype=object)])
+        self.alive = np.concatenate([self.alive, np.ones(len(vectors), dtype=bool)])
+
+        if self.nlist == 0 or len(self) > self.trained_size * VECTOR_INDEX_RETRAIN_GROWTH:
+            self.assignments = np.concatenate([self.assignments, np.zeros(len(vectors), dtype=np.int32)])
+            self.train()
+        else:
+            self.assignments = np.concatenate([self.assignments, self._assign(vectors)])
+            self._list_order = None
+
+    def remove_policies(self, policy_ids: Iterable[str]) -> int:
+        """Tombstone every vector of the given policies; returns how many."""
+        policy_ids = list(policy_ids)
+        if not policy_ids or len(self.policy_ids) == 0:
+            return 0
+        removed = self.alive & np.isin(self.policy_ids, policy_ids)
+        count = int(np.count_nonzero(removed))
+        self.alive &= ~removed
+        return count
+
+    def _lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._list_order is None:
+            self._list_order = np.argsort(self.assignments, kind="stable")
+            self._list_offsets = np.searchsorted(self.assignments[self._list_order], np.arange(self.nlist + 1))
+        return self._list_order, self._list_offsets
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = VECTOR_INDEX_NPROBE,
+               allowed_policies: Optional[np.ndarray] = None) -> List[Tuple[float, int, str]]:
+        """
+        Up to k (score, chunk id, policy id), best first. With
+        `allowed_policies`, only their chunks are returned; the probe widens
+        until k matches are found or every cluster has been scanned.
+        """
+        if self.nlist == 0 or k <= 0:
+            return []
+        query = _normalize(query)
+        order, offsets = self._lists()
+        cluster_rank = np.argsort(-(self.centroids @ query))
+        nprobe = max(1, min(nprobe, self.nlist))
+        while True:
+            probed = cluster_rank[:nprobe]
+            candidates = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probed])
+            candidates = candidates[self.alive[candidates]]
+            if allowed_policies is not None:
+                candidates = candidates[np.isin(self.policy_ids[candidates], allowed_policies)]
+            if len(candidates) >= k or nprobe >= self.nlist:
+                break
+            nprobe = min(self.nlist, nprobe * 2)
+
+        scores = self.vectors[candidates] @ query
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(float(scores[i]), int(self.chunk_ids[candidates[i]]), self.policy_ids[candidates[i]]) for i in top]
+
+    def save(self, path: str, **extra: np.ndarray) -> None:
+        """Write the index (live rows only) to an .npz file, atomically."""
+        self._compact()
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            vectors=self.vectors,
+            chunk_ids=self.chunk_ids,
+            policy_ids=self.policy_ids.astype(str),
+            assignments=self.assignments,
+            trained_size=np.array(self.trained_size),
+            **extra
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["IVFIndex", Dict[str, np.ndarray]]:
+        """The saved index and any extra arrays saved with it."""
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        index = cls(arrays["vectors"].shape[1])
+        index.centroids = arrays.pop("centroids")
+        index.vectors = arrays.pop("vectors")
+        index.chunk_ids = arrays.pop("chunk_ids")
+        index.policy_ids = arrays.pop("policy_ids").astype(object)
+        index.assignments = arrays.pop("assignments")
+        index.trained_size = int(arrays.pop("trained_size"))
+        index.alive = np.ones(len(index.vectors), dtype=bool)
+        return index, arrays
+
+
+class ChunkVectorIndex:
+    """IVFIndex over all policy_chunks, synced by policy version and persisted."""
+
+    def __init__(self, db: PolicyDatabase, path: str = VECTOR_INDEX_PATH,
+                 refresh_interval: float = VECTOR_INDEX_REFRESH_SECONDS):
+        self.db = db
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.index = IVFIndex()
+        # Policy version each policy's vectors were read at
+        self.synced: Dict[str, int] = {}
+        self._loaded = False
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            self.index, extra = IVFIndex.load(self.path)
+            self.synced = dict(zip(extra["synced_policies"].tolist(), extra["synced_versions"].tolist()))
+            logger.info(f"Loaded chunk vector index from {self.path}: {len(self.index)} vectors")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Rebuilding unreadable chunk vector index {self.path}: {str(e)}")
+            self.index, self.synced = IVFIndex(), {}
+
+    def refresh(self, force: bool = False) -> int:
+        """Re-read the chunks of policies whose version changed; returns how many policies."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            elif not force and time.monotonic() - self._last_check < self.refresh_interval:
+                return 0
+            self._last_check = time.monotonic()
+
+            versions = self.db.get_policy_versions()
+            changed = [policy_id for policy_id, version in versions.items() if self.synced.get(policy_id) != version]
+            gone = [policy_id for policy_id in self.synced if policy_id not in versions]
+            if not changed and not gone:
+                return 0
+
+            self.index.remove_policies(changed + gone)
+            rows = self.db.get_chunk_vectors(changed)
+            if rows:
+                chunk_ids, policy_ids, blobs = zip(*rows)
+                dim = len(blobs[0]) // 4
+                keep = [i for i, blob in enumerate(blobs) if len(blob) == dim * 4]
+                vectors = np.frombuffer(b"".join(blobs[i] for i in keep), dtype=np.float32).reshape(len(keep), dim)
+                self.index.add([chunk_ids[i] for i in keep], [policy_ids[i] for i in keep], vectors)
+            self.synced = {policy_id: version for policy_id, version in versions.items()}
+            self.updates += 1
+
+            try:
+                self.index.save(
+                    self.path,
+                    synced_policies=np.array(list(self.synced), dtype=str),
+                    synced_versions=np.array(list(self.synced.values()), dtype=np.int64)
+                )
+            except OSError as e:
+                logger.warning(f"Failed to save chunk vector index {self.path}: {str(e)}")
+            logger.info(f"Chunk vector index updated for {len(changed) + len(gone)} policies: {len(self.index)} vectors")
+            return len(changed) + len(gone)
+
+    @property
+    def ready(self) -> bool:
+        """True once the index holds at least one chunk vector."""
+        return len(self.index) > 0
+
+    def search(self, query: np.ndarray, limit: int = 10, chunks_per_policy: int = 2,
+               allowed_policies: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Policies ranked by their best-matching chunk, each with up to
+        `chunks_per_policy` supporting chunk ids and scores.
+        """
+        self.refresh()
+        allowed = np.asarray(allowed_policies, dtype=object) if allowed_policies is not None else None
+        with self._lock:
+            hits = self.index.search(query, max(50, limit * chunks_per_policy * 4), allowed_policies=allowed)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for score, chunk_id, policy_id in hits:
+            result = results.get(policy_id)
+            if result is None:
+                if len(results) >= limit:
+                    continue
+                result = results[policy_id] = {"policy_id": policy_id, "score": score, "chunks": []}
+            if len(result["chunks"]) < chunks_per_policy:
+                result["chunks"].append({"chunk_id": chunk_id, "score": score})
+        return list(results.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "vectors": len(self.index),
+            "lists": self.index.nlist,
+            "policies": len(self.synced),
+            "updates": self.updates
+        }
@@ -0,0 +1,167 @@
+"""
+Startup cache warming.
+
+HotKeys counts which listings and policies are requested and keeps the top
+entries in a state file, so the next instance (after a deploy or scale-out)
+can replay them. CacheWarmer runs the warmup steps in the background after
+startup; readiness is reported once it has finished.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_STATE_PATH = os.getenv("WARMUP_STATE_PATH", "warmup_state.json")
+# How many recorded listings and policies are replayed at startup
+WARMUP_TOP_QUERIES = int(os.getenv("WARMUP_TOP_QUERIES", "20"))
+WARMUP_TOP_POLICIES = int(os.getenv("WARMUP_TOP_POLICIES", "10"))
+# Readiness is reported after this long even if warmup hasn't finished
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "120"))
+WARMUP_STATE_SAVE_SECONDS = float(os.getenv("WARMUP_STATE_SAVE_SECONDS", "60"))
+# Counts inherited from the previous instance are scaled down on load, so
+# keys that are no longer requested drop out of the top-N over restarts
+WARMUP_STATE_DECAY = 0.5
+# The state file keeps more entries than are replayed, so a key can climb
+WARMUP_STATE_KEEP_FACTOR = 4
+# Distinct keys counted in memory before the long tail is dropped
+WARMUP_MAX_TRACKED_KEYS = 2000
+
+
+class HotKeys:
+    """Request counts for warmable keys: /api/policies queries and policy ids."""
+
+    def __init__(self, path: str = WARMUP_STATE_PATH):
+        self.path = path
+        self.queries: Counter = Counter()
+        self.policies: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record_query(self, params: Dict[str, Any]) -> None:
+        key = json.dumps(params, sort_keys=True)
+        with self._lock:
+            self._count(self.queries, key)
+
+    def record_policy(self, policy_id: str) -> None:
+        with self._lock:
+            self._count(self.policies, policy_id)
+
+    @staticmethod
+    def _count(counter: Counter, key: str) -> None:
+        counter[key] += 1
+        if len(counter) > WARMUP_MAX_TRACKED_KEYS:
+            keep = counter.most_common(WARMUP_MAX_TRACKED_KEYS // 2)
+            counter.clear()
+            counter.update(dict(keep))
+
+    def top_queries(self, n: int = WARMUP_TOP_QUERIES) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [json.loads(key) for key, _ in self.queries.most_common(n)]
+
+    def top_policies(self, n: int = WARMUP_TOP_POLICIES) -> List[str]:
+        with self._lock:
+            return [policy_id for policy_id, _ in self.policies.most_common(n)]
+
+    def load(self) -> bool:
+        """Seed the counters from the state file; False if there is none."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable warmup state {self.path}: {str(e)}")
+            return False
+
+        with self._lock:
+            for key, count in state.get("queries", {}).items():
+                self.queries[key] += count * WARMUP_STATE_DECAY
+            for policy_id, count in state.get("policies", {}).items():
+                self.policies[policy_id] += count * WARMUP_STATE_DECAY
+        return True
+
+    def save(self) -> None:
+        """Write the top entries to the state file (atomically)."""
+        with self._lock:
+            state = {
+                "saved_at": time.time(),
+                "queries": dict(self.queries.most_common(WARMUP_TOP_QUERIES * WARMUP_STATE_KEEP_FACTOR)),
+                "policies": dict(self.policies.most_common(WARMUP_TOP_POLICIES * WARMUP_STATE_KEEP_FACTOR))
+            }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save warmup state {self.path}: {str(e)}")
+
+    async def run_saver(self, interval: float = WARMUP_STATE_SAVE_SECONDS) -> None:
+        """Save periodically until cancelled; instances may be stopped without a clean shutdown."""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.save)
+
+
+class CacheWarmer:
+    """
+    Runs named warmup steps in order, once, in the background.
+
+    A failing step is logged and skipped; the warmup as a whole always ends,
+    at the latest after `timeout` seconds, so readiness can't be held back
+    indefinitely.
+    """
+
+    def __init__(self, enabled: bool = WARMUP_ENABLED, timeout: float = WARMUP_TIMEOUT_SECONDS):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.state = "pending" if enabled else "disabled"
+        self.steps: List[Tuple[str, Callable[[], Awaitable[Optional[int]]]]] = []
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.duration_ms: Optional[float] = None
+
+    def add(self, name: str, step: Callable[[], Awaitable[Optional[int]]]) -> None:
+        """Register a step; it may return how many entries it warmed."""
+        self.steps.append((name, step))
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "timed_out", "disabled")
+
+    async def run(self) -> None:
+        if not self.enabled:
+            return
+        self.state = "running"
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._run_steps(), timeout=self.timeout)
+            self.state = "done"
+        except asyncio.TimeoutError:
+            logger.warning(f"Cache warmup timed out after {self.timeout}s")
+            self.state = "timed_out"
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Cache warmup {self.state} in {self.duration_ms}ms: {self.results}")
+
+    async def _run_steps(self) -> None:
+        for name, step in self.steps:
+            started = time.perf_counter()
+            try:
+                warmed = await step()
+                self.results[name] = {"ok": True, "warmed": warmed}
+            except Exception as e:
+                logger.warning(f"Cache warmup step '{name}' failed: {str(e)}")
+                self.results[name] = {"ok": False, "error": str(e)}
+            self.results[name]["ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "duration_ms": self.duration_ms,
+            "steps": self.results
+        }
@@ -0,0 +1,133 @@
+"""
+Shared fixtures: throwaway policy databases built from small extracted
+policy documents, shaped like the files under results/health_file_api.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Importing backend.cache builds the global cache; keep it off the shared file
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+from backend.database import PolicyDatabase  # noqa: E402
+
+
+def build_policy_document(policy_id: str,
+                          provider: str = "Acme Health Insurance",
+                          plan: Optional[str] = None,
+                          category: str = "Individual",
+                          premium: Optional[float] = 10000.0,
+                          sum_insured: Sequence[Any] = ("5 Lacs", "10 Lacs"),
+                          payment_modes: Sequence[str] = ("Annual",),
+                          maternity: bool = False,
+                          daycare: bool = True,
+                          claim_settlement_ratio: Optional[float] = 95.0,
+                          network_hospitals: Optional[int] = 8000) -> Dict[str, Any]:
+    """An extracted policy document with the fields ingestion reads."""
+    return {
+        "provider_information": {
+            "provider_id": provider.split()[0].upper(),
+            "provider_name": provider,
+            "claim_settlement_ratio": claim_settlement_ratio,
+            "solvency_ratio": 1.8,
+            "network_hospitals_count": network_hospitals
+        },
+        "policy_identification": {
+            "policy_id": policy_id,
+            "plan_name": plan or f"{policy_id} Plan",
+            "product_uin": f"UIN{policy_id}",
+            "policy_category": category
+        },
+        "core_financials_and_terms": {
+            "sum_insured_options": list(sum_insured),
+            "premium_details": {
+                "payment_modes": list(payment_modes),
+                "base_premium_for_standard_profile": premium
+            },
+            "is_tax_benefit_eligible_80d": True
+        },
+        "coverage_and_benefits": {
+            "in_patient_hospitalization": {
+                "pre_hospitalization_days_covered": 30,
+                "post_hospitalization_days_covered": 60
+            },
+            "room_rent_limits": {"limit_type": "No Limit", "description": "Single private room"},
+            "icu_charge_limits": {"limit_type": "No Limit", "description": "Actuals"},
+            "daycare_procedures": {"is_covered": daycare},
+            "ambulance_cover": {"is_covered": True, "limit_per_hospitalization": 2000},
+            "no_claim_bonus": {"is_available": True},
+            "restoration_benefit": {"is_available": False},
+            "maternity_cover": {"is_available": maternity, "waiting_period_months": 24 if maternity else 0}
+        },
+        "conditions_and_cost_sharing": {
+            "waiting_periods": {
+                "initial_period_days": 30,
+                "specific_ailments_period_years": 2,
+                "pre_existing_diseases_period_years": 3
+            },
+            "co_payment": {"is_applicable": False, "details": ""}
+        }
+    }
+
+
+def write_policy_file(directory: Path, document: Dict[str, Any], name: Optional[str] = None) -> Path:
+    """Write a document as <name>_extracted.json, the pattern bulk ingestion globs for."""
+    directory.mkdir(parents=True, exist_ok=True)
+    name = name or document["policy_identification"]["policy_id"]
+    path = directory / f"{name}_extracted.json"
+    path.write_text(json.dumps(document), encoding="utf-8")
+    return path
+
+
+# Varied enough for every filter and sort to split the catalog
+SAMPLE_POLICIES = [
+    build_policy_document("P01", provider="Acme Health Insurance", premium=8000.0,
+                          sum_insured=("5 Lacs",), payment_modes=("Annual", "Monthly"), maternity=True),
+    build_policy_document("P02", provider="Acme Health Insurance", category="Family Floater",
+                          premium=15000.0, sum_insured=("10 Lacs", "25 Lacs"), claim_settlement_ratio=88.0),
+    build_policy_document("P03", provider="Bharat Care", premium=12000.0, sum_insured=("1 Crore",),
+                          payment_modes=("Monthly",), daycare=False, network_hospitals=12000),
+    build_policy_document("P04", provider="Bharat Care", category="Family Floater", premium=None,
+                          sum_insured=(), payment_modes=("Quarterly",), maternity=True),
+    build_policy_document("P05", provider="Chola_Shield 100%", premium=9500.0,
+                          sum_insured=("300000", "700000"), claim_settlement_ratio=0.0),
+    build_policy_document("P06", provider="Delta General", category="Senior Citizen",
+                          premium=22000.0, sum_insured=("15 Lacs",), payment_modes=("Annual",)),
+]
+
+
+@pytest.fixture
+def policy_document():
+    return build_policy_document
+
+
+@pytest.fixture
+def policy_file():
+    return write_policy_file
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = PolicyDatabase(str(tmp_path / "policies.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def policy_dir(tmp_path):
+    directory = tmp_path / "extracted"
+    for document in SAMPLE_POLICIES:
+        write_policy_file(directory, document)
+    return directory
+
+
+@pytest.fixture
+def loaded_db(db, policy_dir):
+    summary = db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["loaded"] == len(SAMPLE_POLICIES), summary
+    return db
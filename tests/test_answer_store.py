@@ -0,0 +1,105 @@
+import sqlite3
+import time
+
+import pytest
+
+from backend.answer_store import AnswerStore, normalize_question
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "answers.db")
+
+
+def written(store_path, *rows, **options):
+    """A store holding `rows` of put() arguments, reopened after the writer flushed them."""
+    store = AnswerStore(store_path, **options)
+    for row in rows:
+        store.put(*row)
+    store.close()
+    return AnswerStore(store_path, **options)
+
+
+def test_normalize_question():
+    assert normalize_question("  What is   the Waiting period?? ") == "what is the waiting period"
+
+
+def test_answer_found_whichever_model_would_be_routed(store_path):
+    answer = {"success": True, "response_text": "30 days", "model_used": "gemini-pro"}
+    store = written(store_path, ("qa", "P01", "Waiting period?", "gemini-pro", "v1", answer, 3))
+    try:
+        assert store.get("qa", "P01", "waiting period", "v1", 3) == answer
+        assert store.stats()["hits"] == 1
+    finally:
+        store.close()
+
+
+def test_misses_for_other_policy_version_or_prompt(store_path):
+    store = written(store_path, ("qa", "P01", "q", "m", "v1", {"a": 1}, 3))
+    try:
+        assert store.get("qa", "P01", "q", "v1", 4) is None
+        assert store.get("qa", "P01", "q", "v2", 3) is None
+        assert store.get("summary", "P01", "q", "v1", 3) is None
+        assert store.stats()["misses"] == 3
+    finally:
+        store.close()
+
+
+def test_newer_answer_replaces_older(store_path):
+    store = written(store_path, ("qa", "P01", "q", "flash", "v1", {"a": 1}, 3),
+                    ("qa", "P01", "q", "pro", "v1", {"a": 2}, 3))
+    try:
+        assert store.get("qa", "P01", "q", "v1", 3) == {"a": 2}
+        assert store.stats()["entries"] == 1
+    finally:
+        store.close()
+
+
+def test_expired_answer_is_a_miss(store_path):
+    store = written(store_path, ("qa", "P01", "q", "m", "v1", {"a": 1}, 3), ttl=0.01)
+    try:
+        time.sleep(0.02)
+        assert store.get("qa", "P01", "q", "v1", 3) is None
+    finally:
+        store.close()
+
+
+def test_size_limit_evicts_closest_to_expiry(store_path):
+    rows = [("qa", "P01", f"q{i}", "m", "v1", {"text": "x" * 100}, 1) for i in range(5)]
+    store = written(store_path, *rows, max_bytes=250)
+    try:
+        stats = store.stats()
+        assert stats["bytes"] <= 250
+        assert store.get("qa", "P01", "q4", "v1", 1) is not None
+        assert store.get("qa", "P01", "q0", "v1", 1) is None
+    finally:
+        store.close()
+
+
+def test_full_queue_drops_writes(store_path):
+    store = AnswerStore(store_path, queue_size=1)
+    store.close()  # writer stopped, so nothing drains the queue
+    store.put("qa", "P01", "q", "m", "v1", {"a": 1}, 1)
+    store.put("qa", "P01", "q2", "m", "v1", {"a": 1}, 1)
+    assert store.stats()["dropped_writes"] == 1
+
+
+def test_store_keyed_by_model_is_replaced(store_path):
+    conn = sqlite3.connect(store_path)
+    conn.execute("""
+        CREATE TABLE answers (
+            kind TEXT NOT NULL, policy_id TEXT NOT NULL, question TEXT NOT NULL,
+            model TEXT NOT NULL, prompt_version TEXT NOT NULL, policy_version INTEGER,
+            answer TEXT NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (kind, policy_id, question, model, prompt_version)
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+    store = written(store_path, ("qa", "P01", "q", "m", "v1", {"a": 1}, 1))
+    try:
+        assert store.get("qa", "P01", "q", "v1", 1) == {"a": 1}
+    finally:
+        store.close()
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.database import AsyncPolicyDatabase
+
+
+@pytest.fixture
+def async_db(loaded_db):
+    wrapper = AsyncPolicyDatabase(loaded_db, max_workers=2)
+    yield wrapper
+    wrapper.shutdown()
+
+
+def test_methods_run_on_the_pool_not_the_loop(async_db):
+    async def main():
+        loop_thread = threading.current_thread()
+        seen = await async_db.run(threading.current_thread)
+        policy = await async_db.get_policy_by_id("P02")
+        return loop_thread, seen, policy
+
+    loop_thread, seen, policy = asyncio.run(main())
+    assert seen is not loop_thread
+    assert seen.name.startswith("policy-db")
+    assert policy["id"] == "P02"
+
+
+def test_concurrency_is_bounded_by_the_pool(async_db):
+    running = []
+    peak = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def work():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        release.wait(1)
+        with lock:
+            running.pop()
+
+    async def main():
+        tasks = [asyncio.ensure_future(async_db.run(work)) for _ in range(6)]
+        await asyncio.sleep(0.05)
+        metrics = async_db.metrics()
+        release.set()
+        await asyncio.gather(*tasks)
+        return metrics
+
+    metrics = asyncio.run(main())
+    assert max(peak) == 2
+    assert metrics["in_flight"] == 2
+    assert metrics["queue_depth"] == 4
+    assert async_db.metrics()["completed"] == 6
+
+
+def test_errors_propagate_and_are_counted(async_db):
+    async def main():
+        with pytest.raises(ValueError):
+            await async_db.get_all_policies("nope")
+
+    asyncio.run(main())
+    assert async_db.metrics()["failed"] == 1
+
+
+def test_attributes_pass_through(async_db, loaded_db):
+    assert async_db.db_path == loaded_db.db_path
@@ -0,0 +1,60 @@
+import os
+
+from tests.conftest import SAMPLE_POLICIES
+
+
+def test_second_run_skips_unchanged_files(loaded_db, policy_dir):
+    summary = loaded_db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["files_seen"] == len(SAMPLE_POLICIES)
+    assert summary["loaded"] == 0
+    assert summary["skipped_unchanged"] == len(SAMPLE_POLICIES)
+    assert summary["failed"] == 0
+
+
+def test_touched_file_with_same_content_is_skipped(loaded_db, policy_dir):
+    path = policy_dir / "P01_extracted.json"
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+    summary = loaded_db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["loaded"] == 0
+    assert summary["skipped_unchanged"] == len(SAMPLE_POLICIES)
+
+
+def test_changed_file_is_reloaded(loaded_db, policy_dir, policy_document, policy_file):
+    policy_file(policy_dir, policy_document("P01", premium=5000.0))
+    summary = loaded_db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["loaded"] == 1
+    assert loaded_db.get_policy_by_id("P01")["base_premium"] == 5000.0
+
+
+def test_force_reloads_everything(loaded_db, policy_dir):
+    summary = loaded_db.bulk_load_policies(str(policy_dir), workers=1, force=True)
+    assert summary["loaded"] == len(SAMPLE_POLICIES)
+    assert summary["skipped_unchanged"] == 0
+
+
+def test_unparseable_file_is_counted_as_failed(db, policy_dir):
+    (policy_dir / "broken_extracted.json").write_text("{not json", encoding="utf-8")
+    summary = db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["loaded"] == len(SAMPLE_POLICIES)
+    assert summary["failed"] == 1
+    assert summary["errors"][0]["source_file"].endswith("broken_extracted.json")
+
+
+def test_bad_record_fails_alone(db, policy_dir, policy_document, policy_file):
+    document = policy_document("P99")
+    document["provider_information"]["provider_name"] = None  # violates NOT NULL
+    bad_path = policy_file(policy_dir, document)
+
+    summary = db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["loaded"] == len(SAMPLE_POLICIES)
+    assert summary["failed"] == 1
+    assert summary["errors"][0]["source_file"] == str(bad_path)
+    assert db.get_policy_by_id("P99") is None
+    assert db.get_policy_by_id("P01") is not None
+
+    # Not recorded as ingested, so the next run tries it again
+    summary = db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["failed"] == 1
+    assert summary["skipped_unchanged"] == len(SAMPLE_POLICIES)
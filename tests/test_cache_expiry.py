@@ -0,0 +1,101 @@
+import asyncio
+import types
+
+import pytest
+
+from backend import cache as cache_module
+from backend.cache import MemoryCacheBackend, TieredCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cache module's clock; the event loop keeps the real one
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=clock, time=clock))
+    return clock
+
+
+@pytest.fixture
+def backend():
+    return MemoryCacheBackend({"default": (1000, 10_000_000)})
+
+
+def test_sweep_removes_only_due_entries(backend, clock):
+    backend.set("short", 1, ttl=5)
+    backend.set("long", 2, ttl=50)
+    clock.now += 10
+
+    assert backend.sweep() == 1
+    assert backend.lookup("short") is None
+    assert backend.lookup("long")[0] == 2
+    assert backend.stats()["expirations"] == 1
+
+
+def test_sweep_respects_batch_limit(backend, clock):
+    for i in range(10):
+        backend.set(str(i), i, ttl=1)
+    clock.now += 2
+    assert backend.sweep(limit=4) == 4
+    assert backend.sweep(limit=4) == 4
+    assert backend.sweep(limit=4) == 2
+
+
+def test_overwritten_entry_keeps_its_new_expiry(backend, clock):
+    backend.set("k", "old", ttl=5)
+    backend.set("k", "new", ttl=50)
+    clock.now += 10
+
+    # The heap item left by the first set is skipped, not acted on
+    assert backend.sweep() == 0
+    assert backend.lookup("k")[0] == "new"
+
+
+def test_deleted_and_evicted_entries_are_skipped():
+    backend = MemoryCacheBackend({"default": (2, 10_000_000)})
+    backend.set("a", 1, ttl=0)
+    backend.set("b", 2, ttl=0)
+    backend.set("c", 3, ttl=0)  # evicts a
+    backend.delete("b")
+    assert backend.sweep() == 1
+    assert backend.stats()["total_entries"] == 0
+
+
+def test_heap_is_rebuilt_when_stale_items_pile_up(backend, clock):
+    for _ in range(500):
+        backend.set("k", 1, ttl=60)
+    assert len(backend._namespace("default").expiry_heap) < 100
+
+
+def test_stale_entry_is_kept_until_it_expires(backend, clock):
+    backend.set("k", 1, ttl=5, stale_ttl=10)
+    clock.now += 7
+    assert backend.lookup("k") is None
+    assert backend.lookup("k", allow_stale=True)[0] == 1
+    assert backend.sweep() == 0
+    clock.now += 10
+    assert backend.sweep() == 1
+
+
+def test_run_sweeper_expires_in_the_background(clock):
+    cache = TieredCache(l1=MemoryCacheBackend({"default": (1000, 10_000_000)}))
+    for i in range(5):
+        cache.set(str(i), i, ttl=1)
+    clock.now += 2
+
+    async def main():
+        sweeper = asyncio.ensure_future(cache.run_sweeper(interval=0.01, batch=2))
+        await asyncio.sleep(0.05)
+        sweeper.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await sweeper
+
+    asyncio.run(main())
+    assert cache.stats()["total_entries"] == 0
@@ -0,0 +1,73 @@
+import pytest
+
+from backend.cache import MemoryCacheBackend, TieredCache, approximate_size
+
+
+@pytest.fixture
+def backend():
+    return MemoryCacheBackend({"default": (3, 1_000_000), "small": (100, 2_000)})
+
+
+def value_of(backend, key, namespace="default"):
+    entry = backend.lookup(key, namespace)
+    return entry[0] if entry else None
+
+
+def test_entry_limit_evicts_least_recently_used(backend):
+    for key in ("a", "b", "c"):
+        backend.set(key, key, ttl=60)
+    backend.lookup("a")  # a is now the most recently used
+    backend.set("d", "d", ttl=60)
+
+    assert value_of(backend, "b") is None
+    assert [value_of(backend, key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert backend.stats()["namespaces"]["default"]["evictions"] == 1
+
+
+def test_byte_limit_evicts_until_under(backend):
+    payload = "x" * 600
+    for key in ("a", "b", "c"):
+        backend.set(key, payload, ttl=60, namespace="small")
+    ns = backend.stats()["namespaces"]["small"]
+    assert ns["entries"] == 2
+    assert ns["bytes"] <= 2_000
+    assert value_of(backend, "a", "small") is None
+
+
+def test_oversized_value_is_rejected(backend):
+    backend.set("big", "x" * 5_000, ttl=60, namespace="small")
+    assert value_of(backend, "big", "small") is None
+    assert backend.stats()["namespaces"]["small"]["rejected"] == 1
+
+
+def test_overwrite_replaces_size(backend):
+    backend.set("a", "x" * 100, ttl=60)
+    backend.set("a", "y", ttl=60)
+    ns = backend.stats()["namespaces"]["default"]
+    assert ns["entries"] == 1
+    assert ns["bytes"] < approximate_size("x" * 100)
+
+
+def test_namespaces_are_limited_separately(backend):
+    for key in ("a", "b", "c"):
+        backend.set(key, key, ttl=60)
+        backend.set(key, key, ttl=60, namespace="unknown")  # falls back to the default limits
+    backend.set("d", "d", ttl=60, namespace="unknown")
+    assert backend.stats()["namespaces"]["default"]["entries"] == 3
+    assert backend.stats()["namespaces"]["unknown"]["entries"] == 3
+    assert value_of(backend, "a") == "a"
+
+
+def test_approximate_size_counts_shared_objects_once():
+    shared = "x" * 1000
+    assert approximate_size([shared, shared]) < 2 * approximate_size(shared)
+    assert approximate_size({"k": [1, 2, 3]}) > approximate_size({})
+
+
+def test_hit_and_miss_counters():
+    cache = TieredCache(l1=MemoryCacheBackend({"default": (10, 1_000_000)}))
+    cache.set("k", {"v": 1})
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
@@ -0,0 +1,114 @@
+import asyncio
+import types
+
+import pytest
+
+from backend import cache as cache_module
+from backend.cache import MemoryCacheBackend, TieredCache
+
+
+@pytest.fixture
+def cache():
+    return TieredCache(l1=MemoryCacheBackend({"default": (100, 10_000_000)}))
+
+
+def test_concurrent_misses_share_one_computation(cache):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"answer": 42}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute, ttl=60) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(result == {"answer": 42} for result in results)
+    assert cache.stats()["coalesced"] == 9
+    assert cache.get("k") == {"answer": 42}
+
+
+def test_failure_reaches_every_waiter_and_is_not_cached(cache):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get("k") is None
+    assert cache._inflight == {}
+
+
+def test_cancelled_waiter_does_not_cancel_the_computation(cache):
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        second = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert cache.get("k") == "done"
+
+
+def test_should_cache_filters_results(cache):
+    async def compute():
+        return {"error": "not found"}
+
+    async def main():
+        return await cache.get_or_compute("k", compute, should_cache=lambda r: "error" not in r)
+
+    assert asyncio.run(main()) == {"error": "not found"}
+    assert cache.get("k") is None
+
+
+def test_stale_value_is_served_while_refreshing(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0]))
+    cache.set("k", "old", ttl=1, stale_ttl=60)
+    now[0] += 5
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "new"
+
+    async def main():
+        served = await cache.get_or_compute("k", compute, ttl=60, stale_ttl=60)
+        await asyncio.sleep(0.05)
+        return served
+
+    assert asyncio.run(main()) == "old"
+    assert cache.get("k") == "new"
+
+
+def test_cached_decorator_is_single_flight(monkeypatch, cache):
+    monkeypatch.setattr(cache_module, "cache", cache)
+    calls = []
+
+    @cache_module.cached(ttl=60, key_prefix="square")
+    async def square(x):
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return x * x
+
+    async def main():
+        return await asyncio.gather(square(3), square(3), square(4))
+
+    assert asyncio.run(main()) == [9, 9, 16]
+    assert sorted(calls) == [3, 4]
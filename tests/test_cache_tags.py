@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from backend.cache import MemoryCacheBackend, TieredCache
+from backend.database import CONTENT_TAG, DATASET_TAG, policy_tag
+
+
+@pytest.fixture
+def cache(loaded_db, monkeypatch):
+    # Check versions on every read instead of trusting them for a while
+    monkeypatch.setattr("backend.cache.CACHE_TAG_CHECK_SECONDS", 0)
+    cache = TieredCache(l1=MemoryCacheBackend({"default": (100, 10_000_000)}))
+    cache.set_version_source(loaded_db.get_tag_versions)
+    return cache
+
+
+def change_policy(db, tmp_path, policy_document, policy_file, policy_id, **fields):
+    db.load_policy_from_json(str(policy_file(tmp_path, policy_document(policy_id, **fields))))
+
+
+def test_policy_versions_move_with_their_policy(loaded_db, tmp_path, policy_document, policy_file):
+    tags = [policy_tag("P01"), policy_tag("P02"), policy_tag("missing"), DATASET_TAG]
+    before = loaded_db.get_tag_versions(tags)
+    assert before[policy_tag("missing")] == 0
+
+    change_policy(loaded_db, tmp_path, policy_document, policy_file, "P01", premium=1.0)
+    after = loaded_db.get_tag_versions(tags)
+    assert after[policy_tag("P01")] > before[policy_tag("P01")]
+    assert after[policy_tag("P02")] == before[policy_tag("P02")]
+    assert after[DATASET_TAG] > before[DATASET_TAG]
+
+
+def test_content_version_moves_with_chunks(loaded_db):
+    before = loaded_db.get_tag_versions([CONTENT_TAG])[CONTENT_TAG]
+    loaded_db.upsert_policy_chunks("P01", [{"section_name": "benefits", "chunk_text": "text", "chunk_index": 0}])
+    assert loaded_db.get_tag_versions([CONTENT_TAG])[CONTENT_TAG] > before
+
+
+def test_change_invalidates_only_entries_tagged_with_it(cache, loaded_db, tmp_path, policy_document, policy_file):
+    for policy_id in ("P01", "P02"):
+        tags = [policy_tag(policy_id)]
+        cache.set(policy_id, f"answer about {policy_id}", ttl=60, tags=cache.tag_versions(tags))
+    assert cache.get("P01") == "answer about P01"
+
+    change_policy(loaded_db, tmp_path, policy_document, policy_file, "P01", premium=1.0)
+    assert cache.get("P01") is None
+    assert cache.get("P02") == "answer about P02"
+    assert cache.stats()["tag_invalidations"] == 1
+
+
+def test_change_during_compute_is_not_served(cache, loaded_db, tmp_path, policy_document, policy_file):
+    async def compute():
+        # Versions were read before this ran, so the result is born stale
+        await asyncio.to_thread(change_policy, loaded_db, tmp_path, policy_document, policy_file, "P01",
+                                premium=1.0)
+        return "computed from old data"
+
+    async def main():
+        first = await cache.get_or_compute("k", compute, ttl=60, tags=[policy_tag("P01")])
+        return first, await cache.aget("k")
+
+    assert asyncio.run(main()) == ("computed from old data", None)
+
+
+def test_untagged_entries_ignore_versions(cache, loaded_db, tmp_path, policy_document, policy_file):
+    cache.set("k", "v", ttl=60)
+    change_policy(loaded_db, tmp_path, policy_document, policy_file, "P01", premium=1.0)
+    assert cache.get("k") == "v"
+
+
+def test_failing_version_source_is_a_miss(cache):
+    cache.set("k", "v", ttl=60, tags=cache.tag_versions([policy_tag("P01")]))
+
+    def broken(tags):
+        raise RuntimeError("database unavailable")
+
+    cache.set_version_source(broken)
+    assert cache.get("k") is None
+
+
+def test_tag_versions_are_memoized(loaded_db, monkeypatch):
+    monkeypatch.setattr("backend.cache.CACHE_TAG_CHECK_SECONDS", 60)
+    calls = []
+    cache = TieredCache(l1=MemoryCacheBackend({"default": (100, 10_000_000)}))
+    cache.set_version_source(lambda tags: calls.append(tags) or loaded_db.get_tag_versions(tags))
+
+    cache.tag_versions([policy_tag("P01")])
+    asyncio.run(cache.tag_versions_async([policy_tag("P01"), policy_tag("P02")]))
+    assert calls == [[policy_tag("P01")], [policy_tag("P02")]]
@@ -0,0 +1,114 @@
+import asyncio
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend.cache import (CacheRecord, MemoryCacheBackend, SQLiteCacheBackend, TieredCache,
+                           create_cache)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LIMITS = {"default": (100, 10_000_000), "tiny": (2, 10_000_000)}
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+def worker(cache_path):
+    """One API worker: its own memory tier over the shared file."""
+    return TieredCache(l1=MemoryCacheBackend(LIMITS), l2=SQLiteCacheBackend(cache_path, LIMITS),
+                       invalidation_poll_interval=0)
+
+
+def in_other_process(cache_path, statement):
+    """Run `statement` against the shared file from another worker process."""
+    code = f"from backend.cache import SQLiteCacheBackend; l2 = SQLiteCacheBackend({cache_path!r}); {statement}"
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                   env={"CACHE_BACKEND": "memory", "PATH": ""})
+
+
+def test_l2_hit_is_promoted_to_l1(cache_path):
+    first, second = worker(cache_path), worker(cache_path)
+    first.set("k", {"v": 1}, ttl=60)
+
+    assert second.l1.lookup("k") is None
+    assert second.get("k") == {"v": 1}
+    assert second.l1.lookup("k")[0] == CacheRecord({"v": 1})
+
+
+def test_async_reads_and_writes_reach_l2(cache_path):
+    first, second = worker(cache_path), worker(cache_path)
+
+    async def main():
+        await first.aset("k", [1, 2], ttl=60)
+        return await second.aget("k")
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_delete_in_other_worker_drops_l1_copy(cache_path):
+    cache = worker(cache_path)
+    cache.set("k", "v", ttl=60)
+    in_other_process(cache_path, "l2.delete('k', 'default')")
+
+    assert cache.l1.lookup("k") is not None
+    assert cache.sync_invalidations(force=True) == 1
+    assert cache.get("k") is None
+
+
+def test_clear_in_other_worker_clears_l1(cache_path):
+    cache = worker(cache_path)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    in_other_process(cache_path, "l2.clear()")
+
+    async def main():
+        return await cache.sync_invalidations_async(force=True)
+
+    assert asyncio.run(main()) == 1
+    assert cache.l1.stats()["total_entries"] == 0
+
+
+def test_own_invalidations_are_not_replayed(cache_path):
+    cache = worker(cache_path)
+    cache.set("k", "v", ttl=60)
+    cache.delete("k")
+    assert cache.l2.invalidations() == []
+
+
+def test_sqlite_tier_evicts_soonest_expiring(cache_path, monkeypatch):
+    monkeypatch.setattr("backend.cache.CACHE_SQLITE_EVICTION_BATCH", 1)
+    l2 = SQLiteCacheBackend(cache_path, LIMITS)
+    l2.set("long", 1, ttl=600, namespace="tiny")
+    l2.set("short", 2, ttl=10, namespace="tiny")
+    l2.set("new", 3, ttl=300, namespace="tiny")
+
+    assert l2.lookup("short", "tiny") is None
+    assert [l2.lookup(key, "tiny")[0] for key in ("long", "new")] == [1, 3]
+    assert l2.stats()["namespaces"]["tiny"]["entries"] == 2
+
+
+def test_l2_failure_degrades_to_miss():
+    class BrokenTier(MemoryCacheBackend):
+        name = "sqlite"
+
+        def lookup(self, *args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+    cache = TieredCache(l1=None, l2=BrokenTier(LIMITS))
+    assert cache.get("k") is None
+    assert cache.stats()["l2_errors"] == 1
+
+
+def test_create_cache_backends(monkeypatch, cache_path):
+    monkeypatch.setattr("backend.cache.CACHE_DB_PATH", cache_path)
+    assert create_cache(backend="memory").l2 is None
+    assert create_cache(backend="sqlite").l1 is None
+    tiered = create_cache(backend="tiered")
+    assert tiered.l1 is not None and tiered.l2 is not None
+    with pytest.raises(ValueError):
+        create_cache(backend="redis")
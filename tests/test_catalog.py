@@ -0,0 +1,55 @@
+import pytest
+
+from backend.catalog import CatalogSnapshot, PolicyCatalog
+from backend.database import POLICY_SORTS
+
+
+@pytest.fixture
+def snapshot(loaded_db):
+    source = loaded_db.get_catalog_rows()
+    return CatalogSnapshot(source["version"], source["rows"])
+
+
+def ids(page):
+    return [card["id"] for card in page["policies"]]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"provider_name": "acme"},
+    {"provider_name": "_"},
+    {"provider_name": "%"},
+    {"provider_name": "chola_"},
+    {"provider_name": "100%"},
+    {"provider_name": "a_m"},
+    {"policy_category": "Family Floater"},
+    {"min_sum_insured": 1000000},
+    {"max_premium": 12000},
+    {"maternity_required": True},
+    {"daycare_required": False},
+    {"payment_mode": "Monthly"},
+    {"payment_mode": "Weekly"},
+])
+@pytest.mark.parametrize("sort", sorted(POLICY_SORTS))
+def test_catalog_matches_sql(loaded_db, snapshot, filters, sort):
+    sql = loaded_db.query_policy_cards(sort=sort, **filters)
+    catalog = snapshot.query(sort=sort, **filters)
+    assert ids(catalog) == ids(sql)
+    assert catalog["total"] == sql["total"]
+
+
+def test_wildcards_match_literally(loaded_db, snapshot):
+    for provider in ("_", "%", "100%"):
+        assert ids(loaded_db.query_policy_cards(provider_name=provider)) == ["P05"]
+        assert ids(snapshot.query(provider_name=provider)) == ["P05"]
+
+
+def test_catalog_rebuilds_when_dataset_changes(loaded_db, policy_document, policy_file, tmp_path):
+    catalog = PolicyCatalog(loaded_db, refresh_interval=0)
+    assert catalog.refresh().size == 6
+    assert catalog.refresh() is catalog.snapshot
+    assert catalog.rebuilds == 1
+
+    loaded_db.load_policy_from_json(str(policy_file(tmp_path, policy_document("P07"))))
+    assert catalog.refresh().size == 7
+    assert catalog.rebuilds == 2
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from backend.database import policy_tag
+from backend.retrieval import PolicyChunkIndex, PolicyChunks
+
+
+def blob(*values):
+    return np.asarray(values, dtype=np.float32).tobytes()
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def chunk(index, *values, text=None):
+    return {"section_name": "benefits", "chunk_text": text or f"chunk {index}", "chunk_index": index,
+            "embedding": blob(*values)}
+
+
+@pytest.fixture
+def index(loaded_db):
+    loaded_db.upsert_policy_chunks("P01", [chunk(0, 1, 0, 0), chunk(1, 0, 1, 0), chunk(2, 1, 1, 0)])
+    loaded_db.upsert_policy_chunks("P02", [chunk(0, 0, 0, 1)])
+
+    def version(policy_id):
+        return loaded_db.get_tag_versions([policy_tag(policy_id)])[policy_tag(policy_id)]
+
+    return PolicyChunkIndex(loaded_db, version, max_policies=2)
+
+
+def test_top_k_orders_by_cosine():
+    rows = [{"chunk_index": i, "embedding": blob(*v)} for i, v in enumerate([(1, 0), (0, 1), (1, 1), (-1, 0)])]
+    chunks = PolicyChunks.from_rows(1, rows)
+
+    ranked = chunks.top_k(unit(1, 0.2), 3)
+    assert [c["chunk_index"] for _, c in ranked] == [0, 2, 1]
+    assert ranked[0][0] == pytest.approx(float(unit(1, 0) @ unit(1, 0.2)))
+    assert [c["chunk_index"] for _, c in chunks.top_k(unit(1, 0.2), 10)] == [0, 2, 1, 3]
+    assert chunks.top_k(unit(1, 0), 0) == []
+
+
+def test_unusable_embeddings_are_skipped():
+    rows = [
+        {"chunk_index": 0, "embedding": blob(1, 0)},
+        {"chunk_index": 1, "embedding": None},
+        {"chunk_index": 2, "embedding": blob(0, 0)},
+        {"chunk_index": 3, "embedding": blob(1, 0, 0)},
+    ]
+    chunks = PolicyChunks.from_rows(1, rows)
+    assert [c["chunk_index"] for c in chunks.chunks] == [0]
+    assert "embedding" not in chunks.chunks[0]
+    assert np.allclose(np.linalg.norm(chunks.matrix, axis=1), 1.0)
+
+
+def test_no_chunks_gives_empty_results():
+    assert PolicyChunks.from_rows(1, []).top_k(unit(1, 0), 3) == []
+
+
+def test_search_returns_chunk_rows(index):
+    [(score, best)] = index.search("P01", unit(0, 1, 0), 1)
+    assert best["chunk_text"] == "chunk 1"
+    assert score == pytest.approx(1.0)
+
+
+def test_matrix_reused_until_policy_changes(index, loaded_db):
+    index.get("P01")
+    index.get("P01")
+    assert (index.loads, index.hits) == (1, 1)
+
+    loaded_db.upsert_policy_chunks("P01", [chunk(3, 0, 0, 1, text="new chunk")])
+    assert len(index.get("P01")) == 4
+    assert index.loads == 2
+    [(_, best)] = index.search("P01", unit(0, 0, 1), 1)
+    assert best["chunk_text"] == "new chunk"
+
+
+def test_policies_kept_are_bounded(index):
+    for policy_id in ("P01", "P02", "P03"):
+        index.get(policy_id)
+    stats = index.stats()
+    assert stats["policies"] == 2
+    assert stats["chunks"] == 1  # P02's one chunk; P03 has none
+    index.get("P01")
+    assert index.loads == 4
+
+
+def test_invalidate(index):
+    index.get("P01")
+    index.get("P02")
+    index.invalidate("P01")
+    assert index.stats()["policies"] == 1
+    index.invalidate()
+    assert index.stats()["policies"] == 0
@@ -0,0 +1,33 @@
+import pytest
+
+from backend.database import CARD_POLICY_COLUMNS, FACET_COLUMNS
+
+
+def test_card_set_reads_only_card_columns(loaded_db):
+    policy = loaded_db.get_all_policies("card")[0]
+    assert set(CARD_POLICY_COLUMNS) <= set(policy)
+    assert "raw_json" not in policy
+    assert isinstance(policy["payment_modes"], list)
+
+
+def test_facet_set_reads_only_facet_columns(loaded_db):
+    policies = loaded_db.get_all_policies("facet")
+    assert len(policies) == 6
+    assert all(set(policy) == set(FACET_COLUMNS) for policy in policies)
+
+
+def test_detail_set_includes_the_document(loaded_db):
+    policy = loaded_db.get_policy_by_id("P03")
+    assert policy["raw_json"]["policy_identification"]["policy_id"] == "P03"
+    assert policy["sum_insured_options"] == ["1 Crore"]
+
+
+def test_unknown_column_set_is_rejected(loaded_db):
+    with pytest.raises(ValueError):
+        loaded_db.get_all_policies("everything")
+
+
+def test_facet_values_are_distinct_and_sorted(loaded_db):
+    assert loaded_db.get_facet_values("policy_category") == ["Family Floater", "Individual", "Senior Citizen"]
+    with pytest.raises(ValueError):
+        loaded_db.get_facet_values("raw_json")
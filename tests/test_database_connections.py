@@ -0,0 +1,46 @@
+import sqlite3
+import threading
+
+
+def test_reader_connection_is_reused_per_thread(db):
+    assert db._reader() is db._reader()
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db._reader()))
+    thread.start()
+    thread.join()
+    assert other[0] is not db._reader()
+
+
+def test_readers_are_query_only(db):
+    try:
+        db._reader().execute("DELETE FROM policies")
+    except sqlite3.OperationalError as e:
+        assert "readonly" in str(e)
+    else:
+        raise AssertionError("reader connection accepted a write")
+
+
+def test_close_closes_readers_opened_by_other_threads(db):
+    readers = []
+    threads = [threading.Thread(target=lambda: readers.append(db._reader())) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    readers.append(db._reader())
+
+    db.close()
+
+    for conn in readers:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError as e:
+            assert "closed" in str(e)
+        else:
+            raise AssertionError("reader left open after close()")
+
+
+def test_database_reopens_connections_after_close(loaded_db):
+    loaded_db.close()
+    assert len(loaded_db.get_all_policies("card")) == 6
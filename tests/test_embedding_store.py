@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from backend.database import policy_tag
+from backend.embedding_store import EmbeddingStore, export_embedding_store
+from backend.retrieval import PolicyChunkIndex
+
+
+def blob(*values):
+    return np.asarray(values, dtype=np.float32).tobytes()
+
+
+def chunk(index, *values):
+    return {"section_name": "benefits", "chunk_text": f"chunk {index}", "chunk_index": index,
+            "embedding": blob(*values)}
+
+
+@pytest.fixture
+def chunk_db(loaded_db):
+    loaded_db.upsert_policy_chunks("P01", [chunk(0, 3, 4, 0), chunk(1, 0, 0, 2)])
+    loaded_db.upsert_policy_chunks("P02", [chunk(5, 0, 1, 0)])
+    return loaded_db
+
+
+def version_of(db, policy_id):
+    return db.get_tag_versions([policy_tag(policy_id)])[policy_tag(policy_id)]
+
+
+def test_export_and_map(chunk_db, tmp_path):
+    manifest = export_embedding_store(chunk_db, str(tmp_path))
+    assert (manifest["generation"], manifest["count"], manifest["dim"]) == (1, 3, 3)
+
+    store = EmbeddingStore(str(tmp_path), check_interval=0)
+    vectors, chunk_indexes = store.policy_rows("P01", version_of(chunk_db, "P01"))
+    assert isinstance(vectors, np.memmap)
+    assert not vectors.flags.writeable
+    assert np.allclose(vectors, [[0.6, 0.8, 0], [0, 0, 1]])
+    assert list(chunk_indexes) == [0, 1]
+    assert store.stats() == {"generation": 1, "vectors": 3, "policies": 2}
+
+
+def test_other_version_or_policy_is_a_miss(chunk_db, tmp_path):
+    export_embedding_store(chunk_db, str(tmp_path))
+    store = EmbeddingStore(str(tmp_path), check_interval=0)
+    assert store.policy_rows("P01", version_of(chunk_db, "P01") + 1) is None
+    assert store.policy_rows("P03", version_of(chunk_db, "P03")) is None
+
+
+def test_missing_store_is_a_miss(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "nowhere"), check_interval=0)
+    assert store.policy_rows("P01", 1) is None
+    assert store.stats()["generation"] is None
+
+
+def test_new_generation_replaces_the_old(chunk_db, tmp_path):
+    export_embedding_store(chunk_db, str(tmp_path))
+    store = EmbeddingStore(str(tmp_path), check_interval=0)
+    store.policy_rows("P01", None)
+
+    chunk_db.upsert_policy_chunks("P03", [chunk(0, 1, 1, 1)])
+    manifest = export_embedding_store(chunk_db, str(tmp_path))
+    assert manifest["generation"] == 2
+    assert sorted(path.name for path in tmp_path.glob("chunk_*.npy")) == [
+        "chunk_embeddings-2.npy", "chunk_indexes-2.npy"
+    ]
+    assert store.policy_rows("P03", version_of(chunk_db, "P03")) is not None
+    assert store.generation == 2
+
+
+def test_chunk_index_views_the_store(chunk_db, tmp_path):
+    export_embedding_store(chunk_db, str(tmp_path))
+    index = PolicyChunkIndex(chunk_db, lambda policy_id: version_of(chunk_db, policy_id),
+                             store=EmbeddingStore(str(tmp_path), check_interval=0))
+
+    entry = index.get("P01")
+    assert entry.mapped
+    assert [c["chunk_text"] for c in entry.chunks] == ["chunk 0", "chunk 1"]
+    assert index.stats()["mapped_policies"] == 1
+
+    # Changed since the export: read from the database instead
+    chunk_db.upsert_policy_chunks("P01", [chunk(2, 1, 0, 0)])
+    entry = index.get("P01")
+    assert not entry.mapped
+    assert len(entry) == 3
@@ -0,0 +1,67 @@
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from starlette.requests import Request  # noqa: E402
+
+from backend import responses  # noqa: E402
+from backend.responses import dumps, encode_body, encoded_response  # noqa: E402
+
+
+def request_with(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+LARGE = {"policies": [{"id": f"P{i:03d}", "name": "Plan with a reasonably long name"} for i in range(100)]}
+
+
+def test_dumps_is_compact_utf8():
+    assert json.loads(dumps({"name": "₹5,000", "n": [1, 2]})) == {"name": "₹5,000", "n": [1, 2]}
+    assert b" " not in dumps({"a": [1, 2]})
+
+
+def test_small_bodies_are_not_compressed():
+    encoded = encode_body({"ok": True})
+    assert encoded.gzipped is None
+    assert json.loads(encoded.body) == {"ok": True}
+
+
+def test_large_bodies_get_a_deterministic_gzip_copy():
+    first, second = encode_body(LARGE), encode_body(LARGE)
+    assert gzip.decompress(first.gzipped) == first.body
+    assert first.gzipped == second.gzipped
+
+
+def test_gzip_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(responses, "RESPONSE_GZIP_ENABLED", False)
+    assert encode_body(LARGE).gzipped is None
+
+
+def test_gzip_served_only_when_accepted():
+    encoded = encode_body(LARGE)
+
+    plain = encoded_response(encoded, request_with())
+    assert plain.body == encoded.body
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    compressed = encoded_response(encoded, request_with(accept_encoding="br, gzip"))
+    assert compressed.body == encoded.gzipped
+    assert compressed.headers["content-encoding"] == "gzip"
+
+    refused = encoded_response(encoded, request_with(accept_encoding="gzip;q=0"))
+    assert refused.body == encoded.body
+
+
+def test_response_keeps_status_and_headers():
+    response = encoded_response(encode_body({"error": "x"}), request_with(), headers={"X-Cache": "HIT"},
+                                status_code=404)
+    assert response.status_code == 404
+    assert response.headers["x-cache"] == "HIT"
+    assert response.media_type == "application/json"
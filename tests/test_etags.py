@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from starlette.requests import Request  # noqa: E402
+
+from backend.responses import (encode_body, encoded_response, etag_matches, make_etag,  # noqa: E402
+                               not_modified_response)
+
+
+def request_with(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+LARGE = {"policies": [{"id": f"P{i:03d}", "name": "Plan with a reasonably long name"} for i in range(100)]}
+
+
+def test_etag_is_strong_and_stable():
+    etag = make_etag(7, "policies", {"sort": "id"})
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(7, "policies", {"sort": "id"})
+    assert etag != make_etag(8, "policies", {"sort": "id"})
+
+
+def test_if_none_match_forms():
+    etag = make_etag(1)
+    gzip_etag = encoded_response(encode_body(LARGE), request_with(accept_encoding="gzip"), etag=etag).headers["etag"]
+
+    assert etag_matches(request_with(if_none_match=etag), etag)
+    assert etag_matches(request_with(if_none_match=f"W/{etag}"), etag)
+    assert etag_matches(request_with(if_none_match=f'"other", {etag}'), etag)
+    assert etag_matches(request_with(if_none_match="*"), etag)
+    assert etag_matches(request_with(if_none_match=gzip_etag), etag)
+    assert not etag_matches(request_with(if_none_match=make_etag(2)), etag)
+    assert not etag_matches(request_with(), etag)
+
+
+def test_gzip_variant_has_its_own_etag():
+    etag = make_etag(1)
+    encoded = encode_body(LARGE)
+    plain = encoded_response(encoded, request_with(), etag=etag)
+    compressed = encoded_response(encoded, request_with(accept_encoding="gzip"), etag=etag)
+    assert plain.headers["etag"] == etag
+    assert compressed.headers["etag"] != etag
+
+
+def test_not_modified_carries_the_tag_the_client_holds():
+    etag = make_etag(1)
+    gzip_etag = encoded_response(encode_body(LARGE), request_with(accept_encoding="gzip"), etag=etag).headers["etag"]
+
+    response = not_modified_response(request_with(if_none_match=gzip_etag, accept_encoding="gzip"), etag,
+                                     {"Cache-Control": "no-cache"})
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == gzip_etag
+    assert response.headers["cache-control"] == "no-cache"
+
+    # Holds the gzip copy but no longer accepts gzip: answer with the plain tag
+    response = not_modified_response(request_with(if_none_match=gzip_etag), etag)
+    assert response.headers["etag"] == etag
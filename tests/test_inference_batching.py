@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from backend import inference
+from backend.inference import InferenceScheduler, MicroBatcher
+
+
+class Models:
+    """Stand-ins for SentenceTransformer.encode and CrossEncoder.predict that record batch sizes."""
+
+    def __init__(self):
+        self.encode_batches = []
+        self.predict_batches = []
+
+    def encode(self, texts):
+        self.encode_batches.append(len(texts))
+        return np.asarray([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+    def predict(self, pairs):
+        self.predict_batches.append(len(pairs))
+        return np.asarray([len(passage) for _, passage in pairs], dtype=np.float32)
+
+
+def run_with_scheduler(scheduler, work):
+    """Start `scheduler` on a loop and run `work()` on worker threads against it."""
+    async def main():
+        scheduler.start()
+        try:
+            return await work()
+        finally:
+            await scheduler.stop()
+    return asyncio.run(main())
+
+
+def test_concurrent_encodes_are_batched():
+    models = Models()
+    scheduler = InferenceScheduler(models.encode, models.predict, enabled=True)
+    # Wide enough that every thread's request lands in the first few batches
+    scheduler.encoder.max_wait = 0.05
+    texts = [f"question {'x' * i}" for i in range(16)]
+
+    async def work():
+        return await asyncio.gather(*(asyncio.to_thread(scheduler.encode, text) for text in texts))
+
+    vectors = run_with_scheduler(scheduler, work)
+    assert [vector[0] for vector in vectors] == [len(text) for text in texts]
+    assert sum(models.encode_batches) == 16
+    assert len(models.encode_batches) < 16
+
+
+def test_rerank_results_are_split_per_request():
+    models = Models()
+    scheduler = InferenceScheduler(models.encode, models.predict, enabled=True)
+    requests = [[("q1", "a"), ("q1", "bb")], [("q2", "ccc")], [("q3", "dddd"), ("q3", "e"), ("q3", "ff")]]
+
+    async def work():
+        return await asyncio.gather(*(asyncio.to_thread(scheduler.rerank, pairs) for pairs in requests))
+
+    scores = run_with_scheduler(scheduler, work)
+    assert [list(s) for s in scores] == [[1, 2], [3], [4, 1, 2]]
+    assert scheduler.rerank([]).size == 0
+
+
+def test_without_a_loop_models_are_called_directly():
+    models = Models()
+    scheduler = InferenceScheduler(models.encode, models.predict, enabled=True)
+    assert scheduler.encode("abc")[0] == 3
+    assert list(scheduler.rerank([("q", "ab")])) == [2]
+    assert scheduler.stats()["batching"] is False
+
+
+def test_batch_failure_reaches_every_caller():
+    def broken(items):
+        raise RuntimeError("CUDA out of memory")
+
+    async def main():
+        batcher = MicroBatcher("encode", broken, max_batch=4, max_wait=0.01)
+        batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+            return results, batcher.stats()
+        finally:
+            await batcher.stop()
+
+    results, stats = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert stats["failed_batches"] == 1
+
+
+def test_stop_fails_queued_and_running_requests():
+    release = threading.Event()
+
+    def slow(items):
+        release.wait(5)
+        return items
+
+    async def main():
+        batcher = MicroBatcher("rerank", slow, max_batch=1, max_wait=0)
+        batcher.start()
+        running = asyncio.ensure_future(batcher.submit("running"))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(batcher.submit("queued"))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        release.set()
+        results = await asyncio.gather(running, queued, return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await batcher.submit("after stop")
+        return results
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_worker_gives_up_after_the_result_timeout(monkeypatch):
+    monkeypatch.setattr(inference, "INFERENCE_RESULT_TIMEOUT_SECONDS", 0.05)
+    release = threading.Event()
+
+    def stuck(texts):
+        release.wait(5)
+        return np.zeros((len(texts), 2), dtype=np.float32)
+
+    scheduler = InferenceScheduler(stuck, Models().predict, enabled=True)
+
+    async def work():
+        try:
+            with pytest.raises(TimeoutError):
+                await asyncio.to_thread(scheduler.encode, "question")
+        finally:
+            release.set()
+
+    run_with_scheduler(scheduler, work)
+
+
+def test_disabled_scheduler_never_batches():
+    models = Models()
+    scheduler = InferenceScheduler(models.encode, models.predict, enabled=False)
+
+    async def work():
+        return await asyncio.gather(*(asyncio.to_thread(scheduler.encode, "q") for _ in range(4)))
+
+    run_with_scheduler(scheduler, work)
+    assert models.encode_batches == [1, 1, 1, 1]
@@ -0,0 +1,82 @@
+import pytest
+
+from backend.catalog import CatalogSnapshot
+from backend.database import POLICY_SORTS, decode_cursor, encode_cursor
+
+
+def ids(page):
+    return [card["id"] for card in page["policies"]]
+
+
+def walk(query, sort, limit, **filters):
+    """Every page reached by following next_cursor, as lists of ids."""
+    pages, cursor = [], None
+    while True:
+        page = query(sort=sort, limit=limit, cursor=cursor, **filters)
+        pages.append(ids(page))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture
+def snapshot(loaded_db):
+    source = loaded_db.get_catalog_rows()
+    return CatalogSnapshot(source["version"], source["rows"])
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4])
+@pytest.mark.parametrize("sort", sorted(POLICY_SORTS))
+def test_cursor_pages_cover_the_full_ordering(loaded_db, sort, limit):
+    full = ids(loaded_db.query_policy_cards(sort=sort))
+    pages = walk(loaded_db.query_policy_cards, sort, limit)
+    assert [policy_id for page in pages for policy_id in page] == full
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+@pytest.mark.parametrize("sort", sorted(POLICY_SORTS))
+def test_cursor_pages_respect_filters(loaded_db, sort):
+    full = ids(loaded_db.query_policy_cards(sort=sort, provider_name="acme"))
+    pages = walk(loaded_db.query_policy_cards, sort, 1, provider_name="acme")
+    assert [policy_id for page in pages for policy_id in page] == full
+    assert len(full) == 2
+
+
+@pytest.mark.parametrize("sort", sorted(POLICY_SORTS))
+def test_catalog_cursors_match_sql(loaded_db, snapshot, sort):
+    sql_cursor = catalog_cursor = None
+    while True:
+        sql = loaded_db.query_policy_cards(sort=sort, limit=2, cursor=sql_cursor)
+        catalog = snapshot.query(sort=sort, limit=2, cursor=catalog_cursor)
+        assert ids(catalog) == ids(sql)
+        assert catalog["next_cursor"] == sql["next_cursor"]
+        if sql["next_cursor"] is None:
+            break
+        sql_cursor = catalog_cursor = sql["next_cursor"]
+
+
+def test_pages_do_not_shift_when_policies_are_added(loaded_db, tmp_path, policy_document, policy_file):
+    first = loaded_db.query_policy_cards(limit=3)
+    assert ids(first) == ["P01", "P02", "P03"]
+
+    # Sorts before the cursor; an offset page would now repeat P03
+    loaded_db.load_policy_from_json(str(policy_file(tmp_path, policy_document("P00"))))
+    second = loaded_db.query_policy_cards(limit=3, cursor=first["next_cursor"])
+    assert ids(second) == ["P04", "P05", "P06"]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("premium", 9500.0, "P05")
+    assert decode_cursor(cursor, "premium") == (9500.0, "P05")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor("premium", 1.0, "P01")])
+def test_invalid_cursor_is_rejected(loaded_db, cursor):
+    with pytest.raises(ValueError):
+        loaded_db.query_policy_cards(sort="rating", limit=2, cursor=cursor)
+
+
+def test_cursor_and_offset_are_exclusive(loaded_db):
+    cursor = loaded_db.query_policy_cards(limit=2)["next_cursor"]
+    with pytest.raises(ValueError):
+        loaded_db.query_policy_cards(limit=2, offset=2, cursor=cursor)
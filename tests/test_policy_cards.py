@@ -0,0 +1,68 @@
+import sqlite3
+
+from backend import database
+from backend.cards import build_policy_card
+from backend.database import PolicyDatabase
+
+
+def card_ids(db):
+    return [card["id"] for card in db.query_policy_cards()["policies"]]
+
+
+def test_card_tolerates_missing_numbers(loaded_db):
+    policy = loaded_db.get_all_policies("card")[0]
+    for field in ("claim_settlement_ratio", "network_hospitals_count", "pre_hospitalization_days",
+                  "waiting_period_initial", "maternity_waiting_period", "ambulance_limit",
+                  "policy_category"):
+        policy[field] = None
+
+    card = build_policy_card(policy)
+    assert card["rating"] >= 3.0
+    assert not any(benefit.startswith("Claim Settlement Ratio") for benefit in card["benefits"])
+
+
+def test_null_claim_ratio_loads_from_json(db, tmp_path, policy_document, policy_file):
+    path = policy_file(tmp_path, policy_document("P10", claim_settlement_ratio=None, network_hospitals=None))
+    assert db.load_policy_from_json(str(path))
+    assert card_ids(db) == ["P10"]
+
+
+def test_null_claim_ratio_bulk_loads(db, policy_dir, policy_document, policy_file):
+    policy_file(policy_dir, policy_document("P10", claim_settlement_ratio=None))
+    summary = db.bulk_load_policies(str(policy_dir), workers=1)
+    assert summary["failed"] == 0
+    assert "P10" in card_ids(db)
+
+
+def test_startup_rebuilds_card_for_null_claim_ratio(tmp_path, policy_document, policy_file):
+    db_path = str(tmp_path / "policies.db")
+    db = PolicyDatabase(db_path)
+    db.load_policy_from_json(str(policy_file(tmp_path, policy_document("P10"))))
+    db.close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE policies SET claim_settlement_ratio = NULL WHERE id = 'P10'")
+    conn.execute("DELETE FROM policy_cards")
+    conn.commit()
+    conn.close()
+
+    db = PolicyDatabase(db_path)
+    try:
+        assert card_ids(db) == ["P10"]
+    finally:
+        db.close()
+
+
+def test_bad_card_is_skipped(loaded_db, monkeypatch):
+    def build(policy):
+        if policy["id"] == "P02":
+            raise ValueError("malformed")
+        return build_policy_card(policy)
+
+    monkeypatch.setattr(database, "build_policy_card", build)
+    with loaded_db._writer() as conn:
+        conn.execute("DELETE FROM policy_cards")
+        written = loaded_db._refresh_policy_cards(conn)
+
+    assert written == 5
+    assert "P02" not in card_ids(loaded_db)
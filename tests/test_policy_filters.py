@@ -0,0 +1,70 @@
+import sqlite3
+
+import pytest
+
+from backend.database import PolicyDatabase, parse_sum_insured
+
+
+def ids(result):
+    return [policy["id"] for policy in result["policies"]]
+
+
+@pytest.mark.parametrize("value, expected", [
+    (500000, 500000.0),
+    ("5,00,000", 500000.0),
+    ("10 Lacs", 1000000.0),
+    ("1 Crore", 10000000.0),
+    ("₹ 3 lakh", 300000.0),
+    ("unlimited", None),
+    (True, None),
+    (None, None),
+])
+def test_parse_sum_insured(value, expected):
+    assert parse_sum_insured(value) == expected
+
+
+def test_filters_are_combined_in_sql(loaded_db):
+    result = loaded_db.query_policies(provider_name="acme", maternity_required=True)
+    assert ids(result) == ["P01"]
+    assert result["total"] == 1
+
+
+def test_max_premium_keeps_policies_without_a_premium(loaded_db):
+    assert ids(loaded_db.query_policies(max_premium=10000)) == ["P01", "P04", "P05"]
+
+
+def test_min_sum_insured_uses_parsed_amounts(loaded_db):
+    # P04 has no options and is kept, as before the child tables existed
+    assert ids(loaded_db.query_policies(min_sum_insured=1500000)) == ["P02", "P03", "P04", "P06"]
+
+
+def test_payment_mode_filter(loaded_db):
+    assert ids(loaded_db.query_policies(payment_mode="Monthly")) == ["P01", "P03"]
+
+
+def test_page_carries_total_of_all_matches(loaded_db):
+    page = loaded_db.query_policies(limit=2, offset=2)
+    assert ids(page) == ["P03", "P04"]
+    assert page["total"] == 6
+
+    past_end = loaded_db.query_policies(limit=2, offset=10)
+    assert past_end == {"policies": [], "total": 6}
+
+
+def test_newly_loaded_policy_gets_option_rows(db, tmp_path, policy_document, policy_file):
+    path = policy_file(tmp_path, policy_document("NEW", payment_modes=("Half-Yearly",)))
+    assert db.load_policy_from_json(str(path))
+    assert ids(db.query_policies(payment_mode="Half-Yearly")) == ["NEW"]
+
+
+def test_startup_backfills_policies_missing_option_rows(loaded_db):
+    with sqlite3.connect(loaded_db.db_path) as conn:
+        conn.execute("DELETE FROM policy_payment_modes WHERE policy_id = 'P03'")
+        conn.execute("DELETE FROM policy_sum_insured_options WHERE policy_id = 'P03'")
+    loaded_db.close()
+
+    reopened = PolicyDatabase(loaded_db.db_path)
+    try:
+        assert ids(reopened.query_policies(payment_mode="Monthly")) == ["P01", "P03"]
+    finally:
+        reopened.close()
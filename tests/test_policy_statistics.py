@@ -0,0 +1,96 @@
+import sqlite3
+
+import pytest
+
+from backend.database import PolicyDatabase
+
+
+def scanned_statistics(db):
+    """The statistics as the old full-table scan computed them."""
+    conn = sqlite3.connect(db.db_path)
+    try:
+        total, providers = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT provider_name) FROM policies"
+        ).fetchone()
+        by_category = dict(conn.execute(
+            "SELECT policy_category, COUNT(*) FROM policies GROUP BY policy_category"
+        ).fetchall())
+        avg = conn.execute(
+            "SELECT AVG(claim_settlement_ratio) FROM policies WHERE claim_settlement_ratio > 0"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "total_policies": total,
+        "by_category": by_category,
+        "total_providers": providers,
+        "avg_claim_settlement_ratio": avg or 0
+    }
+
+
+def assert_matches_scan(db):
+    stats = db.get_policy_statistics()
+    expected = scanned_statistics(db)
+    assert stats["avg_claim_settlement_ratio"] == pytest.approx(expected.pop("avg_claim_settlement_ratio"))
+    assert {k: stats[k] for k in expected} == expected
+
+
+def test_empty_database(db):
+    assert db.get_policy_statistics() == {
+        "total_policies": 0,
+        "by_category": {},
+        "total_providers": 0,
+        "avg_claim_settlement_ratio": 0
+    }
+
+
+def test_loaded_statistics(loaded_db):
+    stats = loaded_db.get_policy_statistics()
+    assert stats["total_policies"] == 6
+    assert stats["total_providers"] == 4
+    assert stats["by_category"] == {"Individual": 3, "Family Floater": 2, "Senior Citizen": 1}
+    # P05's 0.0 ratio is unknown, not zero
+    assert stats["avg_claim_settlement_ratio"] == pytest.approx((95 + 88 + 95 + 95 + 95) / 5)
+    assert_matches_scan(loaded_db)
+
+
+def test_updates_move_the_aggregates(loaded_db, tmp_path, policy_document, policy_file):
+    # P06 was Delta General's only policy
+    changed = policy_document("P06", provider="Bharat Care", category="Individual", claim_settlement_ratio=70.0)
+    loaded_db.load_policy_from_json(str(policy_file(tmp_path, changed)))
+    stats = loaded_db.get_policy_statistics()
+    assert stats["total_providers"] == 3
+    assert "Senior Citizen" not in stats["by_category"]
+    assert_matches_scan(loaded_db)
+
+
+def test_unchanged_upsert_leaves_aggregates_alone(loaded_db, policy_dir):
+    before = loaded_db.get_policy_statistics()
+    loaded_db.bulk_load_policies(str(policy_dir), workers=1, force=True)
+    assert loaded_db.get_policy_statistics() == before
+
+
+def test_deletes_move_the_aggregates(loaded_db):
+    with loaded_db._writer() as conn:
+        conn.execute("DELETE FROM policies WHERE id IN ('P03', 'P04')")
+    stats = loaded_db.get_policy_statistics()
+    assert stats["total_policies"] == 4
+    assert stats["total_providers"] == 3
+    assert_matches_scan(loaded_db)
+
+
+def test_aggregates_backfilled_for_existing_database(loaded_db):
+    db_path = loaded_db.db_path
+    loaded_db.close()
+    conn = sqlite3.connect(db_path)
+    for table in ("policy_aggregates", "policy_category_counts", "policy_provider_counts"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+    conn.close()
+
+    reopened = PolicyDatabase(db_path)
+    try:
+        assert reopened.get_policy_statistics()["total_policies"] == 6
+        assert_matches_scan(reopened)
+    finally:
+        reopened.close()
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from backend.retrieval import QueryEmbeddingCache
+
+
+@pytest.fixture
+def cache():
+    return QueryEmbeddingCache(max_entries=2)
+
+
+def test_second_lookup_skips_the_model(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.ones(3, dtype=np.float32)
+
+    first = cache.get_or_compute("waiting period", compute)
+    second = cache.get_or_compute("waiting period", compute)
+    assert second is first
+    assert len(calls) == 1
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_cached_vectors_are_read_only(cache):
+    vector = cache.get_or_compute("q", lambda: np.zeros(3, dtype=np.float32))
+    with pytest.raises(ValueError):
+        vector[0] = 1.0
+
+
+def test_least_recently_used_is_dropped(cache):
+    for key in ("a", "b"):
+        cache.get_or_compute(key, lambda: np.zeros(2, dtype=np.float32))
+    cache.get_or_compute("a", lambda: pytest.fail("a should be cached"))
+    cache.get_or_compute("c", lambda: np.zeros(2, dtype=np.float32))
+
+    assert cache.stats()["entries"] == 2
+    recomputed = []
+    cache.get_or_compute("b", lambda: recomputed.append("b") or np.zeros(2, dtype=np.float32))
+    assert recomputed == ["b"]
+
+
+def test_failed_compute_is_not_cached(cache):
+    def broken():
+        raise RuntimeError("model not loaded")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("q", broken)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from backend.semantic_cache import SemanticAnswerCache
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(threshold=0.9, max_per_policy=2, max_policies=2, verify_rate=0, min_overlap=0.5)
+
+
+def test_paraphrase_reuses_answer(cache):
+    cache.add("P01", "what is the waiting period", unit(1, 0, 0), "30 days", ttl=60, version=1)
+    hit = cache.lookup("P01", unit(1, 0.1, 0), version=1)
+    assert hit.answer == "30 days"
+    assert hit.question == "what is the waiting period"
+    assert hit.similarity > 0.9
+
+
+def test_dissimilar_question_misses(cache):
+    cache.add("P01", "waiting period", unit(1, 0, 0), "30 days", ttl=60, version=1)
+    assert cache.lookup("P01", unit(0, 1, 0), version=1) is None
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+def test_answers_are_per_policy(cache):
+    cache.add("P01", "waiting period", unit(1, 0, 0), "30 days", ttl=60, version=1)
+    assert cache.lookup("P02", unit(1, 0, 0), version=1) is None
+
+
+def test_new_policy_version_drops_answers(cache):
+    cache.add("P01", "waiting period", unit(1, 0, 0), "30 days", ttl=60, version=1)
+    assert cache.lookup("P01", unit(1, 0, 0), version=2) is None
+    assert cache.lookup("P01", unit(1, 0, 0), version=1) is None
+
+
+def test_expired_answer_is_not_reused(cache):
+    cache.add("P01", "waiting period", unit(1, 0, 0), "30 days", ttl=0, version=1)
+    assert cache.lookup("P01", unit(1, 0, 0), version=1) is None
+
+
+def test_full_policy_replaces_least_recently_used(cache):
+    cache.add("P01", "a", unit(1, 0, 0), "A", ttl=60)
+    cache.add("P01", "b", unit(0, 1, 0), "B", ttl=60)
+    cache.lookup("P01", unit(1, 0, 0))  # a is used again
+    cache.add("P01", "c", unit(0, 0, 1), "C", ttl=60)
+
+    assert cache.lookup("P01", unit(0, 1, 0)) is None
+    assert cache.lookup("P01", unit(1, 0, 0)).answer == "A"
+    assert cache.lookup("P01", unit(0, 0, 1)).answer == "C"
+
+
+def test_policy_count_is_bounded(cache):
+    for policy_id in ("P01", "P02", "P03"):
+        cache.add(policy_id, "q", unit(1, 0, 0), policy_id, ttl=60)
+    assert cache.stats()["policies"] == 2
+    assert cache.lookup("P01", unit(1, 0, 0)) is None
+
+
+def test_verification_drops_false_hits(cache):
+    cache.add("P01", "q", unit(1, 0, 0), "answer", ttl=60, chunk_ids=[1, 2, 3])
+
+    hit = cache.lookup("P01", unit(1, 0, 0))
+    assert cache.verify("P01", hit, [1, 2, 3, 4])
+
+    hit = cache.lookup("P01", unit(1, 0, 0))
+    assert not cache.verify("P01", hit, [7, 8])
+    assert cache.lookup("P01", unit(1, 0, 0)) is None
+    stats = cache.stats()
+    assert (stats["verified_hits"], stats["false_hits"], stats["false_hit_rate"]) == (2, 1, 0.5)
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def searchable_db(db, tmp_path, policy_document, policy_file):
+    db.load_policy_from_json(str(policy_file(tmp_path, policy_document("P01", plan="Cancer Shield"))))
+    db.load_policy_from_json(str(policy_file(tmp_path, policy_document("P02", plan="Family Basic"))))
+    db.load_policy_from_json(str(policy_file(tmp_path, policy_document("P03", plan="Senior <b>Care</b>"))))
+    db.upsert_section_summaries("P02", {"exclusions": {"summary": "Cancer treatment is excluded for two years."}})
+    db.upsert_policy_chunks("P03", [{
+        "section_name": "benefits",
+        "chunk_text": "Covers cancer & chemotherapy <script>alert(1)</script> in full.",
+        "chunk_index": 0
+    }])
+    return db
+
+
+def test_name_hits_outrank_body_hits(searchable_db):
+    results = searchable_db.search_policy_text("cancer")
+    assert [r["policy_id"] for r in results] == ["P01", "P02", "P03"]
+    assert results[0]["highlights"]["plan_name"] == "<mark>Cancer</mark> Shield"
+    assert results[1]["matches"][0]["source"] == "summary"
+
+
+def test_prefix_terms_match(searchable_db):
+    assert [r["policy_id"] for r in searchable_db.search_policy_text("chemo")] == ["P03"]
+
+
+def test_snippets_are_html_escaped(searchable_db):
+    [result] = searchable_db.search_policy_text("chemotherapy")
+    snippet = result["matches"][0]["snippet"]
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "&amp; <mark>chemotherapy</mark>" in snippet
+
+
+def test_highlighted_names_are_html_escaped(searchable_db):
+    [result] = searchable_db.search_policy_text("senior")
+    assert result["plan_name"] == "Senior <b>Care</b>"
+    assert result["highlights"]["plan_name"] == "<mark>Senior</mark> &lt;b&gt;Care&lt;/b&gt;"
+
+
+def test_query_without_terms_returns_nothing(searchable_db):
+    assert searchable_db.search_policy_text('"*') == []
@@ -0,0 +1,135 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from backend.database import PolicyDatabase
+from backend.vector_index import ChunkVectorIndex, IVFIndex
+
+
+def blob(*values):
+    return np.asarray(values, dtype=np.float32).tobytes()
+
+
+def chunk(index, *values):
+    return {"section_name": "benefits", "chunk_text": f"chunk {index}", "chunk_index": index,
+            "embedding": blob(*values)}
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(7)
+    return rng.normal(size=(400, 16)).astype(np.float32)
+
+
+@pytest.fixture
+def ivf(vectors):
+    index = IVFIndex()
+    index.add(range(len(vectors)), [f"P{i % 10:02d}" for i in range(len(vectors))], vectors)
+    return index
+
+
+def exact_top(vectors, query, k, keep=None):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    order = [i for i in np.argsort(-scores) if keep is None or keep(i)]
+    return order[:k]
+
+
+def test_full_probe_matches_exact_search(ivf, vectors):
+    query = vectors[3] + 0.1
+    hits = ivf.search(query, 10, nprobe=ivf.nlist)
+    assert [chunk_id for _, chunk_id, _ in hits] == exact_top(vectors, query, 10)
+    assert [score for score, _, _ in hits] == sorted((score for score, _, _ in hits), reverse=True)
+
+
+def test_partial_probe_finds_the_vector_itself(ivf, vectors):
+    assert ivf.nlist > 1
+    _, chunk_id, policy_id = ivf.search(vectors[42], 1, nprobe=1)[0]
+    assert (chunk_id, policy_id) == (42, "P02")
+
+
+def test_allowed_policies_filter(ivf, vectors):
+    hits = ivf.search(vectors[0], 5, nprobe=1, allowed_policies=np.asarray(["P07"], dtype=object))
+    assert len(hits) == 5
+    assert {policy_id for _, _, policy_id in hits} == {"P07"}
+
+
+def test_removed_policies_are_not_returned(ivf, vectors):
+    assert ivf.remove_policies(["P00"]) == 40
+    assert len(ivf) == 360
+    hits = ivf.search(vectors[0], 20, nprobe=ivf.nlist)
+    assert "P00" not in {policy_id for _, _, policy_id in hits}
+
+
+def test_save_and_load_round_trip(ivf, vectors, tmp_path):
+    path = str(tmp_path / "index.npz")
+    ivf.save(path, extra=np.arange(3))
+    loaded, extra = IVFIndex.load(path)
+    assert np.array_equal(extra["extra"], np.arange(3))
+    assert loaded.search(vectors[5], 5, nprobe=4) == ivf.search(vectors[5], 5, nprobe=4)
+
+
+@pytest.fixture
+def chunk_db(loaded_db):
+    loaded_db.upsert_policy_chunks("P01", [chunk(0, 1, 0, 0), chunk(1, 0.9, 0.1, 0)])
+    loaded_db.upsert_policy_chunks("P02", [chunk(0, 0, 1, 0)])
+    return loaded_db
+
+
+def test_backfill_indexes_existing_chunks(chunk_db, tmp_path):
+    index = ChunkVectorIndex(chunk_db, str(tmp_path / "chunks.npz"))
+    assert not index.ready
+    assert index.refresh() == 6
+    assert index.ready
+    assert index.stats()["vectors"] == 3
+
+    [best, second] = index.search(np.asarray([1, 0, 0], dtype=np.float32), limit=2)
+    assert best["policy_id"] == "P01" and len(best["chunks"]) == 2
+    assert second["policy_id"] == "P02"
+
+
+def test_not_ready_without_chunks(loaded_db, tmp_path):
+    index = ChunkVectorIndex(loaded_db, str(tmp_path / "chunks.npz"))
+    index.refresh()
+    assert index.stats()["policies"] == 6
+    assert not index.ready
+
+
+def test_only_changed_policies_are_reread(chunk_db, tmp_path):
+    index = ChunkVectorIndex(chunk_db, str(tmp_path / "chunks.npz"), refresh_interval=0)
+    index.refresh()
+    assert index.refresh() == 0
+
+    chunk_db.upsert_policy_chunks("P02", [chunk(1, 0, 0, 1)])
+    assert index.refresh() == 1
+    [hit] = index.search(np.asarray([0, 0, 1], dtype=np.float32), limit=1)
+    assert hit["policy_id"] == "P02"
+    assert index.stats()["vectors"] == 4
+
+
+def test_restart_loads_the_saved_index(chunk_db, tmp_path):
+    path = str(tmp_path / "chunks.npz")
+    ChunkVectorIndex(chunk_db, path).refresh()
+
+    restarted = ChunkVectorIndex(chunk_db, path)
+    assert restarted.refresh() == 0
+    assert restarted.ready
+    assert restarted.stats()["updates"] == 0
+
+
+def test_database_from_before_policy_versions_is_indexed(chunk_db, tmp_path):
+    db_path = chunk_db.db_path
+    chunk_db.close()
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE policy_versions")
+    conn.commit()
+    conn.close()
+
+    reopened = PolicyDatabase(db_path)
+    try:
+        index = ChunkVectorIndex(reopened, str(tmp_path / "chunks.npz"))
+        index.refresh()
+        assert index.stats()["vectors"] == 3
+    finally:
+        reopened.close()
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+from backend import warmup
+from backend.warmup import CacheWarmer, HotKeys
+
+
+@pytest.fixture
+def hot_keys(tmp_path):
+    return HotKeys(str(tmp_path / "warmup_state.json"))
+
+
+def test_top_keys_by_request_count(hot_keys):
+    for _ in range(3):
+        hot_keys.record_query({"sort": "rating", "limit": 20})
+    hot_keys.record_query({"limit": 20, "sort": "id"})
+    for policy_id in ("P02", "P01", "P02"):
+        hot_keys.record_policy(policy_id)
+
+    assert hot_keys.top_queries(1) == [{"sort": "rating", "limit": 20}]
+    assert hot_keys.top_policies() == ["P02", "P01"]
+
+
+def test_state_survives_a_restart_with_decay(hot_keys):
+    for _ in range(4):
+        hot_keys.record_policy("P01")
+    hot_keys.record_query({"sort": "id"})
+    hot_keys.save()
+
+    restarted = HotKeys(hot_keys.path)
+    assert restarted.load()
+    assert restarted.top_policies() == ["P01"]
+    assert restarted.policies["P01"] == 4 * warmup.WARMUP_STATE_DECAY
+    assert restarted.top_queries() == [{"sort": "id"}]
+
+
+def test_missing_or_corrupt_state_is_ignored(hot_keys):
+    assert not hot_keys.load()
+    with open(hot_keys.path, "w") as f:
+        f.write("{broken")
+    assert not hot_keys.load()
+    assert hot_keys.top_policies() == []
+
+
+def test_saved_state_keeps_only_the_head(hot_keys, monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_TOP_POLICIES", 2)
+    monkeypatch.setattr(warmup, "WARMUP_STATE_KEEP_FACTOR", 1)
+    for count, policy_id in enumerate(("P01", "P02", "P03"), start=1):
+        for _ in range(count):
+            hot_keys.record_policy(policy_id)
+    hot_keys.save()
+    with open(hot_keys.path) as f:
+        assert set(json.load(f)["policies"]) == {"P02", "P03"}
+
+
+def test_tracked_keys_are_bounded(hot_keys, monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_MAX_TRACKED_KEYS", 10)
+    hot_keys.record_policy("hot")
+    hot_keys.record_policy("hot")
+    for i in range(20):
+        hot_keys.record_policy(f"cold{i}")
+    assert len(hot_keys.policies) <= 10
+    assert hot_keys.top_policies(1) == ["hot"]
+
+
+def test_warmer_runs_steps_and_survives_failures():
+    warmer = CacheWarmer(enabled=True, timeout=5)
+    order = []
+
+    async def listings():
+        order.append("listings")
+        return 3
+
+    async def broken():
+        order.append("broken")
+        raise RuntimeError("no database")
+
+    async def policies():
+        order.append("policies")
+
+    warmer.add("listings", listings)
+    warmer.add("broken", broken)
+    warmer.add("policies", policies)
+    assert not warmer.finished
+
+    asyncio.run(warmer.run())
+    assert order == ["listings", "broken", "policies"]
+    assert warmer.state == "done" and warmer.finished
+    assert warmer.results["listings"]["warmed"] == 3
+    assert warmer.results["broken"] == {"ok": False, "error": "no database", "ms": warmer.results["broken"]["ms"]}
+
+
+def test_warmer_timeout_still_finishes():
+    warmer = CacheWarmer(enabled=True, timeout=0.05)
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    warmer.add("slow", slow)
+    asyncio.run(warmer.run())
+    assert warmer.state == "timed_out"
+    assert warmer.finished
+
+
+def test_disabled_warmer_is_finished_immediately():
+    warmer = CacheWarmer(enabled=False)
+    asyncio.run(warmer.run())
+    assert warmer.finished
+    assert warmer.stats()["state"] == "disabled"